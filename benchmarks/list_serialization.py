@@ -0,0 +1,131 @@
+"""Compares the per-row cost of the default and the fast JSON paths of GET /api/v1/users/{user_id}/audios.
+
+A user with a page worth of audios is created, then each page size is fetched and rendered repeatedly:
+
+- default: find_page hydrates UserAudio objects, which FastAPI validates against the response model
+  and renders with the stdlib json encoder, as it does for the endpoint;
+- fast: find_page_rows returns column mappings, which page_response renders with orjson.
+
+The fetch and render times are reported per row. The rows are deleted at the end:
+
+    python -m benchmarks.list_serialization --page-sizes 50,500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from conchalabs.commons.pagination import Page, page_response
+from conchalabs.dependencies.database import engine
+from conchalabs.user_audios.models import UserAudio
+from conchalabs.user_audios.repositories.postgres import PostgresUserAudioRepository
+
+INSERT_USER = text(
+    """
+    INSERT INTO "user" (id, name, email, address, image, created_at, updated_at)
+    VALUES (gen_random_uuid(), 'benchmark', 'benchmark@example.com', 'benchmark', '',
+            now(), now())
+    RETURNING id
+    """
+)
+
+INSERT_AUDIOS = text(
+    """
+    INSERT INTO useraudio
+        (id, user_id, ticks, selected_tick, session_id, step_count, created_at, updated_at)
+    SELECT gen_random_uuid(), :user_id,
+           ARRAY(SELECT round((-100 + random() * 90)::numeric, 2)::real
+                 FROM generate_series(1, 15) WHERE n > 0),
+           n % 15, -n - 1, n % 10, now() - make_interval(secs => n), now()
+    FROM generate_series(1, :count) AS n
+    """
+)
+
+CLEAN_UP = text("""DELETE FROM "user" WHERE name = 'benchmark'""")
+
+response_field = create_response_field("Response", Page[UserAudio])
+
+
+async def render_default(repository: PostgresUserAudioRepository, user_id, limit):
+    start = time.perf_counter()
+    page = await repository.find_page(user_id, {}, limit)
+    fetched = time.perf_counter()
+    content = await serialize_response(field=response_field, response_content=page)
+    JSONResponse(content)
+
+    return fetched - start, time.perf_counter() - fetched
+
+
+async def render_fast(repository: PostgresUserAudioRepository, user_id, limit):
+    start = time.perf_counter()
+    page = await repository.find_page_rows(user_id, {}, limit)
+    fetched = time.perf_counter()
+    page_response(page)
+
+    return fetched - start, time.perf_counter() - fetched
+
+
+async def time_path(render, user_id: UUID, limit: int, repeat: int):
+    fetch_times, render_times = [], []
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        repository = PostgresUserAudioRepository(session)
+
+        for _ in range(repeat):
+            fetch_time, render_time = await render(repository, user_id, limit)
+            fetch_times.append(fetch_time)
+            render_times.append(render_time)
+            session.expunge_all()
+
+    return (
+        statistics.median(fetch_times) / limit,
+        statistics.median(render_times) / limit,
+    )
+
+
+async def main(args: argparse.Namespace):
+    async with engine.begin() as connection:
+        await connection.execute(CLEAN_UP)
+        user_id = await connection.scalar(INSERT_USER)
+        await connection.execute(
+            INSERT_AUDIOS, {"user_id": user_id, "count": max(args.page_sizes)}
+        )
+
+    print(
+        f"{'page size':>10} {'path':>8} {'fetch (us/row)':>15} {'render (us/row)':>16}"
+    )
+
+    try:
+        for limit in args.page_sizes:
+            for name, render in (("default", render_default), ("fast", render_fast)):
+                fetch_time, render_time = await time_path(
+                    render, user_id, limit, args.repeat
+                )
+                print(
+                    f"{limit:>10} {name:>8} {fetch_time * 1e6:>15.1f} "
+                    f"{render_time * 1e6:>16.1f}"
+                )
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(CLEAN_UP)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--page-sizes",
+        type=lambda sizes: [int(size) for size in sizes.split(",")],
+        default=[50, 500],
+    )
+    parser.add_argument("--repeat", type=int, default=50)
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,93 @@
+"""Measures the recall and latency of the tick vector indexes behind GET .../audios/{audio_id}/similar.
+
+Synthetic ticks shaped like the real ones (rising curves from a random start, slope and noise, within
+[-100, -10]) are indexed by the exact VectorIndex and by IVFVectorIndex. Queries are perturbed copies
+of indexed vectors. The recall@k of each IVF setting is measured against the exact neighbours:
+
+    python -m benchmarks.tick_similarity --vectors 1000000 --lists 1024 --probes 4,16,64
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from conchalabs.commons.vector_index import IVFVectorIndex, VectorIndex
+
+DIMENSIONS = 15
+
+
+def generate_ticks(count: int, generator: np.random.Generator) -> np.ndarray:
+    starts = generator.uniform(-100, -60, (count, 1))
+    slopes = generator.uniform(0.5, 5.0, (count, 1))
+    noise = generator.normal(0, 1.5, (count, DIMENSIONS))
+    ticks = starts + slopes * np.arange(DIMENSIONS) + noise
+
+    return np.clip(ticks, -100, -10).round(2).astype(np.float32)
+
+
+def time_searches(index: VectorIndex, queries: np.ndarray, k: int):
+    latencies, results = [], []
+
+    for query in queries:
+        start = time.perf_counter()
+        results.append([key for key, _ in index.search(query, k)])
+        latencies.append(time.perf_counter() - start)
+
+    return results, latencies
+
+
+def report(name: str, latencies: list[float], recall: float):
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:>14} {statistics.median(latencies) * 1000:>10.3f} "
+        f"{quantiles[98] * 1000:>10.3f} {recall:>8.3f}"
+    )
+
+
+def main(args: argparse.Namespace):
+    generator = np.random.default_rng(args.seed)
+    vectors = generate_ticks(args.vectors, generator)
+    keys = list(range(args.vectors))
+    queries = vectors[generator.choice(args.vectors, args.queries, replace=False)]
+    queries = queries + generator.normal(0, 1.0, queries.shape).astype(np.float32)
+
+    start = time.perf_counter()
+    exact_index: VectorIndex[int] = VectorIndex(DIMENSIONS)
+    exact_index.add(keys, vectors)
+    print(f"exact build: {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    ivf_index: IVFVectorIndex[int] = IVFVectorIndex(DIMENSIONS, args.lists, 1)
+    ivf_index.add(keys, vectors)
+    ivf_index.train()
+    print(f"ivf build ({args.lists} lists): {time.perf_counter() - start:.2f} s\n")
+
+    print(f"{'index':>14} {'p50 (ms)':>10} {'p99 (ms)':>10} {'recall':>8}")
+
+    truth, latencies = time_searches(exact_index, queries, args.k)
+    report("exact", latencies, 1.0)
+
+    for probes in args.probes:
+        ivf_index.probes = probes
+        results, latencies = time_searches(ivf_index, queries, args.k)
+        found = sum(
+            len(set(result) & set(expected)) for result, expected in zip(results, truth)
+        )
+        report(f"ivf/{probes}", latencies, found / (args.k * len(queries)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=1024)
+    parser.add_argument(
+        "--probes",
+        type=lambda probes: [int(probe) for probe in probes.split(",")],
+        default=[4, 16, 64],
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+    main(parser.parse_args())
@@ -0,0 +1,152 @@
+"""Compares storing audio ticks as a JSON column against the real[] column used by UserAudio.
+
+For each storage the same random ticks are inserted into a scratch table, then the average column
+size, the table size, the insert throughput and the latency of reading a page of rows (decoded by
+the column type, as the API does) are reported. "real[] text" is the same column read the way
+Float32Array used to, formatted as text by Postgres and parsed in Python, to compare with the binary
+read Float32Array does now. The scratch tables are dropped at the end:
+
+    python -m benchmarks.ticks_storage --rows 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import (
+    JSON,
+    REAL,
+    Column,
+    MetaData,
+    Table,
+    Text,
+    cast,
+    func,
+    select,
+    type_coerce,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import TypeDecorator
+from sqlmodel.sql.sqltypes import GUID
+
+from conchalabs.commons.types import Float32Array
+from conchalabs.dependencies.database import engine
+
+metadata = MetaData()
+
+
+class TextFloat32Array(TypeDecorator):
+    impl = ARRAY(REAL)
+    cache_ok = True
+
+    def column_expression(self, column):
+        return type_coerce(cast(column, Text), self)
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None:
+                return None
+            if value == "{}":
+                return []
+
+            return [float(item) for item in value[1:-1].split(",")]
+
+        return process
+
+
+STORAGES = {
+    "json": Table(
+        "benchmark_ticks_json",
+        metadata,
+        Column("id", GUID, primary_key=True),
+        Column("ticks", JSON),
+    ),
+    "real[]": Table(
+        "benchmark_ticks_real",
+        metadata,
+        Column("id", GUID, primary_key=True),
+        Column("ticks", Float32Array),
+    ),
+    "real[] text": Table(
+        "benchmark_ticks_real_text",
+        metadata,
+        Column("id", GUID, primary_key=True),
+        Column("ticks", TextFloat32Array),
+    ),
+}
+
+
+def random_ticks() -> list[float]:
+    return [round(random.uniform(-100.0, -10.0), 2) for _ in range(15)]
+
+
+async def benchmark_storage(table: Table, rows: list[dict], args: argparse.Namespace):
+    start = time.perf_counter()
+    for offset in range(0, len(rows), args.batch_size):
+        async with engine.begin() as connection:
+            batch = rows[offset : offset + args.batch_size]
+            await connection.execute(table.insert(), batch)
+    insert_throughput = len(rows) / (time.perf_counter() - start)
+
+    async with engine.begin() as connection:
+        column_size = await connection.scalar(
+            select(func.avg(func.pg_column_size(table.c.ticks)))
+        )
+        table_size = await connection.scalar(
+            select(func.pg_total_relation_size(table.name))
+        )
+
+    read_latencies = []
+    async with engine.connect() as connection:
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = await connection.execute(
+                select(table)
+                .where(table.c.id > uuid.uuid4())
+                .order_by(table.c.id)
+                .limit(args.page_size)
+            )
+            result.all()
+            read_latencies.append(time.perf_counter() - start)
+
+    return column_size, table_size, insert_throughput, statistics.median(read_latencies)
+
+
+async def main(args: argparse.Namespace):
+    rows = [{"id": uuid.uuid4(), "ticks": random_ticks()} for _ in range(args.rows)]
+
+    async with engine.begin() as connection:
+        await connection.run_sync(metadata.drop_all)
+        await connection.run_sync(metadata.create_all)
+
+    print(
+        f"{'storage':>11} {'column (B)':>11} {'table (MB)':>11} "
+        f"{'inserts/s':>10} {f'read {args.page_size} (ms)':>14}"
+    )
+
+    try:
+        for name, table in STORAGES.items():
+            column_size, table_size, throughput, read_latency = await benchmark_storage(
+                table, rows, args
+            )
+            print(
+                f"{name:>11} {column_size:>11.1f} {table_size / 2**20:>11.1f} "
+                f"{throughput:>10.0f} {read_latency * 1000:>14.2f}"
+            )
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(metadata.drop_all)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,131 @@
+"""Measures GET /api/v1/users/{user_id}/audios page latency as the useraudio table grows.
+
+A target user with a fixed history is created, then the table is filled with audios of other
+users up to each of the requested sizes. At every size the first page and a deep page (reached
+through the cursors) of the target user are timed through PostgresUserAudioRepository.find_page.
+
+It writes millions of rows, so point DATABASE_URL to a disposable database:
+
+    python -m benchmarks.user_audio_listing --sizes 10000,100000,1000000,10000000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from conchalabs.dependencies.database import engine
+from conchalabs.user_audios.repositories.postgres import PostgresUserAudioRepository
+
+INSERT_USERS = text(
+    """
+    INSERT INTO "user" (id, name, email, address, image, created_at, updated_at)
+    SELECT gen_random_uuid(), 'benchmark', 'benchmark@example.com', 'benchmark', '',
+           now(), now()
+    FROM generate_series(1, :count)
+    RETURNING id
+    """
+)
+
+INSERT_AUDIOS = text(
+    """
+    INSERT INTO useraudio
+        (id, user_id, ticks, selected_tick, session_id, step_count, created_at, updated_at)
+    SELECT gen_random_uuid(),
+           (CAST(:user_ids AS uuid[]))[1 + n % cardinality(CAST(:user_ids AS uuid[]))],
+           array_fill(-50.0::real, ARRAY[15]),
+           n % 15,
+           :first_session_id + n,
+           n % 10,
+           now() - make_interval(secs => n::double precision),
+           now()
+    FROM generate_series(0, :count - 1) AS n
+    """
+)
+
+CLEAN_UP = text("""DELETE FROM "user" WHERE name = 'benchmark'""")
+
+
+async def insert_audios(user_ids: list[UUID], count: int, first_session_id: int):
+    async with engine.begin() as connection:
+        await connection.execute(
+            INSERT_AUDIOS,
+            {
+                "user_ids": user_ids,
+                "count": count,
+                "first_session_id": first_session_id,
+            },
+        )
+        await connection.execute(text("ANALYZE useraudio"))
+
+
+async def time_pages(user_id: UUID, page_size: int, depth: int, repeat: int):
+    first_page, deep_page = [], []
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        repository = PostgresUserAudioRepository(session)
+
+        for _ in range(repeat):
+            cursor = None
+
+            for page_number in range(depth):
+                start = time.perf_counter()
+                page = await repository.find_page(user_id, {}, page_size, cursor)
+                elapsed = time.perf_counter() - start
+
+                if page_number == 0:
+                    first_page.append(elapsed)
+                cursor = page.next_cursor
+
+            deep_page.append(elapsed)
+            session.expunge_all()
+
+    return statistics.median(first_page), statistics.median(deep_page)
+
+
+async def main(args: argparse.Namespace):
+    async with engine.begin() as connection:
+        await connection.execute(CLEAN_UP)
+        result = await connection.execute(INSERT_USERS, {"count": args.users + 1})
+        target_user_id, *user_ids = result.scalars().all()
+
+    history = args.page_size * args.depth
+    rows = history
+
+    print(f"{'rows':>12} {'first page (ms)':>16} {f'page {args.depth} (ms)':>16}")
+
+    try:
+        await insert_audios([target_user_id], history, first_session_id=-history)
+
+        for size in args.sizes:
+            if size > rows:
+                await insert_audios(user_ids, size - rows, first_session_id=rows)
+                rows = size
+
+            first_page, deep_page = await time_pages(
+                target_user_id, args.page_size, args.depth, args.repeat
+            )
+            print(f"{rows:>12} {first_page * 1000:>16.2f} {deep_page * 1000:>16.2f}")
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(CLEAN_UP)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda sizes: [int(size) for size in sizes.split(",")],
+        default=[10_000, 100_000, 1_000_000, 10_000_000],
+    )
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+
+    asyncio.run(main(parser.parse_args()))
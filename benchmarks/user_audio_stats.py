@@ -0,0 +1,94 @@
+"""Measures GET /api/v1/users/{user_id}/audios:stats latency as a user's history grows.
+
+A user is given each of the requested numbers of audios with random ticks, then the statistics are
+computed through PostgresUserAudioRepository.get_stats. The rows are deleted at the end:
+
+    python -m benchmarks.user_audio_stats --sizes 1000,10000,100000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from conchalabs.dependencies.database import engine
+from conchalabs.user_audios.repositories.postgres import PostgresUserAudioRepository
+
+INSERT_USER = text(
+    """
+    INSERT INTO "user" (id, name, email, address, image, created_at, updated_at)
+    VALUES (gen_random_uuid(), 'benchmark', 'benchmark@example.com', 'benchmark', '',
+            now(), now())
+    RETURNING id
+    """
+)
+
+INSERT_AUDIOS = text(
+    """
+    INSERT INTO useraudio
+        (id, user_id, ticks, selected_tick, session_id, step_count, created_at, updated_at)
+    SELECT gen_random_uuid(), :user_id,
+           ARRAY(SELECT round((-100 + random() * 90)::numeric, 2)::real
+                 FROM generate_series(1, 15) WHERE n > 0),
+           n % 15, -n, n % 10, now() - make_interval(secs => n), now()
+    FROM generate_series(CAST(:first AS integer), CAST(:last AS integer)) AS n
+    """
+)
+
+CLEAN_UP = text("""DELETE FROM "user" WHERE name = 'benchmark'""")
+
+
+async def time_stats(user_id: UUID, repeat: int) -> float:
+    latencies = []
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        repository = PostgresUserAudioRepository(session)
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await repository.get_stats(user_id)
+            latencies.append(time.perf_counter() - start)
+
+    return statistics.median(latencies)
+
+
+async def main(args: argparse.Namespace):
+    async with engine.begin() as connection:
+        await connection.execute(CLEAN_UP)
+        user_id = await connection.scalar(INSERT_USER)
+
+    audios = 0
+    print(f"{'audios':>10} {'stats (ms)':>12}")
+
+    try:
+        for size in args.sizes:
+            async with engine.begin() as connection:
+                await connection.execute(
+                    INSERT_AUDIOS,
+                    {"user_id": user_id, "first": audios + 1, "last": size},
+                )
+                await connection.execute(text("ANALYZE useraudio"))
+            audios = size
+
+            latency = await time_stats(user_id, args.repeat)
+            print(f"{audios:>10} {latency * 1000:>12.2f}")
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(CLEAN_UP)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda sizes: [int(size) for size in sizes.split(",")],
+        default=[1_000, 10_000, 100_000],
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+
+    asyncio.run(main(parser.parse_args()))
@@ -1,17 +1,92 @@
 from fastapi import FastAPI
 from fastapi_health import health
+from sqlalchemy.exc import DBAPIError
 
-from conchalabs.dependencies.database import is_database_online
+from conchalabs.dependencies.database import (
+    database_probe,
+    is_database_online,
+    replica_monitor,
+    tick_index_updater,
+    user_audio_write_queue,
+)
+from conchalabs.dependencies.timeouts import handle_statement_timeout
+from conchalabs.health.routes import router as health_routes
+from conchalabs.internal.routes import router as internal_routes
+from conchalabs.middlewares.admission_control import (
+    AdmissionController,
+    AdmissionControlMiddleware,
+)
+from conchalabs.middlewares.disconnect import DisconnectCancellationMiddleware
+from conchalabs.middlewares.instrumentation import (
+    InstrumentationMiddleware,
+    InstrumentedRoute,
+)
+from conchalabs.middlewares.query_inspection import QueryInspectionMiddleware
+from conchalabs.settings import settings
+from conchalabs.tick_percentiles.routes import router as tick_percentiles_routes
 from conchalabs.user_audios.routes import router as user_audio_routes
 from conchalabs.users.routes import router as users_routes
 
 
 def create_app() -> FastAPI:
     app_ = FastAPI(title="Conchalabs API")
+    app_.router.route_class = InstrumentedRoute
+
+    if (
+        settings.db_statement_budget is not None
+        or settings.db_slow_query_threshold is not None
+    ):
+        app_.add_middleware(
+            QueryInspectionMiddleware,
+            statement_budget=settings.db_statement_budget,
+            budget_mode=settings.db_statement_budget_mode,
+            slow_query_threshold=settings.db_slow_query_threshold,
+        )
+
+    if settings.cancel_on_disconnect:
+        # Inside the admission control, so a request keeps its slot until it is cancelled
+        app_.add_middleware(DisconnectCancellationMiddleware)
+
+    if settings.admission_control_enabled:
+        # Inside the instrumentation, so the rejected requests show up in its metrics
+        app_.add_middleware(
+            AdmissionControlMiddleware,
+            controller=AdmissionController(
+                limit=settings.admission_max_concurrency
+                or settings.db_pool_size + settings.db_max_overflow,
+                max_waiting={
+                    "read": settings.admission_max_waiting_reads,
+                    "write": settings.admission_max_waiting_writes,
+                },
+                timeout=settings.admission_queue_timeout,
+            ),
+            retry_after=settings.admission_retry_after,
+        )
+
+    app_.add_middleware(InstrumentationMiddleware)
+    app_.add_exception_handler(DBAPIError, handle_statement_timeout)
+
+    app_.add_event_handler("startup", database_probe.start)
+    app_.add_event_handler("shutdown", database_probe.stop)
+
+    if replica_monitor is not None:
+        app_.add_event_handler("startup", replica_monitor.start)
+        app_.add_event_handler("shutdown", replica_monitor.stop)
+
+    if user_audio_write_queue is not None:
+        app_.add_event_handler("startup", user_audio_write_queue.start)
+        app_.add_event_handler("shutdown", user_audio_write_queue.stop)
+
+    if tick_index_updater is not None:
+        app_.add_event_handler("startup", tick_index_updater.start)
+        app_.add_event_handler("shutdown", tick_index_updater.stop)
 
     app_.add_api_route("/health", health([is_database_online]))  # type: ignore
+    app_.include_router(health_routes)
     app_.include_router(users_routes)
     app_.include_router(user_audio_routes)
+    app_.include_router(tick_percentiles_routes)
+    app_.include_router(internal_routes)
 
     return app_
 
@@ -0,0 +1,92 @@
+import abc
+import math
+import time
+from collections import OrderedDict
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class CacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class CacheBackend(abc.ABC):
+    @abc.abstractmethod
+    async def get(self, key: str) -> Any | None:
+        """Gets the value cached for the key, or None if it is missing or expired."""
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: Any, read_at: float | None = None):
+        """Caches the value for the key, replacing any previous value.
+        With read_at, the time.time() the value was read at, it is not cached if the key was deleted
+        since then, so that a value read before a write doesn't replace its invalidation."""
+
+    @abc.abstractmethod
+    async def delete(self, key: str):
+        """Removes the key from the cache, if it is cached, and records when it was deleted."""
+
+    @abc.abstractmethod
+    def stats(self) -> CacheStats:
+        """Gets the cache counters since it was created."""
+
+
+class LRUCache(CacheBackend):
+    """In-process cache that keeps up to max_size entries for ttl seconds each.
+    When it is full, the least recently used entry is evicted to make room for a new one.
+    Deletions are remembered for ttl seconds too, to check the read_at of the values set."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._deletions: OrderedDict[str, float] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    async def set(self, key: str, value: Any, read_at: float | None = None):
+        if read_at is not None and self._deletions.get(key, -math.inf) >= read_at:
+            return
+
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+        now = time.time()
+        self._deletions[key] = now
+        self._deletions.move_to_end(key)
+
+        while next(iter(self._deletions.values())) < now - self._ttl:
+            self._deletions.popitem(last=False)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._entries),
+            max_size=self._max_size,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+        )
@@ -0,0 +1,159 @@
+import bisect
+from collections.abc import Sequence
+
+from pydantic import BaseModel
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class HistogramSnapshot(BaseModel):
+    buckets: dict[str, int]
+    sum: float
+    count: int
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+
+    formatted_labels = ",".join(
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for name, value in labels.items()
+    )
+    return f"{{{formatted_labels}}}"
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+    def expose(self, name: str, labels: dict[str, str]) -> list[str]:
+        return [f"{name}{_format_labels(labels)} {self.value}"]
+
+
+class Histogram:
+    """Counts observed values into cumulative buckets, following the Prometheus histogram semantics:
+    the bucket with upper bound `le` counts every value lower than or equal to it."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> HistogramSnapshot:
+        buckets = {}
+        cumulative_count = 0
+
+        for upper_bound, count in zip([*self.buckets, "+Inf"], self._counts):
+            cumulative_count += count
+            buckets[str(upper_bound)] = cumulative_count
+
+        return HistogramSnapshot(buckets=buckets, sum=self.sum, count=self.count)
+
+    def expose(self, name: str, labels: dict[str, str]) -> list[str]:
+        snapshot = self.snapshot()
+        lines = [
+            f"{name}_bucket{_format_labels({**labels, 'le': upper_bound})} {count}"
+            for upper_bound, count in snapshot.buckets.items()
+        ]
+        lines.append(f"{name}_sum{_format_labels(labels)} {snapshot.sum}")
+        lines.append(f"{name}_count{_format_labels(labels)} {snapshot.count}")
+
+        return lines
+
+
+class MetricFamily:
+    """Named metric holding one Counter or Histogram per distinct set of label values."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        metric_type: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.label_names = tuple(label_names)
+        self._buckets = buckets
+        self._children: dict[tuple[str, ...], Counter | Histogram] = {}
+
+    def labels(self, *label_values: str):
+        child = self._children.get(label_values)
+
+        if child is None:
+            if self.metric_type == "counter":
+                child = Counter()
+            else:
+                child = Histogram(self._buckets)
+
+            self._children[label_values] = child
+
+        return child
+
+    def expose(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+        for label_values, child in self._children.items():
+            lines.extend(
+                child.expose(self.name, dict(zip(self.label_names, label_values)))
+            )
+
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._families: dict[str, MetricFamily] = {}
+
+    def counter(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> MetricFamily:
+        return self._register(MetricFamily(name, documentation, "counter", label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> MetricFamily:
+        return self._register(
+            MetricFamily(name, documentation, "histogram", label_names, buckets)
+        )
+
+    def expose(self) -> str:
+        lines = []
+
+        for family in self._families.values():
+            lines.extend(family.expose())
+
+        return "\n".join(lines) + "\n"
+
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} is already registered")
+
+        self._families[family.name] = family
+        return family
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,39 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Generic, TypeVar
+from uuid import UUID
+
+from fastapi.responses import ORJSONResponse
+from pydantic.generics import GenericModel
+
+from conchalabs.commons.errors import InvalidCursorError
+
+ItemT = TypeVar("ItemT")
+
+
+class Page(GenericModel, Generic[ItemT]):
+    items: list[ItemT]
+    next_cursor: str | None = None
+
+
+def encode_cursor(created_at: datetime, id_: UUID) -> str:
+    payload = json.dumps([created_at.isoformat(), str(id_)]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decodes a cursor created by encode_cursor into its (created_at, id) keyset.
+    Raises InvalidCursorError if the cursor is malformed."""
+    try:
+        created_at, id_ = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), UUID(id_)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as error:
+        raise InvalidCursorError() from error
+
+
+def page_response(page: Page[dict]) -> ORJSONResponse:
+    """Renders a page of column mappings straight to JSON with orjson, skipping the validation
+    and encoding FastAPI does against the response model. The body matches the response model's."""
+    return ORJSONResponse({"items": page.items, "next_cursor": page.next_cursor})
@@ -0,0 +1,66 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+from conchalabs.commons.metrics import registry
+
+T = TypeVar("T")
+
+coalesced_calls = registry.counter(
+    "singleflight_calls_total",
+    "Calls made through a single-flight group, by whether they ran (leader) or shared "
+    "the result of an identical call in flight (follower).",
+    ["group", "role"],
+)
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key: the first caller (the leader) runs the call, and the
+    callers that arrive while it is in flight (the followers) wait for it and share its result or error.
+    Nothing is kept once the call finishes, so a caller never gets a result older than its own arrival
+    minus the duration of one call.
+
+    When the leader is cancelled, e.g. its client disconnected, its followers run the call again."""
+
+    def __init__(self, name: str):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self._leaders = coalesced_calls.labels(name, "leader")
+        self._followers = coalesced_calls.labels(name, "follower")
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        while key in self._calls:
+            self._followers.inc()
+
+            try:
+                # Shielded, so a follower being cancelled doesn't cancel the call of the others
+                return await asyncio.shield(self._calls[key])
+            except _LeaderCancelled:
+                continue
+
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self._leaders.inc()
+
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            self._fail(future, _LeaderCancelled())
+            raise
+        except Exception as error:
+            self._fail(future, error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    @staticmethod
+    def _fail(future: asyncio.Future, error: Exception):
+        future.set_exception(error)
+        # Marks the error as retrieved, so it isn't logged when there are no followers
+        future.exception()
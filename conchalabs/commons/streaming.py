@@ -0,0 +1,14 @@
+from collections.abc import AsyncIterator
+
+import orjson
+
+
+async def encode_ndjson(batches: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    """Encodes each batch of rows as a chunk of newline-delimited JSON.
+    The batches iterator is closed when the encoding stops, even if the client disconnects midway."""
+    try:
+        async for batch in batches:
+            if batch:
+                yield b"".join(orjson.dumps(row) + b"\n" for row in batch)
+    finally:
+        await batches.aclose()  # type: ignore
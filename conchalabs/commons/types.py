@@ -0,0 +1,58 @@
+import struct
+from array import array
+from collections.abc import Sequence
+
+from sqlalchemy import REAL
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import TypeDecorator
+
+# Any decimal with up to this many significant digits is kept by a round trip through float32
+FLOAT32_DECIMAL_DIGITS = 6
+
+
+class Float32Array(TypeDecorator):
+    """Stores a list of floats as a Postgres real[] (4 bytes per item).
+    The array is read in binary, and its items are converted to the shortest decimal that round-trips
+    the float32, so a stored -96.33 is read back as -96.33 instead of -96.33000183105469."""
+
+    impl = ARRAY(REAL)
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+
+        return to_float32_list(value)
+
+
+def to_float32(value: float) -> float:
+    """Rounds the value to float32 precision, returning the shortest decimal that round-trips it.
+    e.g. the -96.33000183105469 a real -96.33 becomes in double precision arithmetic is returned as -96.33."""
+    float32_value = struct.unpack("f", struct.pack("f", value))[0]
+
+    for precision in range(1, 10):
+        candidate = float(f"{float32_value:.{precision}g}")
+
+        if struct.unpack("f", struct.pack("f", candidate))[0] == float32_value:
+            return candidate
+
+    return float32_value
+
+
+def to_float32_list(values: Sequence[float]) -> list[float]:
+    """to_float32 of each value. Formatted with FLOAT32_DECIMAL_DIGITS, a float32 value is either its
+    shortest decimal or doesn't round-trip, so the values are formatted together, and only searched
+    for one by one when some of them don't round-trip."""
+    if not values:
+        return []
+
+    float32_values = array("f", values)
+    formatted = (f"%.{FLOAT32_DECIMAL_DIGITS}g," * len(float32_values)) % tuple(
+        float32_values
+    )
+    candidates = list(map(float, formatted[:-1].split(",")))
+
+    if array("f", candidates) == float32_values:
+        return candidates
+
+    return [to_float32(float32_value) for float32_value in float32_values]
@@ -0,0 +1,271 @@
+import functools
+import threading
+from collections.abc import Callable, Hashable, Sequence
+from typing import Generic, TypeVar
+
+import numpy as np
+
+Key = TypeVar("Key", bound=Hashable)
+Method = TypeVar("Method", bound=Callable)
+
+# The nearest candidates by the fast distance formula that get their distance recomputed exactly,
+# per neighbour asked for. It absorbs the float32 rounding of ||v||² - 2v·q + ||q||².
+RERANK_FACTOR = 4
+
+
+def _synchronized(method: Method) -> Method:
+    @functools.wraps(method)
+    def synchronized_method(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return synchronized_method  # type: ignore
+
+
+class VectorIndex(Generic[Key]):
+    """Exact nearest-neighbour index: keeps float32 vectors by key in one contiguous matrix and compares
+    the query against every vector by Euclidean distance.
+
+    Adding a key that is already indexed replaces its vector, and the slots of removed keys are reused
+    by the next additions, so the index can follow a table as it is written. The index can be used
+    from several threads, e.g. to search it off the event loop: its operations run one at a time."""
+
+    def __init__(self, dimensions: int, capacity: int = 1024):
+        self.dimensions = dimensions
+        self._vectors = np.zeros((capacity, dimensions), np.float32)
+        self._norms = np.zeros(capacity, np.float32)
+        self._alive = np.zeros(capacity, bool)
+        self._keys: list[Key | None] = [None] * capacity
+        self._positions: dict[Key, int] = {}
+        self._free_positions: list[int] = []
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._positions
+
+    @_synchronized
+    def add(self, keys: Sequence[Key], vectors):
+        vectors = np.asarray(vectors, np.float32).reshape(-1, self.dimensions)
+        positions = np.empty(len(keys), np.int64)
+
+        for index, key in enumerate(keys):
+            position = self._positions.get(key)
+
+            if position is None:
+                position = self._allocate()
+                self._positions[key] = position
+                self._keys[position] = key
+            else:
+                self._unassign(np.array([position]))
+
+            positions[index] = position
+
+        self._vectors[positions] = vectors
+        self._norms[positions] = np.einsum("ij,ij->i", vectors, vectors)
+        self._alive[positions] = True
+        self._assign(positions)
+
+    @_synchronized
+    def remove(self, keys: Sequence[Key]):
+        positions = np.array(
+            [self._positions.pop(key) for key in keys if key in self._positions],
+            np.int64,
+        )
+
+        if not len(positions):
+            return
+
+        self._unassign(positions)
+        self._alive[positions] = False
+
+        for position in positions.tolist():
+            self._keys[position] = None
+            self._free_positions.append(position)
+
+    @_synchronized
+    def search(self, vector, k: int) -> list[tuple[Key, float]]:
+        """Finds up to k indexed keys nearest to the vector, with their distances, nearest first."""
+        query = np.asarray(vector, np.float32).reshape(self.dimensions)
+        positions = self._candidates(query)
+
+        if positions is None:
+            vectors, norms = self._vectors[: self._size], self._norms[: self._size]
+            alive = self._alive[: self._size]
+            positions = np.arange(self._size)
+        else:
+            vectors, norms = self._vectors[positions], self._norms[positions]
+            alive = self._alive[positions]
+
+        if not len(positions):
+            return []
+
+        distances = norms - 2 * (vectors @ query)
+        distances[~alive] = np.inf
+
+        shortlist = min(k * RERANK_FACTOR, len(positions))
+        nearest = np.argpartition(distances, shortlist - 1)[:shortlist]
+        nearest = nearest[np.isfinite(distances[nearest])]
+
+        # Exact distances for the shortlist, which also orders it
+        differences = vectors[nearest] - query
+        exact_distances = np.sqrt(np.einsum("ij,ij->i", differences, differences))
+        order = np.argsort(exact_distances, kind="stable")[:k]
+
+        return [
+            (self._keys[position], float(distance))  # type: ignore
+            for position, distance in zip(
+                positions[nearest[order]].tolist(), exact_distances[order].tolist()
+            )
+        ]
+
+    def _candidates(self, query: np.ndarray) -> np.ndarray | None:
+        """Positions of the vectors to compare against the query, or None to compare against all of them."""
+        return None
+
+    def _assign(self, positions: np.ndarray):
+        pass
+
+    def _unassign(self, positions: np.ndarray):
+        pass
+
+    def _allocate(self) -> int:
+        if self._free_positions:
+            return self._free_positions.pop()
+
+        if self._size == len(self._vectors):
+            self._grow(2 * len(self._vectors))
+
+        self._size += 1
+        return self._size - 1
+
+    def _grow(self, capacity: int):
+        vectors = np.zeros((capacity, self.dimensions), np.float32)
+        vectors[: self._size] = self._vectors[: self._size]
+        norms = np.zeros(capacity, np.float32)
+        norms[: self._size] = self._norms[: self._size]
+        alive = np.zeros(capacity, bool)
+        alive[: self._size] = self._alive[: self._size]
+
+        self._vectors, self._norms, self._alive = vectors, norms, alive
+        self._keys.extend([None] * (capacity - len(self._keys)))
+
+
+class IVFVectorIndex(VectorIndex[Key]):
+    """Approximate nearest-neighbour index: once trained, the vectors are partitioned into `lists`
+    clusters by k-means and a query is only compared against the vectors of the `probes` clusters with
+    the nearest centroids. Until then, it compares against every vector like VectorIndex.
+
+    The vectors added after training join the cluster of their nearest centroid, so the clusters drift
+    from the data as it changes; training again, e.g. on a new index, restores the recall."""
+
+    def __init__(self, dimensions: int, lists: int, probes: int, capacity: int = 1024):
+        super().__init__(dimensions, capacity)
+        self.lists = lists
+        self.probes = probes
+        self._centroids: np.ndarray | None = None
+        self._assignments = np.full(capacity, -1, np.int64)
+        self._members: list[set[int]] = []
+        self._member_arrays: list[np.ndarray | None] = []
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    @_synchronized
+    def train(
+        self, sample_size: int | None = None, iterations: int = 10, seed: int = 0
+    ):
+        """Clusters a sample of the indexed vectors, by default 64 per list, with k-means and assigns
+        every vector to its nearest centroid. It is CPU bound, so callers on an event loop should run it
+        in a thread."""
+        positions = np.flatnonzero(self._alive[: self._size])
+
+        if not len(positions):
+            return
+
+        generator = np.random.default_rng(seed)
+        sample_size = min(sample_size or 64 * self.lists, len(positions))
+        sample = self._vectors[generator.choice(positions, sample_size, replace=False)]
+        lists = min(self.lists, sample_size)
+        centroids = sample[generator.choice(sample_size, lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignments = _nearest_centroids(sample, centroids)
+            counts = np.bincount(assignments, minlength=lists)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            # Empty clusters keep their centroid
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+
+        self._centroids = centroids
+        self._assignments[:] = -1
+        self._members = [set() for _ in range(lists)]
+        self._member_arrays = [None] * lists
+        self._assign(positions)
+
+    def _candidates(self, query: np.ndarray) -> np.ndarray | None:
+        if self._centroids is None:
+            return None
+
+        centroid_distances = ((self._centroids - query) ** 2).sum(axis=1)
+        probes = min(self.probes, len(self._centroids))
+        nearest_lists = np.argpartition(centroid_distances, probes - 1)[:probes]
+
+        return np.concatenate([self._member_array(list_) for list_ in nearest_lists])
+
+    def _assign(self, positions: np.ndarray):
+        if self._centroids is None or not len(positions):
+            return
+
+        assignments = _nearest_centroids(self._vectors[positions], self._centroids)
+        self._assignments[positions] = assignments
+
+        for position, list_ in zip(positions.tolist(), assignments.tolist()):
+            self._members[list_].add(position)
+            self._member_arrays[list_] = None
+
+    def _unassign(self, positions: np.ndarray):
+        if self._centroids is None:
+            return
+
+        for position in positions.tolist():
+            list_ = self._assignments[position]
+
+            if list_ >= 0:
+                self._members[list_].discard(position)
+                self._member_arrays[list_] = None
+                self._assignments[position] = -1
+
+    def _member_array(self, list_: int) -> np.ndarray:
+        member_array = self._member_arrays[list_]
+
+        if member_array is None:
+            member_array = np.fromiter(self._members[list_], np.int64)
+            self._member_arrays[list_] = member_array
+
+        return member_array
+
+    def _grow(self, capacity: int):
+        super()._grow(capacity)
+        assignments = np.full(capacity, -1, np.int64)
+        assignments[: len(self._assignments)] = self._assignments
+        self._assignments = assignments
+
+
+def _nearest_centroids(
+    vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 65_536
+) -> np.ndarray:
+    centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    assignments = np.empty(len(vectors), np.int64)
+
+    for start in range(0, len(vectors), batch_size):
+        batch = vectors[start : start + batch_size]
+        distances = centroid_norms - 2 * (batch @ centroids.T)
+        assignments[start : start + batch_size] = distances.argmin(axis=1)
+
+    return assignments
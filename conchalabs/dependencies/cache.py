@@ -0,0 +1,13 @@
+from conchalabs.commons.cache import CacheBackend, LRUCache
+from conchalabs.settings import settings
+
+# Replace with another CacheBackend (e.g. backed by Redis) to share the cache between processes.
+user_cache: CacheBackend | None = (
+    LRUCache(settings.user_cache_max_size, settings.user_cache_ttl)
+    if settings.user_cache_enabled
+    else None
+)
+
+
+def get_user_cache() -> CacheBackend | None:
+    return user_cache
@@ -0,0 +1,18 @@
+from conchalabs.commons.singleflight import SingleFlight
+from conchalabs.settings import settings
+
+# Coalescing is per process: identical reads in flight on other processes still run on their own.
+user_reads: SingleFlight | None = (
+    SingleFlight("user_reads") if settings.request_coalescing_enabled else None
+)
+user_audio_reads: SingleFlight | None = (
+    SingleFlight("user_audio_reads") if settings.request_coalescing_enabled else None
+)
+
+
+def get_user_reads() -> SingleFlight | None:
+    return user_reads
+
+
+def get_user_audio_reads() -> SingleFlight | None:
+    return user_audio_reads
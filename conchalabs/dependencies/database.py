@@ -1,18 +1,142 @@
-import asyncio
+import math
+import time
 
-from fastapi import Depends
-from sqlalchemy import text
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import create_async_engine
+from fastapi import Depends, Request, Response
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.routing import Match
+from starlette.types import Scope
 
+from conchalabs.commons.cache import CacheBackend
+from conchalabs.commons.singleflight import SingleFlight
+from conchalabs.dependencies.cache import get_user_cache
+from conchalabs.dependencies.coalescing import get_user_audio_reads, get_user_reads
+from conchalabs.dependencies.pool import InstrumentedAsyncQueuePool
+from conchalabs.dependencies.probe import DatabaseProbe
+from conchalabs.dependencies.replica import ReplicaMonitor
+from conchalabs.dependencies.timeouts import apply_statement_timeout
+from conchalabs.middlewares.disconnect import cancel_interrupted_queries
+from conchalabs.middlewares.instrumentation import instrument_engine
 from conchalabs.settings import settings
+from conchalabs.tick_percentiles.repositories.base import TickPercentilesRepository
+from conchalabs.tick_percentiles.repositories.postgres import (
+    PostgresTickPercentilesRepository,
+)
+from conchalabs.user_audios.ingestion import UserAudioWriteQueue
 from conchalabs.user_audios.repositories.base import UserAudioRepository
+from conchalabs.user_audios.repositories.coalescing import CoalescingUserAudioRepository
 from conchalabs.user_audios.repositories.postgres import PostgresUserAudioRepository
+from conchalabs.user_audios.similarity import TickIndexUpdater
 from conchalabs.users.repositories.base import UserRepository
+from conchalabs.users.repositories.cached import CachedUserRepository
+from conchalabs.users.repositories.coalescing import CoalescingUserRepository
 from conchalabs.users.repositories.postgres import PostgresUserRepository
 
-engine = create_async_engine(settings.database_url)
+READ_ONLY_METHODS = {"GET", "HEAD"}
+
+# Set on the responses to writes, so the reads that follow them are served by the primary
+PRIMARY_READS_COOKIE = "primary_reads_until"
+
+
+async def read_only_route(request: Request):
+    """Route dependency marking the requests of a route as read-only regardless of their method, e.g.
+    lookups that take their input as a POST body, so they are routed and coalesced like GET requests."""
+    request.state.read_only = True
+
+
+def is_read_only(request: Request) -> bool:
+    return request.method in READ_ONLY_METHODS or getattr(
+        request.state, "read_only", False
+    )
+
+
+def is_read_only_scope(scope: Scope) -> bool:
+    """is_read_only for middlewares, which run before the route dependencies: looks up the route the
+    request would be handled by and checks whether it depends on read_only_route."""
+    if scope["method"] in READ_ONLY_METHODS:
+        return True
+
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+
+        if match == Match.FULL:
+            return isinstance(route, APIRoute) and _depends_on(
+                route.dependant, read_only_route
+            )
+
+    return False
+
+
+def _depends_on(dependant: Dependant, dependency) -> bool:
+    return any(
+        sub_dependant.call is dependency or _depends_on(sub_dependant, dependency)
+        for sub_dependant in dependant.dependencies
+    )
+
+
+def _create_engine(url: str, **kwargs) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={
+            "prepared_statement_cache_size": settings.db_statement_cache_size
+        },
+        **kwargs,
+    )
+
+
+engine = _create_engine(settings.database_url, poolclass=InstrumentedAsyncQueuePool)
+instrument_engine(engine)
+cancel_interrupted_queries(engine)
+
+replica_engine: AsyncEngine | None = None
+replica_monitor: ReplicaMonitor | None = None
+
+if settings.database_replica_url:
+    replica_engine = _create_engine(settings.database_replica_url)
+    instrument_engine(replica_engine)
+    cancel_interrupted_queries(replica_engine)
+    replica_monitor = ReplicaMonitor(
+        replica_engine,
+        max_lag=settings.db_replica_max_lag,
+        check_interval=settings.db_replica_check_interval,
+        timeout=settings.db_replica_check_timeout,
+    )
+
+database_probe = DatabaseProbe(
+    engine,
+    interval=settings.db_health_check_interval,
+    timeout=settings.db_ping_timeout,
+)
+
+user_audio_write_queue: UserAudioWriteQueue | None = None
+
+if settings.audio_write_queue_enabled:
+    user_audio_write_queue = UserAudioWriteQueue(
+        engine,
+        batch_size=settings.audio_write_queue_batch_size,
+        flush_interval=settings.audio_write_queue_flush_interval,
+        max_size=settings.audio_write_queue_max_size,
+    )
+
+tick_index_updater: TickIndexUpdater | None = None
+
+if settings.similarity_index != "disabled":
+    # The full scans of the rebuilds go to the replica when there is one
+    tick_index_updater = TickIndexUpdater(
+        replica_engine or engine,
+        kind=settings.similarity_index,
+        interval=settings.similarity_refresh_interval,
+        rebuild_interval=settings.similarity_rebuild_interval,
+        ivf_lists=settings.similarity_ivf_lists,
+        ivf_probes=settings.similarity_ivf_probes,
+    )
 
 
 async def get_db_session():
@@ -20,24 +144,110 @@ async def get_db_session():
         yield session
 
 
+async def get_routed_db_session(request: Request, response: Response):
+    """Serves read-only requests (GET, HEAD and read_only_route) from the replica while it is healthy
+    and caught up. Writes, and everything else, stay on the primary so they can read their own writes.
+    So do the reads of a client for db_replica_max_lag seconds after its last write, by a cookie set on
+    the response to the write, which the replica may not have replayed yet.
+    The statements of the session are limited by the StatementTimeout of the route, if any."""
+    session_engine = engine
+
+    if replica_engine is not None and replica_monitor is not None:
+        if not is_read_only(request):
+            _set_primary_reads_cookie(response)
+        elif not _has_recent_write(request) and await replica_monitor.is_healthy():
+            session_engine = replica_engine
+
+    async with AsyncSession(session_engine, expire_on_commit=False) as session:
+        apply_statement_timeout(session, request)
+        yield session
+
+
+def _set_primary_reads_cookie(response: Response):
+    response.set_cookie(
+        PRIMARY_READS_COOKIE,
+        str(time.time() + settings.db_replica_max_lag),
+        max_age=math.ceil(settings.db_replica_max_lag),
+        httponly=True,
+    )
+
+
+def _has_recent_write(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_READS_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _coalescing_scope(request: Request, session: AsyncSession) -> tuple:
+    # A follower gets what the leader read, from its database and within its statement timeout,
+    # which the route dependencies have set by now.
+    target = "replica" if session.bind is replica_engine else "primary"
+
+    return target, getattr(request.state, "statement_timeout", None)
+
+
 def get_user_repository(
-    session: AsyncSession = Depends(get_db_session),
+    request: Request,
+    session: AsyncSession = Depends(get_routed_db_session),
+    cache: CacheBackend | None = Depends(get_user_cache),
+    reads: SingleFlight | None = Depends(get_user_reads),
 ) -> UserRepository:
-    return PostgresUserRepository(session)
+    repository: UserRepository = PostgresUserRepository(session)
+
+    if cache is not None:
+        # The users read from the replica may be as old as its allowed lag
+        max_staleness = (
+            settings.db_replica_max_lag if session.bind is replica_engine else 0.0
+        )
+        repository = CachedUserRepository(repository, cache, max_staleness)
+
+    # Coalesced calls share the ORM objects loaded by another request's session, so only requests
+    # that don't write them back take part.
+    if reads is not None and is_read_only(request):
+        repository = CoalescingUserRepository(
+            repository, reads, _coalescing_scope(request, session)
+        )
+
+    return repository
 
 
 def get_user_audio_repository(
-    session: AsyncSession = Depends(get_db_session),
+    request: Request,
+    session: AsyncSession = Depends(get_routed_db_session),
+    reads: SingleFlight | None = Depends(get_user_audio_reads),
 ) -> UserAudioRepository:
-    return PostgresUserAudioRepository(session)
+    repository: UserAudioRepository = PostgresUserAudioRepository(session)
 
-
-async def is_database_online(session: AsyncSession = Depends(get_db_session)) -> bool:
-    try:
-        await asyncio.wait_for(
-            session.execute(text("SELECT 1")), timeout=settings.db_ping_timeout
+    if reads is not None and is_read_only(request):
+        repository = CoalescingUserAudioRepository(
+            repository, reads, _coalescing_scope(request, session)
         )
-    except (SQLAlchemyError, ConnectionRefusedError, TimeoutError):
-        return False
 
-    return True
+    return repository
+
+
+def get_tick_percentiles_repository(
+    session: AsyncSession = Depends(get_routed_db_session),
+) -> TickPercentilesRepository:
+    return PostgresTickPercentilesRepository(session)
+
+
+def get_user_audio_write_queue() -> UserAudioWriteQueue | None:
+    return user_audio_write_queue
+
+
+def get_tick_index_updater() -> TickIndexUpdater | None:
+    return tick_index_updater
+
+
+def get_database_probe() -> DatabaseProbe:
+    return database_probe
+
+
+async def is_database_online(
+    probe: DatabaseProbe = Depends(get_database_probe),
+) -> bool:
+    status = await probe.get_status()
+
+    return status.online
@@ -0,0 +1,55 @@
+import time
+
+from pydantic import BaseModel
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from conchalabs.commons.metrics import Counter, Histogram, HistogramSnapshot, registry
+from conchalabs.settings import settings
+
+checkout_wait_seconds: Histogram = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection from the pool.",
+).labels()
+checkout_timeouts: Counter = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Database connection checkouts that timed out waiting for the pool.",
+).labels()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection, including the time
+    spent on pre-ping and on opening new connections, and how many checkouts timed out."""
+
+    def connect(self):
+        start = time.perf_counter()
+
+        try:
+            return super().connect()
+        except TimeoutError:
+            checkout_timeouts.inc()
+            raise
+        finally:
+            checkout_wait_seconds.observe(time.perf_counter() - start)
+
+
+class PoolStats(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    timeouts: int
+    wait_seconds: HistogramSnapshot
+
+
+def get_pool_stats(pool: QueuePool) -> PoolStats:
+    return PoolStats(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=max(pool.overflow(), 0),
+        max_overflow=settings.db_max_overflow,
+        timeouts=checkout_timeouts.value,
+        wait_seconds=checkout_wait_seconds.snapshot(),
+    )
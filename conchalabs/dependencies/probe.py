@@ -0,0 +1,82 @@
+import asyncio
+import contextlib
+import time
+from datetime import datetime
+
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class DatabaseStatus(BaseModel):
+    online: bool
+    latency: float | None = None
+    checked_at: datetime | None = None
+
+
+class DatabaseProbe:
+    """Keeps the last known database status, refreshed every interval seconds by a background task.
+    When the status is older than two intervals, e.g. the task is not running, the next caller probes inline."""
+
+    def __init__(self, engine: AsyncEngine, interval: float, timeout: float):
+        self._engine = engine
+        self._interval = interval
+        self._timeout = timeout
+        self._status = DatabaseStatus(online=False)
+        self._probed_at = float("-inf")
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def get_status(self) -> DatabaseStatus:
+        if self._is_stale():
+            async with self._lock:
+                if self._is_stale():
+                    await self.probe()
+
+        return self._status
+
+    async def probe(self) -> DatabaseStatus:
+        start = time.perf_counter()
+
+        try:
+            async with asyncio.timeout(self._timeout):
+                await self._ping()
+        except (SQLAlchemyError, OSError, TimeoutError):
+            self._status = DatabaseStatus(online=False, checked_at=datetime.utcnow())
+        else:
+            self._status = DatabaseStatus(
+                online=True,
+                latency=time.perf_counter() - start,
+                checked_at=datetime.utcnow(),
+            )
+
+        self._probed_at = time.monotonic()
+        return self._status
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+        self._task = None
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._probed_at >= 2 * self._interval
+
+    async def _run(self):
+        while True:
+            await self.probe()
+            await asyncio.sleep(self._interval)
+
+    async def _ping(self):
+        async with self._engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
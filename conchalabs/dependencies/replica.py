@@ -0,0 +1,92 @@
+import asyncio
+import contextlib
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+REPLICATION_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaMonitor:
+    """Tracks whether the replica is reachable and no more than max_lag seconds behind the primary.
+    The state is refreshed every check_interval seconds by a background task, so the requests never wait
+    for a slow or unreachable replica. When the state is older than two intervals, e.g. the task is not
+    running, the replica counts as unhealthy while a single refresh runs in the background."""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_lag: float,
+        check_interval: float,
+        timeout: float,
+    ):
+        self._engine = engine
+        self._max_lag = max_lag
+        self._check_interval = check_interval
+        self._timeout = timeout
+        self._healthy = False
+        self._checked_at = float("-inf")
+        self._task: asyncio.Task | None = None
+        self._refresh_task: asyncio.Task | None = None
+
+    async def is_healthy(self) -> bool:
+        if not self._is_stale():
+            return self._healthy
+
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+        return False
+
+    async def refresh(self) -> bool:
+        self._healthy = await self._check()
+        self._checked_at = time.monotonic()
+
+        return self._healthy
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._task, self._refresh_task):
+            if task is None:
+                continue
+
+            task.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+        self._task = None
+        self._refresh_task = None
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._checked_at >= 2 * self._check_interval
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self._check_interval)
+
+    async def _check(self) -> bool:
+        try:
+            async with asyncio.timeout(self._timeout):
+                lag = await self._get_lag()
+        except (SQLAlchemyError, OSError, TimeoutError):
+            return False
+
+        return lag <= self._max_lag
+
+    async def _get_lag(self) -> float:
+        async with self._engine.connect() as connection:
+            return float(await connection.scalar(REPLICATION_LAG_QUERY))
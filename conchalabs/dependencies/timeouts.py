@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import DBAPIError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from conchalabs.settings import settings
+
+QUERY_CANCELED = "57014"
+
+
+class StatementTimeout:
+    """Route dependency that limits how long each SQL statement of the request may run, by the
+    db_statement_timeout_<route_class> setting. It takes effect on the sessions of
+    get_routed_db_session, so it doesn't matter in which order the dependencies are solved."""
+
+    def __init__(self, route_class: str):
+        self.route_class = route_class
+
+    async def __call__(self, request: Request):
+        request.state.statement_timeout = getattr(
+            settings, f"db_statement_timeout_{self.route_class}"
+        )
+
+
+lookup_timeout = StatementTimeout("lookup")
+listing_timeout = StatementTimeout("listing")
+export_timeout = StatementTimeout("export")
+
+
+def apply_statement_timeout(session: AsyncSession, request: Request):
+    """Runs the equivalent of SET LOCAL statement_timeout at the start of every transaction of the
+    session, with the timeout the route of the request set, if any. Statements over it fail with
+    a DBAPIError with the query_canceled SQLSTATE."""
+
+    def set_statement_timeout(sync_session, transaction, connection):
+        timeout = getattr(request.state, "statement_timeout", None)
+
+        if timeout is not None:
+            connection.execute(
+                select(
+                    func.set_config(
+                        "statement_timeout", f"{round(timeout * 1000)}ms", True
+                    )
+                )
+            )
+
+    event.listen(session.sync_session, "after_begin", set_statement_timeout)
+
+
+async def handle_statement_timeout(request: Request, error: DBAPIError):
+    """Exception handler answering the requests whose statement ran over its timeout with a 503.
+    Any other database error is raised again."""
+    if getattr(error.orig, "sqlstate", None) != QUERY_CANCELED:
+        raise error
+
+    return JSONResponse(
+        {"detail": "The query took too long"},
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+    )
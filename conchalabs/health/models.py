@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+from conchalabs.dependencies.pool import PoolStats
+from conchalabs.dependencies.probe import DatabaseStatus
+
+
+class DeepHealth(BaseModel):
+    database: DatabaseStatus
+    replica_online: bool | None
+    pool: PoolStats
+    pool_saturation: float
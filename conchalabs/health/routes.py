@@ -0,0 +1,42 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, Response
+
+from conchalabs.dependencies import database
+from conchalabs.dependencies.database import get_database_probe
+from conchalabs.dependencies.pool import get_pool_stats
+from conchalabs.dependencies.probe import DatabaseProbe
+from conchalabs.health.models import DeepHealth
+from conchalabs.middlewares.instrumentation import InstrumentedRoute
+
+router = APIRouter(
+    prefix="/health",
+    tags=["Health"],
+    route_class=InstrumentedRoute,
+)
+
+
+@router.get("/deep", response_model=DeepHealth)
+async def deep_health_check(
+    response: Response,
+    probe: DatabaseProbe = Depends(get_database_probe),
+):
+    status = await probe.probe()
+    pool = get_pool_stats(database.engine.pool)  # type: ignore
+    replica_online = None
+
+    if database.replica_monitor is not None:
+        replica_online = await database.replica_monitor.is_healthy()
+
+    if not status.online:
+        response.status_code = HTTPStatus.SERVICE_UNAVAILABLE
+
+    # Zero for pools that keep no connections, e.g. with db_pool_size=0
+    capacity = pool.size + pool.max_overflow
+
+    return DeepHealth(
+        database=status,
+        replica_online=replica_online,
+        pool=pool,
+        pool_saturation=pool.checked_out / capacity if capacity > 0 else 0.0,
+    )
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from conchalabs.commons.cache import CacheBackend, CacheStats
+from conchalabs.commons.metrics import registry
+from conchalabs.dependencies.cache import get_user_cache
+from conchalabs.dependencies.database import engine
+from conchalabs.dependencies.pool import PoolStats, get_pool_stats
+from conchalabs.middlewares.instrumentation import InstrumentedRoute
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    include_in_schema=False,
+    route_class=InstrumentedRoute,
+)
+
+
+@router.get("/cache", response_model=dict[str, CacheStats])
+async def get_cache_stats(
+    user_cache: CacheBackend | None = Depends(get_user_cache),
+):
+    if user_cache is None:
+        return {}
+
+    return {"users": user_cache.stats()}
+
+
+@router.get("/pool", response_model=PoolStats)
+async def get_database_pool_stats():
+    return get_pool_stats(engine.pool)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(
+        registry.expose(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,149 @@
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import Sequence
+from http import HTTPStatus
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from conchalabs.commons.metrics import registry
+from conchalabs.dependencies.database import is_read_only_scope
+
+# Waiting requests are admitted in this order as slots free up
+PRIORITIES = ("write", "read")
+
+admission_requests_total = registry.counter(
+    "admission_requests_total",
+    "Requests seen by the admission control, by priority class and whether they were admitted, "
+    "rejected because the wait queue was full, or timed out waiting.",
+    ("priority", "outcome"),
+)
+admission_wait_seconds = registry.histogram(
+    "admission_wait_seconds",
+    "Time admitted requests spent waiting for a slot.",
+    ("priority",),
+)
+
+
+class AdmissionController:
+    """Limits the requests handled at once to `limit`. Requests over it wait for a slot in a bounded
+    queue per priority class, and are turned away when their queue is full or when they have waited
+    for `timeout` seconds. Freed slots go to the waiting writes first, then to the waiting reads."""
+
+    def __init__(self, limit: int, max_waiting: dict[str, int], timeout: float):
+        self.limit = limit
+        self.timeout = timeout
+        self._max_waiting = max_waiting
+        self._in_flight = 0
+        self._waiters: dict[str, deque[asyncio.Future]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def waiting(self, priority: str) -> int:
+        return sum(not waiter.done() for waiter in self._waiters[priority])
+
+    async def acquire(self, priority: str) -> bool:
+        """Waits for a slot and returns whether one was given. Callers given one must release it."""
+        if self._in_flight < self.limit and not any(self._waiters.values()):
+            self._in_flight += 1
+            self._observe(priority, "admitted", 0.0)
+            return True
+
+        waiters = self._waiters[priority]
+
+        if len(waiters) >= self._max_waiting[priority]:
+            self._observe(priority, "rejected")
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        start = time.perf_counter()
+
+        try:
+            async with asyncio.timeout(self.timeout):
+                await waiter
+        except TimeoutError:
+            self._forget(waiters, waiter)
+            self._observe(priority, "timed_out")
+            return False
+        except asyncio.CancelledError:
+            self._forget(waiters, waiter)
+            raise
+
+        self._observe(priority, "admitted", time.perf_counter() - start)
+        return True
+
+    def release(self):
+        # The slot is handed over to the next waiter, so in_flight stays the same
+        for waiters in self._waiters.values():
+            while waiters:
+                waiter = waiters.popleft()
+
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+
+        self._in_flight -= 1
+
+    def _forget(self, waiters: deque[asyncio.Future], waiter: asyncio.Future):
+        if waiter.done() and not waiter.cancelled():
+            # The slot was given as the wait ended
+            self.release()
+            return
+
+        waiter.cancel()
+
+        with contextlib.suppress(ValueError):
+            waiters.remove(waiter)
+
+    @staticmethod
+    def _observe(priority: str, outcome: str, wait: float | None = None):
+        admission_requests_total.labels(priority, outcome).inc()
+
+        if wait is not None:
+            admission_wait_seconds.labels(priority).observe(wait)
+
+
+class AdmissionControlMiddleware:
+    """Sheds load before it reaches the database pool: requests the AdmissionController doesn't admit
+    get a 503 with Retry-After right away instead of waiting for a connection until they time out.
+    Requests to the exempt paths, such as the health checks and metrics, are always handled."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        retry_after: int = 1,
+        exempt_paths: Sequence[str] = ("/health", "/internal"),
+    ):
+        self.app = app
+        self.controller = controller
+        self.retry_after = retry_after
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        priority = "read" if is_read_only_scope(scope) else "write"
+
+        if not await self.controller.acquire(priority):
+            response = JSONResponse(
+                {"detail": "The server is overloaded, try again later"},
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
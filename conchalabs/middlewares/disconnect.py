@@ -0,0 +1,140 @@
+import asyncio
+import contextlib
+import logging
+
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from conchalabs.middlewares.instrumentation import current_request_metrics
+
+logger = logging.getLogger(__name__)
+
+# Not an official status code: the one nginx logs when the client closed the connection first
+CLIENT_CLOSED_REQUEST = 499
+
+_cancellations: set[asyncio.Task] = set()
+
+
+def cancel_interrupted_queries(engine: AsyncEngine):
+    """When the task running a query is cancelled, SQLAlchemy closes the connection, which also drops
+    the cancel request asyncpg was sending for the query, and PostgreSQL runs it to completion anyway.
+    This cancels the query of such connections with pg_cancel_backend, from another connection."""
+
+    def cancel_backend_query(dbapi_connection, connection_record, exception):
+        if not isinstance(exception, asyncio.CancelledError):
+            return
+
+        pid = connection_record.driver_connection.get_server_pid()
+        task = asyncio.get_running_loop().create_task(_cancel_backend(engine, pid))
+        _cancellations.add(task)
+        task.add_done_callback(_cancellations.discard)
+
+    event.listen(engine.sync_engine, "invalidate", cancel_backend_query)
+
+
+async def _cancel_backend(engine: AsyncEngine, pid: int):
+    # Not a statement of the request that was cancelled
+    current_request_metrics.set(None)
+
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(select(func.pg_cancel_backend(pid)))
+    except (SQLAlchemyError, OSError):
+        logger.exception("Failed to cancel the query of backend %d", pid)
+
+
+class DisconnectCancellationMiddleware:
+    """Cancels the handling of a request when its client disconnects before the response is sent, which
+    cancels the in-flight query and returns its connection to the pool instead of running the query to
+    completion for nobody. Nothing is cancelled once the response is complete, e.g. background tasks.
+
+    The request body is read upfront, like the JSON endpoints do anyway, so that the app and the
+    disconnect watcher don't compete for the messages of the client."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        messages = await self._read_body(receive)
+
+        if messages[-1]["type"] == "http.disconnect":
+            # Nobody reads it either, but returning without a response is logged as an error and
+            # counted as a 500 by the instrumentation
+            await Response(status_code=CLIENT_CLOSED_REQUEST)(scope, receive, send)
+            return
+
+        disconnected = asyncio.Event()
+        response_started = False
+        response_complete = False
+
+        async def replay_receive() -> Message:
+            if messages:
+                return messages.pop(0)
+
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def tracking_send(message: Message):
+            nonlocal response_started, response_complete
+
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                response_complete = True
+
+            await send(message)
+
+        async def handle():
+            await self.app(scope, replay_receive, tracking_send)
+
+        handler = asyncio.create_task(handle())
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+            disconnected.set()
+
+            if not response_complete:
+                handler.cancel()
+
+        watcher = asyncio.create_task(watch_disconnect())
+
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnected.is_set():
+                # This middleware itself was cancelled, e.g. on shutdown
+                raise
+
+            if not response_started:
+                # Nobody reads it, but it labels the request in the instrumentation
+                await Response(status_code=CLIENT_CLOSED_REQUEST)(
+                    scope, replay_receive, send
+                )
+        finally:
+            handler.cancel()
+            watcher.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await watcher
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> list[Message]:
+        messages = []
+
+        while True:
+            message = await receive()
+            messages.append(message)
+
+            if message["type"] != "http.request" or not message.get("more_body", False):
+                return messages
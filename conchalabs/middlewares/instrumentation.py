@@ -0,0 +1,193 @@
+import asyncio
+import functools
+import time
+from contextvars import ContextVar
+from http import HTTPStatus
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.future import Engine
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from conchalabs.commons.metrics import COUNT_BUCKETS, registry
+
+UNMATCHED_ROUTE = "unmatched"
+
+requests_total = registry.counter(
+    "http_requests_total",
+    "HTTP requests handled.",
+    ("method", "route", "status"),
+)
+request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests.",
+    ("method", "route"),
+)
+request_db_statements = registry.histogram(
+    "http_request_db_statements",
+    "SQL statements executed per HTTP request.",
+    ("method", "route"),
+    buckets=COUNT_BUCKETS,
+)
+request_db_seconds = registry.histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements per HTTP request.",
+    ("method", "route"),
+)
+request_serialization_seconds = registry.histogram(
+    "http_request_serialization_seconds",
+    "Time spent validating and serializing the response per HTTP request.",
+    ("method", "route"),
+)
+
+
+class SlowStatement:
+    def __init__(self, engine: Engine, statement: str, parameters, duration: float):
+        self.engine = engine
+        self.statement = statement
+        self.parameters = parameters
+        self.duration = duration
+
+
+class RequestMetrics:
+    def __init__(self, method: str, route: str) -> None:
+        self.method = method
+        self.route = route
+        self.statement_count = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+        self.endpoint_finished_at: float | None = None
+        self.slow_query_threshold: float | None = None
+        self.slow_statements: list[SlowStatement] = []
+
+
+current_request_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._instrumentation_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = current_request_metrics.get()
+
+    if metrics is None:
+        return
+
+    duration = time.perf_counter() - context._instrumentation_started_at
+    metrics.statement_count += 1
+    metrics.db_time += duration
+
+    if (
+        metrics.slow_query_threshold is not None
+        and duration >= metrics.slow_query_threshold
+    ):
+        metrics.slow_statements.append(
+            SlowStatement(conn.engine, statement, parameters, duration)
+        )
+
+
+def instrument_engine(engine: AsyncEngine):
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class InstrumentedRoute(APIRoute):
+    """Records the time between the endpoint returning and the response being ready,
+    which is spent validating the result against the response model and rendering it."""
+
+    def get_route_handler(self):
+        endpoint = self.dependant.call
+
+        if asyncio.iscoroutinefunction(endpoint):
+            self.dependant.call = self._time_endpoint(endpoint)
+
+        route_handler = super().get_route_handler()
+
+        async def instrumented_route_handler(request):
+            response = await route_handler(request)
+            metrics = current_request_metrics.get()
+
+            if metrics is not None and metrics.endpoint_finished_at is not None:
+                metrics.serialization_time += (
+                    time.perf_counter() - metrics.endpoint_finished_at
+                )
+
+            return response
+
+        return instrumented_route_handler
+
+    @staticmethod
+    def _time_endpoint(endpoint):
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            metrics = current_request_metrics.get()
+
+            if metrics is not None:
+                metrics.endpoint_finished_at = time.perf_counter()
+
+            return result
+
+        return timed_endpoint
+
+
+class InstrumentationMiddleware:
+    """Records latency, SQL statement count, DB time and serialization time for each request,
+    labelled with the path template of the route that handled it."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics(scope["method"], _get_route_path(scope))
+        status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+            await send(message)
+
+        token = current_request_metrics.set(metrics)
+        start = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            current_request_metrics.reset(token)
+            self._observe(metrics, int(status_code), duration)
+
+    @staticmethod
+    def _observe(metrics: RequestMetrics, status_code: int, duration: float):
+        method = metrics.method
+        route = metrics.route
+
+        requests_total.labels(method, route, str(status_code)).inc()
+        request_duration_seconds.labels(method, route).observe(duration)
+        request_db_statements.labels(method, route).observe(metrics.statement_count)
+        request_db_seconds.labels(method, route).observe(metrics.db_time)
+        request_serialization_seconds.labels(method, route).observe(
+            metrics.serialization_time
+        )
+
+
+def _get_route_path(scope: Scope) -> str:
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+
+        if match == Match.FULL:
+            return route.path
+
+    return UNMATCHED_ROUTE
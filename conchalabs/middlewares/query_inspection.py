@@ -0,0 +1,139 @@
+import logging
+from http import HTTPStatus
+
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from conchalabs.commons.errors import StatementBudgetExceededError
+from conchalabs.middlewares.instrumentation import (
+    RequestMetrics,
+    SlowStatement,
+    current_request_metrics,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryInspectionMiddleware:
+    """Development aid that flags requests issuing more SQL statements than the budget, and logs
+    the EXPLAIN (ANALYZE, BUFFERS) plan of SELECT statements slower than the threshold.
+    It relies on the metrics collected by InstrumentationMiddleware, so it must be added inside it.
+
+    In "raise" mode, a request over the budget when its response starts gets a 500 instead, and the
+    StatementBudgetExceededError is raised once it is sent. Streamed responses can only be flagged
+    after they are sent, for the statements issued while streaming."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        statement_budget: int | None = None,
+        budget_mode: str = "warn",
+        slow_query_threshold: float | None = None,
+    ):
+        self.app = app
+        self.statement_budget = statement_budget
+        self.budget_mode = budget_mode
+        self.slow_query_threshold = slow_query_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        metrics = current_request_metrics.get()
+
+        if scope["type"] != "http" or metrics is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self._inspect(scope, receive, send, metrics)
+
+    async def _inspect(
+        self, scope: Scope, receive: Receive, send: Send, metrics: RequestMetrics
+    ):
+        metrics.slow_query_threshold = self.slow_query_threshold
+        rejected = False
+
+        async def budget_checking_send(message: Message):
+            nonlocal rejected
+
+            if message["type"] == "http.response.start" and self.budget_mode == "raise":
+                exceeded_message = self._exceeded_budget_message(metrics)
+
+                if exceeded_message is not None:
+                    rejected = True
+                    response = JSONResponse(
+                        {"detail": exceeded_message},
+                        status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                    )
+                    await response(scope, receive, send)
+
+            if not rejected:
+                await send(message)
+
+        try:
+            await self.app(scope, receive, budget_checking_send)
+        finally:
+            await self._explain_slow_statements(metrics)
+
+        self._check_statement_budget(metrics)
+
+    def _check_statement_budget(self, metrics: RequestMetrics):
+        message = self._exceeded_budget_message(metrics)
+
+        if message is None:
+            return
+
+        if self.budget_mode == "raise":
+            raise StatementBudgetExceededError(message)
+
+        logger.warning(message)
+
+    def _exceeded_budget_message(self, metrics: RequestMetrics) -> str | None:
+        if (
+            self.statement_budget is None
+            or metrics.statement_count <= self.statement_budget
+        ):
+            return None
+
+        return (
+            f"{metrics.method} {metrics.route} executed {metrics.statement_count} "
+            f"SQL statements, over the budget of {self.statement_budget}"
+        )
+
+    async def _explain_slow_statements(self, metrics: RequestMetrics):
+        slow_statements = [
+            slow_statement
+            for slow_statement in metrics.slow_statements
+            if slow_statement.statement.lstrip().upper().startswith("SELECT")
+        ]
+
+        if not slow_statements:
+            return
+
+        # The EXPLAIN statements must not count towards the request being inspected.
+        token = current_request_metrics.set(None)
+
+        try:
+            for slow_statement in slow_statements:
+                plan = await self._explain(slow_statement)
+                logger.warning(
+                    "Slow query on %s %s took %.3fs:\n%s\n%s",
+                    metrics.method,
+                    metrics.route,
+                    slow_statement.duration,
+                    slow_statement.statement,
+                    plan,
+                )
+        finally:
+            current_request_metrics.reset(token)
+
+    @staticmethod
+    async def _explain(slow_statement: SlowStatement) -> str:
+        try:
+            async with AsyncEngine(slow_statement.engine).connect() as connection:
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {slow_statement.statement}",
+                    slow_statement.parameters,
+                )
+                return "\n".join(row[0] for row in result)
+        except SQLAlchemyError as error:
+            return f"EXPLAIN failed: {error}"
@@ -1,10 +1,56 @@
+from typing import Literal
+
 from pydantic import BaseSettings
 
 
 class Settings(BaseSettings):
     database_url: str
+    database_replica_url: str | None = None
     api_base_url: str = "http://localhost:8000"
     db_ping_timeout: int = 10
+    db_health_check_interval: float = 5.0
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    db_statement_cache_size: int = 100
+    db_replica_max_lag: float = 5.0
+    db_replica_check_interval: float = 5.0
+    db_replica_check_timeout: float = 1.0
+    db_statement_budget: int | None = None
+    db_statement_budget_mode: Literal["warn", "raise"] = "warn"
+    db_slow_query_threshold: float | None = None
+    # Seconds each SQL statement may run, by route class, see dependencies.timeouts
+    db_statement_timeout_lookup: float | None = None
+    db_statement_timeout_listing: float | None = None
+    db_statement_timeout_export: float | None = None
+    cancel_on_disconnect: bool = True
+    admission_control_enabled: bool = False
+    # Defaults to the connections the pool can open, db_pool_size + db_max_overflow
+    admission_max_concurrency: int | None = None
+    admission_max_waiting_reads: int = 50
+    admission_max_waiting_writes: int = 100
+    admission_queue_timeout: float = 1.0
+    admission_retry_after: int = 1
+    default_page_size: int = 50
+    max_page_size: int = 500
+    fast_json_responses: bool = False
+    export_batch_size: int = 1000
+    user_cache_enabled: bool = False
+    user_cache_max_size: int = 10_000
+    user_cache_ttl: float = 60.0
+    request_coalescing_enabled: bool = False
+    audio_write_queue_enabled: bool = False
+    audio_write_queue_batch_size: int = 100
+    audio_write_queue_flush_interval: float = 0.01
+    audio_write_queue_max_size: int = 10_000
+    audio_write_queue_retry_after: int = 1
+    similarity_index: Literal["disabled", "exact", "ivf"] = "disabled"
+    similarity_refresh_interval: float = 5.0
+    similarity_rebuild_interval: float = 3600.0
+    similarity_ivf_lists: int = 1024
+    similarity_ivf_probes: int = 16
 
     class Config:
         env_file = ".env"
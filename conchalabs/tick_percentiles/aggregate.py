@@ -0,0 +1,193 @@
+"""Aggregates the percentiles of each tick position across all user audios, by step_count.
+
+The audios are read from a server-side cursor in (created_at, id) order and counted into one
+TickHistogram per (step_count, tick_index). The histograms, their percentiles and a watermark with the
+last audio read are stored together in a single transaction, so the next run only reads the audios
+created after it:
+
+    python -m conchalabs.tick_percentiles.aggregate
+    python -m conchalabs.tick_percentiles.aggregate --full
+
+Audios created less than `lag` seconds ago are left to the next run, since a transaction still in
+flight may commit an audio older than the ones already read. Updates and deletions of audios already
+aggregated are not reflected; --full rebuilds the histograms from scratch.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from conchalabs.dependencies.database import engine
+from conchalabs.tick_percentiles.errors import ConcurrentAggregationError
+from conchalabs.tick_percentiles.models import AggregationWatermark, TickPercentiles
+from conchalabs.tick_percentiles.sketch import TickHistogram
+from conchalabs.user_audios.models import UserAudio
+
+WATERMARK_NAME = "tick_percentiles"
+PERCENTILES = {"p5": 0.05, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p95": 0.95}
+
+
+async def _load_histograms(
+    session: AsyncSession,
+) -> dict[tuple[int, int], TickHistogram]:
+    result = await session.execute(
+        select(
+            TickPercentiles.step_count,
+            TickPercentiles.tick_index,
+            TickPercentiles.histogram,
+        )
+    )
+    return {
+        (step_count, tick_index): TickHistogram(histogram)
+        for step_count, tick_index, histogram in result
+    }
+
+
+async def _lock_watermark(session: AsyncSession) -> tuple[datetime, str] | None:
+    watermark = await session.get(
+        AggregationWatermark, WATERMARK_NAME, with_for_update=True
+    )
+
+    if watermark is None:
+        return None
+
+    return watermark.created_at, str(watermark.id)
+
+
+async def aggregate_tick_percentiles(
+    full: bool = False,
+    lag: float = 60.0,
+    batch_size: int = 10_000,
+    source: AsyncEngine = engine,
+) -> int:
+    """Counts the audios created since the last run into the stored histograms, or every audio if
+    `full` is set, and stores the updated percentiles. Returns how many audios were counted.
+    Raises ConcurrentAggregationError if another run stored its results in the meantime."""
+    async with AsyncSession(source, expire_on_commit=False) as session:
+        watermark = await session.get(AggregationWatermark, WATERMARK_NAME)
+        previous_watermark = (
+            (watermark.created_at, str(watermark.id)) if watermark else None
+        )
+        histograms = {} if full else await _load_histograms(session)
+        await session.commit()
+
+    query = (
+        select(
+            UserAudio.created_at, UserAudio.id, UserAudio.step_count, UserAudio.ticks
+        )
+        .where(UserAudio.created_at < datetime.utcnow() - timedelta(seconds=lag))
+        .where(UserAudio.ticks.is_not(None))  # type: ignore
+        .order_by(UserAudio.created_at, UserAudio.id)
+    )
+
+    if watermark is not None and not full:
+        keyset = tuple_(UserAudio.created_at, UserAudio.id)  # type: ignore
+        query = query.where(
+            keyset > tuple_(watermark.created_at, watermark.id)  # type: ignore
+        )
+
+    audio_count = 0
+    last_audio = None
+
+    async with source.connect() as connection:
+        result = await connection.stream(query.execution_options(yield_per=batch_size))
+
+        async for rows in result.partitions(batch_size):  # type: ignore
+            for _, _, step_count, ticks in rows:
+                for tick_index, tick in enumerate(ticks):
+                    histogram = histograms.get((step_count, tick_index))
+
+                    if histogram is None:
+                        histogram = histograms[step_count, tick_index] = TickHistogram()
+
+                    histogram.add(tick)
+
+            audio_count += len(rows)
+            last_audio = rows[-1]
+
+    if last_audio is None and not full:
+        return 0
+
+    async with AsyncSession(source) as session:
+        if await _lock_watermark(session) != previous_watermark:
+            raise ConcurrentAggregationError()
+
+        if full:
+            await session.execute(delete(TickPercentiles))
+            await session.execute(
+                delete(AggregationWatermark).where(
+                    AggregationWatermark.name == WATERMARK_NAME
+                )
+            )
+
+        if histograms:
+            now = datetime.utcnow()
+            rows = [
+                {
+                    "step_count": step_count,
+                    "tick_index": tick_index,
+                    "count": histogram.total,
+                    **{name: histogram.quantile(q) for name, q in PERCENTILES.items()},
+                    "histogram": histogram.counts,
+                    "updated_at": now,
+                }
+                for (step_count, tick_index), histogram in sorted(histograms.items())
+            ]
+            upsert = insert(TickPercentiles).values(rows)
+            await session.execute(
+                upsert.on_conflict_do_update(
+                    index_elements=[
+                        TickPercentiles.step_count,
+                        TickPercentiles.tick_index,
+                    ],
+                    set_={
+                        name: upsert.excluded[name]
+                        for name in rows[0]
+                        if name not in ("step_count", "tick_index")
+                    },
+                )
+            )
+
+        if last_audio is not None:
+            upsert = insert(AggregationWatermark).values(
+                name=WATERMARK_NAME, created_at=last_audio.created_at, id=last_audio.id
+            )
+            await session.execute(
+                upsert.on_conflict_do_update(
+                    index_elements=[AggregationWatermark.name],
+                    set_={
+                        "created_at": upsert.excluded.created_at,
+                        "id": upsert.excluded.id,
+                    },
+                )
+            )
+
+        await session.commit()
+
+    return audio_count
+
+
+async def main(args: argparse.Namespace):
+    audio_count = await aggregate_tick_percentiles(
+        full=args.full, lag=args.lag, batch_size=args.batch_size
+    )
+
+    await engine.dispose()
+    print(f"Aggregated {audio_count} audios into the tick percentiles")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="rebuild the histograms from every audio instead of the new ones",
+    )
+    parser.add_argument("--lag", type=float, default=60.0)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+
+    asyncio.run(main(parser.parse_args()))
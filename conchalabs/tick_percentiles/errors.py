@@ -0,0 +1,2 @@
+class ConcurrentAggregationError(Exception):
+    pass
@@ -0,0 +1,28 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import BigInteger
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import Column, Field, SQLModel
+
+
+class TickPercentilesBase(SQLModel):
+    step_count: int = Field(primary_key=True)
+    tick_index: int = Field(primary_key=True)
+    count: int
+    p5: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+    updated_at: datetime
+
+
+class TickPercentiles(TickPercentilesBase, table=True):
+    histogram: list[int] = Field(sa_column=Column(ARRAY(BigInteger), nullable=False))
+
+
+class AggregationWatermark(SQLModel, table=True):
+    name: str = Field(primary_key=True)
+    created_at: datetime
+    id: UUID
@@ -0,0 +1,10 @@
+import abc
+
+from conchalabs.tick_percentiles.models import TickPercentilesBase
+
+
+class TickPercentilesRepository(abc.ABC):
+    @abc.abstractmethod
+    async def find(self, filters: dict) -> list[TickPercentilesBase]:
+        """Finds the aggregated tick percentiles that matches the specified filters, ordered by
+        (step_count, tick_index). The histograms they were computed from are not loaded."""
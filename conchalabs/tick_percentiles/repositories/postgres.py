@@ -0,0 +1,24 @@
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from conchalabs.tick_percentiles.models import TickPercentiles, TickPercentilesBase
+from conchalabs.tick_percentiles.repositories.base import TickPercentilesRepository
+
+
+class PostgresTickPercentilesRepository(TickPercentilesRepository):
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def find(self, filters: dict) -> list[TickPercentilesBase]:
+        columns = [
+            getattr(TickPercentiles, field) for field in TickPercentilesBase.__fields__
+        ]
+        query = select(*columns).order_by(
+            TickPercentiles.step_count, TickPercentiles.tick_index
+        )
+
+        for field, val in filters.items():
+            query = query.where(getattr(TickPercentiles, field) == val)
+
+        result = await self._session.execute(query)
+        return [TickPercentilesBase(**row) for row in result.mappings()]
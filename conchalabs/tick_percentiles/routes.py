@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+
+from conchalabs.dependencies.database import get_tick_percentiles_repository
+from conchalabs.dependencies.timeouts import listing_timeout
+from conchalabs.middlewares.instrumentation import InstrumentedRoute
+from conchalabs.tick_percentiles.models import TickPercentilesBase
+from conchalabs.tick_percentiles.repositories.base import TickPercentilesRepository
+
+router = APIRouter(
+    prefix="/api/v1/tick-percentiles",
+    tags=["Tick Percentiles"],
+    route_class=InstrumentedRoute,
+)
+
+
+@router.get(
+    "",
+    response_model=list[TickPercentilesBase],
+    dependencies=[Depends(listing_timeout)],
+)
+async def list_tick_percentiles(
+    step_count: int | None = Query(default=None, ge=0, le=9),
+    repository: TickPercentilesRepository = Depends(get_tick_percentiles_repository),
+):
+    filters = {}
+    if step_count is not None:
+        filters["step_count"] = step_count
+
+    return await repository.find(filters)
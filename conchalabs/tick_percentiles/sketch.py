@@ -0,0 +1,44 @@
+from collections.abc import Sequence
+
+TICK_MIN = -100.0
+TICK_MAX = -10.0
+BIN_WIDTH = 0.1
+BIN_COUNT = round((TICK_MAX - TICK_MIN) / BIN_WIDTH)
+
+# Guards against (value - TICK_MIN) / BIN_WIDTH landing right below an integer, e.g. 2.9999999999999996
+_BIN_EPSILON = 1e-9
+
+
+class TickHistogram:
+    """Streaming quantile sketch for tick values: counts them into BIN_COUNT fixed-width bins over
+    [TICK_MIN, TICK_MAX], the range the ticks are validated against.
+
+    Unlike sampling sketches, it is exact under insertion and two histograms are merged by adding their
+    counts, so it can be updated incrementally forever. Quantiles are accurate to BIN_WIDTH."""
+
+    def __init__(self, counts: Sequence[int] | None = None):
+        self.counts = list(counts) if counts is not None else [0] * BIN_COUNT
+        self.total = sum(self.counts)
+
+    def add(self, value: float):
+        index = int((value - TICK_MIN) / BIN_WIDTH + _BIN_EPSILON)
+        self.counts[min(max(index, 0), BIN_COUNT - 1)] += 1
+        self.total += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimates the q-quantile, interpolating linearly inside the bin that holds it.
+        Raises ValueError if the histogram is empty."""
+        if not self.total:
+            raise ValueError("Empty histogram has no quantiles")
+
+        rank = q * self.total
+        cumulative_count = 0
+
+        for index, count in enumerate(self.counts):
+            if count and cumulative_count + count >= rank:
+                position = index + (rank - cumulative_count) / count
+                return round(TICK_MIN + position * BIN_WIDTH, 2)
+
+            cumulative_count += count
+
+        return TICK_MAX
@@ -0,0 +1,119 @@
+"""Rebuilds the per-user audio aggregates from the user audios, for backfills and repairs.
+
+The aggregates are kept up to date by a trigger on useraudio, and filled by the migration that added
+it, so this is only needed for repairs, e.g. for the audios written while the trigger was disabled.
+The users are rebuilt in batches, each in its own transaction that holds a SHARE lock on useraudio,
+so writes wait for the current batch instead of racing with it:
+
+    python -m conchalabs.user_audios.aggregates
+    python -m conchalabs.user_audios.aggregates --user-id <uuid>
+"""
+import argparse
+import asyncio
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from conchalabs.dependencies.database import engine
+
+FIND_USERS = text(
+    """
+    SELECT id FROM "user"
+    WHERE CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid)
+    ORDER BY id
+    LIMIT :batch_size
+    """
+)
+
+REBUILD_AGGREGATES = text(
+    """
+    WITH audios AS (
+        SELECT user_id, count(*) AS audio_count, max(created_at) AS last_created_at
+        FROM useraudio
+        WHERE user_id = ANY(CAST(:user_ids AS uuid[]))
+        GROUP BY user_id
+    ), positions AS (
+        SELECT audio.user_id, tick.position,
+               sum(coalesce(tick.value, 0)::float8) AS tick_sum,
+               sum(coalesce(tick.value, 0)::float8 ^ 2) AS tick_square_sum
+        FROM useraudio AS audio
+        CROSS JOIN unnest(audio.ticks) WITH ORDINALITY AS tick(value, position)
+        WHERE audio.user_id = ANY(CAST(:user_ids AS uuid[]))
+        GROUP BY audio.user_id, tick.position
+    ), ticks AS (
+        SELECT user_id,
+               array_agg(tick_sum ORDER BY position) AS tick_sums,
+               array_agg(tick_square_sum ORDER BY position) AS tick_square_sums
+        FROM positions
+        GROUP BY user_id
+    )
+    INSERT INTO useraudioaggregate
+        (user_id, audio_count, last_created_at, tick_sums, tick_square_sums)
+    SELECT "user".id,
+           coalesce(audios.audio_count, 0),
+           audios.last_created_at,
+           coalesce(ticks.tick_sums, '{}'),
+           coalesce(ticks.tick_square_sums, '{}')
+    FROM "user"
+    LEFT JOIN audios ON audios.user_id = "user".id
+    LEFT JOIN ticks ON ticks.user_id = "user".id
+    WHERE "user".id = ANY(CAST(:user_ids AS uuid[]))
+    ON CONFLICT (user_id) DO UPDATE SET
+        audio_count = excluded.audio_count,
+        last_created_at = excluded.last_created_at,
+        tick_sums = excluded.tick_sums,
+        tick_square_sums = excluded.tick_square_sums
+    """
+)
+
+
+async def rebuild_aggregates(
+    user_ids: list[UUID], source: AsyncEngine = engine
+) -> None:
+    """Recomputes the aggregates of the users from their audios in a single transaction."""
+    async with source.begin() as connection:
+        await connection.execute(text("LOCK TABLE useraudio IN SHARE MODE"))
+        await connection.execute(REBUILD_AGGREGATES, {"user_ids": user_ids})
+
+
+async def rebuild_all_aggregates(
+    batch_size: int = 1000, source: AsyncEngine = engine
+) -> int:
+    """Recomputes the aggregates of every user, batch_size users at a time.
+    Returns how many users were rebuilt."""
+    user_count = 0
+    last_id = None
+
+    while True:
+        async with source.connect() as connection:
+            result = await connection.execute(
+                FIND_USERS, {"last_id": last_id, "batch_size": batch_size}
+            )
+            user_ids = list(result.scalars())
+
+        if not user_ids:
+            return user_count
+
+        await rebuild_aggregates(user_ids, source)
+        user_count += len(user_ids)
+        last_id = user_ids[-1]
+
+
+async def main(args: argparse.Namespace):
+    if args.user_id is not None:
+        await rebuild_aggregates([args.user_id])
+        user_count = 1
+    else:
+        user_count = await rebuild_all_aggregates(args.batch_size)
+
+    await engine.dispose()
+    print(f"Rebuilt the audio aggregates of {user_count} users")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=UUID)
+    parser.add_argument("--batch-size", type=int, default=1000)
+
+    asyncio.run(main(parser.parse_args()))
@@ -4,3 +4,7 @@ class UserAudioNotFoundError(Exception):
 
 class UserAudioConflictError(Exception):
     pass
+
+
+class UserAudioQueueFullError(Exception):
+    pass
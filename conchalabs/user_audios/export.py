@@ -0,0 +1,133 @@
+"""Exports user audios as Apache Arrow IPC streams or Parquet files for analytics.
+
+The rows are read from a server-side cursor and written as one record batch per fetch, so memory
+stays bounded by the batch size. `ticks` is written as a fixed-size list of 15 float32 values:
+
+    python -m conchalabs.user_audios.export audios.arrow --user-id <uuid>
+    python -m conchalabs.user_audios.export audios.parquet --format parquet --created-from 2023-01-01
+
+It needs the packages from requirements/analytics.txt.
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from typing import BinaryIO
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from conchalabs.dependencies.database import engine
+from conchalabs.user_audios.models import UserAudio
+
+TICKS_LENGTH = 15
+
+SCHEMA = pa.schema(
+    [
+        pa.field("id", pa.string(), nullable=False),
+        pa.field("user_id", pa.string()),
+        pa.field("created_at", pa.timestamp("us"), nullable=False),
+        pa.field("updated_at", pa.timestamp("us"), nullable=False),
+        pa.field("session_id", pa.int32(), nullable=False),
+        pa.field("step_count", pa.int32(), nullable=False),
+        pa.field("selected_tick", pa.int32(), nullable=False),
+        pa.field("ticks", pa.list_(pa.float32(), TICKS_LENGTH), nullable=False),
+    ]
+)
+
+
+def to_record_batch(rows: list) -> pa.RecordBatch:
+    ticks = pa.array([tick for row in rows for tick in row.ticks], pa.float32())
+
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array([str(row.id) for row in rows], pa.string()),
+            pa.array(
+                [str(row.user_id) if row.user_id else None for row in rows],
+                pa.string(),
+            ),
+            pa.array([row.created_at for row in rows], pa.timestamp("us")),
+            pa.array([row.updated_at for row in rows], pa.timestamp("us")),
+            pa.array([row.session_id for row in rows], pa.int32()),
+            pa.array([row.step_count for row in rows], pa.int32()),
+            pa.array([row.selected_tick for row in rows], pa.int32()),
+            pa.FixedSizeListArray.from_arrays(ticks, TICKS_LENGTH),
+        ],
+        schema=SCHEMA,
+    )
+
+
+async def export_user_audios(
+    sink: BinaryIO,
+    file_format: str = "arrow",
+    user_id: UUID | None = None,
+    session_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    batch_size: int = 10_000,
+    source: AsyncEngine = engine,
+) -> int:
+    """Writes the audios that matches the filters to the sink, returning how many were written.
+    The created_at range includes created_from and excludes created_to."""
+    query = select(*UserAudio.__table__.columns)  # type: ignore
+
+    if user_id is not None:
+        query = query.where(UserAudio.user_id == user_id)
+    if session_id is not None:
+        query = query.where(UserAudio.session_id == session_id)
+    if created_from is not None:
+        query = query.where(UserAudio.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(UserAudio.created_at < created_to)
+
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(sink, SCHEMA)
+    else:
+        writer = pa.ipc.new_stream(sink, SCHEMA)
+
+    row_count = 0
+
+    try:
+        async with source.connect() as connection:
+            result = await connection.stream(
+                query.execution_options(yield_per=batch_size)
+            )
+
+            async for rows in result.partitions(batch_size):  # type: ignore
+                writer.write_batch(to_record_batch(rows))
+                row_count += len(rows)
+    finally:
+        writer.close()
+
+    return row_count
+
+
+async def main(args: argparse.Namespace):
+    with open(args.output, "wb") as sink:
+        row_count = await export_user_audios(
+            sink,
+            file_format=args.format,
+            user_id=args.user_id,
+            session_id=args.session_id,
+            created_from=args.created_from,
+            created_to=args.created_to,
+            batch_size=args.batch_size,
+        )
+
+    await engine.dispose()
+    print(f"Exported {row_count} audios to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output")
+    parser.add_argument("--format", choices=["arrow", "parquet"], default="arrow")
+    parser.add_argument("--user-id", type=UUID)
+    parser.add_argument("--session-id", type=int)
+    parser.add_argument("--created-from", type=datetime.fromisoformat)
+    parser.add_argument("--created-to", type=datetime.fromisoformat)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+
+    asyncio.run(main(parser.parse_args()))
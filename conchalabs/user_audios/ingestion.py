@@ -0,0 +1,148 @@
+import asyncio
+import contextlib
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from conchalabs.user_audios.errors import (
+    UserAudioConflictError,
+    UserAudioQueueFullError,
+)
+from conchalabs.user_audios.models import UserAudio
+from conchalabs.user_audios.repositories.postgres import PostgresUserAudioRepository
+from conchalabs.users.errors import UserNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class UserAudioWriteQueue:
+    """Write-behind queue for audio inserts: the audios submitted by concurrent requests are inserted
+    together, with one multi-row statement and one commit per batch instead of one per audio.
+
+    A background task flushes a batch as soon as batch_size audios are waiting, or flush_interval
+    seconds after the first one arrived. Each submitter waits for the outcome of its own audio. When
+    max_size audios are already waiting, submit fails right away instead of queueing more work than
+    the database keeps up with."""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        batch_size: int,
+        flush_interval: float,
+        max_size: int,
+    ):
+        self._engine = engine
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue: asyncio.Queue[tuple[UserAudio, asyncio.Future]] = asyncio.Queue(
+            max_size
+        )
+        self._batch_ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def submit(self, user_audio: UserAudio) -> UserAudio:
+        """Queues the audio for insertion and returns it as stored once its batch is committed.
+        Raises UserAudioQueueFullError if the queue is full, and otherwise the same errors as
+        UserAudioRepository.create. The audio is still inserted if the caller stops waiting."""
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        try:
+            self._queue.put_nowait((user_audio, future))
+        except asyncio.QueueFull as error:
+            raise UserAudioQueueFullError() from error
+
+        # The flusher already holds the first audio of the batch
+        if self._queue.qsize() >= self._batch_size - 1:
+            self._batch_ready.set()
+
+        return await future
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the background task after flushing the audios already queued."""
+        if self._task is None:
+            return
+
+        await self._queue.join()
+        self._task.cancel()
+
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+        self._task = None
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(self._flush_interval):
+                    await self._batch_ready.wait()
+
+            self._batch_ready.clear()
+            batch = self._take_batch(batch)
+
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _take_batch(
+        self, batch: list[tuple[UserAudio, asyncio.Future]]
+    ) -> list[tuple[UserAudio, asyncio.Future]]:
+        while len(batch) < self._batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        return batch
+
+    async def _flush(self, batch: list[tuple[UserAudio, asyncio.Future]]):
+        try:
+            async with AsyncSession(self._engine, expire_on_commit=False) as session:
+                created_audios = await PostgresUserAudioRepository(session).save_many(
+                    [user_audio for user_audio, _ in batch]
+                )
+        except UserNotFoundError:
+            # A single missing user fails the whole statement, so the audios are inserted one by one
+            # to tell which of them belong to it.
+            await self._flush_one_by_one(batch)
+            return
+        except Exception as error:
+            logger.exception("Failed to insert a batch of %d audios", len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        created_audios_by_id = {audio.id: audio for audio in created_audios}
+
+        for user_audio, future in batch:
+            if future.done():
+                continue
+
+            created_audio = created_audios_by_id.get(user_audio.id)
+
+            if created_audio is None:
+                future.set_exception(UserAudioConflictError())
+            else:
+                future.set_result(created_audio)
+
+    async def _flush_one_by_one(self, batch: list[tuple[UserAudio, asyncio.Future]]):
+        for user_audio, future in batch:
+            try:
+                async with AsyncSession(
+                    self._engine, expire_on_commit=False
+                ) as session:
+                    created_audio = await PostgresUserAudioRepository(session).create(
+                        user_audio
+                    )
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                if not future.done():
+                    future.set_result(created_audio)
@@ -1,12 +1,16 @@
-from sqlmodel import JSON, Column, Field, ForeignKey, SQLModel, UniqueConstraint
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION
+from sqlmodel import Column, Field, ForeignKey, Index, SQLModel, UniqueConstraint
 from sqlmodel.sql.sqltypes import GUID
 
 from conchalabs.commons.mixins import UUID, TimestampedModelMixin, UUIDModelMixin
+from conchalabs.commons.types import Float32Array
 
 
 class UserAudioBase(SQLModel):
     ticks: list[float] = Field(
-        sa_column=Column(JSON), min_items=15, max_items=15, ge=-100.0, le=-10.0
+        sa_column=Column(Float32Array), min_items=15, max_items=15, ge=-100.0, le=-10.0
     )
     selected_tick: int = Field(ge=0, le=14)
     session_id: int = Field(unique=True, index=True)
@@ -14,7 +18,12 @@ class UserAudioBase(SQLModel):
 
 
 class UserAudio(UserAudioBase, UUIDModelMixin, TimestampedModelMixin, table=True):
-    __table_args__ = (UniqueConstraint("step_count", "session_id"),)
+    __table_args__ = (
+        UniqueConstraint("step_count", "session_id"),
+        Index("ix_useraudio_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_useraudio_created_at_id", "created_at", "id"),
+        Index("ix_useraudio_updated_at", "updated_at"),
+    )
 
     user_id: UUID | None = Field(
         default=None, sa_column=Column(GUID, ForeignKey("user.id", ondelete="cascade"))
@@ -30,3 +39,79 @@ class UserAudioUpdate(SQLModel):
     selected_tick: int | None = Field(ge=0, le=14)
     session_id: int | None
     step_count: int | None = Field(ge=0, le=9)
+
+
+class UserAudioBatchCreate(SQLModel):
+    audios: list[UserAudioCreate] = Field(min_items=1, max_items=100)
+
+
+class UserAudioConflict(SQLModel):
+    step_count: int
+    session_id: int
+
+
+class UserAudioBatchResult(SQLModel):
+    created: list[UserAudio]
+    conflicts: list[UserAudioConflict]
+
+
+class TickStats(SQLModel):
+    position: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    p5: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+
+
+class SelectedTickCount(SQLModel):
+    selected_tick: int
+    count: int
+
+
+class UserAudioStats(SQLModel):
+    audio_count: int
+    ticks: list[TickStats]
+    selected_ticks: list[SelectedTickCount]
+
+
+class UserAudioAggregate(SQLModel, table=True):
+    """Running totals of the audios of a user, kept up to date by a trigger on useraudio."""
+
+    user_id: UUID = Field(
+        sa_column=Column(
+            GUID, ForeignKey("user.id", ondelete="cascade"), primary_key=True
+        )
+    )
+    audio_count: int = 0
+    last_created_at: datetime | None = None
+    tick_sums: list[float] = Field(
+        default_factory=list,
+        sa_column=Column(ARRAY(DOUBLE_PRECISION), nullable=False),
+    )
+    tick_square_sums: list[float] = Field(
+        default_factory=list,
+        sa_column=Column(ARRAY(DOUBLE_PRECISION), nullable=False),
+    )
+
+
+class SimilarAudio(SQLModel):
+    audio_id: UUID
+    distance: float
+
+
+class TickSummary(SQLModel):
+    position: int
+    mean: float
+    std: float
+
+
+class UserAudioSummary(SQLModel):
+    audio_count: int
+    session_count: int
+    last_created_at: datetime | None
+    ticks: list[TickSummary]
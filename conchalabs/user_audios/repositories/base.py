@@ -1,7 +1,9 @@
 import abc
+from collections.abc import AsyncIterator
 from uuid import UUID
 
-from conchalabs.user_audios.models import UserAudio
+from conchalabs.commons.pagination import Page
+from conchalabs.user_audios.models import UserAudio, UserAudioStats, UserAudioSummary
 
 
 class UserAudioRepository(abc.ABC):
@@ -10,11 +12,73 @@ class UserAudioRepository(abc.ABC):
         """Saves the user audio on the database. If the audio already exists, it will be updated.
         Raises UserAudioConflictError if attempts to save a field that conflicts with another audio on the database."""
 
+    @abc.abstractmethod
+    async def create(self, user_audio: UserAudio) -> UserAudio:
+        """Inserts the new user audio on the database, returning it as stored with a single statement.
+        Raises UserNotFoundError if the user of the audio does not exist on the database and
+        UserAudioConflictError if the audio conflicts with another audio on the database."""
+
+    @abc.abstractmethod
+    async def upsert(self, user_audio: UserAudio) -> tuple[UserAudio, bool]:
+        """Inserts the user audio, or updates the audio of the same user with its (step_count, session_id),
+        with a single statement. Returns the audio as stored and whether it was inserted.
+        Raises UserNotFoundError if the user of the audio does not exist on the database and
+        UserAudioConflictError if the audio conflicts with an audio of another user."""
+
+    @abc.abstractmethod
+    async def update(self, user_id: UUID, audio_id: UUID, values: dict) -> UserAudio:
+        """Updates the specified fields of the user audio, returning it as stored with a single statement.
+        Raises UserAudioNotFoundError if the audio does not exist on the database and
+        UserAudioConflictError if the new values conflict with another audio on the database."""
+
+    @abc.abstractmethod
+    async def save_many(self, user_audios: list[UserAudio]) -> list[UserAudio]:
+        """Inserts the new user audios on the database in a single statement.
+        Audios that conflict with another audio on the database (or of the same batch) are skipped,
+        so only the inserted audios are returned. Raises UserNotFoundError if the user of an audio does not exist."""
+
     @abc.abstractmethod
     async def find(self, filters: dict) -> list[UserAudio]:
         """Finds audios on the database that matches the specified filters."""
 
+    @abc.abstractmethod
+    async def find_page(
+        self, user_id: UUID, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[UserAudio]:
+        """Finds up to `limit` audios of the user that matches the specified filters, ordered by (created_at, id).
+        The page starts right after the position pointed by `cursor`, or at the beginning if it is not provided.
+        Raises InvalidCursorError if the cursor is malformed and UserNotFoundError if the user does not exist."""
+
+    @abc.abstractmethod
+    async def find_page_rows(
+        self, user_id: UUID, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[dict]:
+        """Same as find_page, but returns the audios as plain column mappings instead of ORM objects."""
+
+    @abc.abstractmethod
+    async def stream_rows(
+        self, user_id: UUID, filters: dict, batch_size: int
+    ) -> AsyncIterator[list[dict]]:
+        """Streams all audios of the user that matches the specified filters, ordered by (created_at, id),
+        as batches of up to `batch_size` column mappings read from a server-side cursor.
+        Raises UserNotFoundError if the user does not exist, before any batch is produced."""
+
     @abc.abstractmethod
     async def get_by_id(self, user_id: UUID, audio_id: UUID) -> UserAudio:
         """Gets a specific audio by user_id and audio_id.
         Raises UserAudioNotFoundError if the audio does not exist on the database."""
+
+    @abc.abstractmethod
+    async def find_existing_ids(self, audio_ids: list[UUID]) -> set[UUID]:
+        """Gets which of the audio ids exist on the database."""
+
+    @abc.abstractmethod
+    async def get_stats(self, user_id: UUID) -> UserAudioStats:
+        """Computes the statistics of each ticks position and the selected_tick distribution across all audios of the user.
+        Raises UserNotFoundError if the user does not exist."""
+
+    @abc.abstractmethod
+    async def get_summary(self, user_id: UUID) -> UserAudioSummary:
+        """Gets the audio count and the mean and standard deviation of each ticks position of the user from its
+        running totals, in constant time regardless of how many audios it has.
+        Raises UserNotFoundError if the user does not exist."""
@@ -0,0 +1,100 @@
+from collections.abc import AsyncIterator, Hashable
+from uuid import UUID
+
+from conchalabs.commons.pagination import Page
+from conchalabs.commons.singleflight import SingleFlight
+from conchalabs.user_audios.models import UserAudio, UserAudioStats, UserAudioSummary
+from conchalabs.user_audios.repositories.base import UserAudioRepository
+
+
+class CoalescingUserAudioRepository(UserAudioRepository):
+    """Shares one call to the wrapped repository between concurrent identical reads.
+    Writes, and streams, which can't be consumed twice, go straight to the wrapped repository.
+    Only reads with the same scope are coalesced, e.g. those whose sessions go to the same database."""
+
+    def __init__(
+        self,
+        repository: UserAudioRepository,
+        single_flight: SingleFlight,
+        scope: Hashable = (),
+    ):
+        self._repository = repository
+        self._single_flight = single_flight
+        self._scope = scope
+
+    async def save(self, user_audio: UserAudio) -> UserAudio:
+        return await self._repository.save(user_audio)
+
+    async def create(self, user_audio: UserAudio) -> UserAudio:
+        return await self._repository.create(user_audio)
+
+    async def upsert(self, user_audio: UserAudio) -> tuple[UserAudio, bool]:
+        return await self._repository.upsert(user_audio)
+
+    async def update(self, user_id: UUID, audio_id: UUID, values: dict) -> UserAudio:
+        return await self._repository.update(user_id, audio_id, values)
+
+    async def save_many(self, user_audios: list[UserAudio]) -> list[UserAudio]:
+        return await self._repository.save_many(user_audios)
+
+    async def find(self, filters: dict) -> list[UserAudio]:
+        return await self._single_flight.do(
+            (self._scope, "find", frozenset(filters.items())),
+            lambda: self._repository.find(filters),
+        )
+
+    async def find_page(
+        self, user_id: UUID, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[UserAudio]:
+        return await self._single_flight.do(
+            (
+                self._scope,
+                "find_page",
+                user_id,
+                frozenset(filters.items()),
+                limit,
+                cursor,
+            ),
+            lambda: self._repository.find_page(user_id, filters, limit, cursor),
+        )
+
+    async def find_page_rows(
+        self, user_id: UUID, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[dict]:
+        return await self._single_flight.do(
+            (
+                self._scope,
+                "find_page_rows",
+                user_id,
+                frozenset(filters.items()),
+                limit,
+                cursor,
+            ),
+            lambda: self._repository.find_page_rows(user_id, filters, limit, cursor),
+        )
+
+    async def stream_rows(
+        self, user_id: UUID, filters: dict, batch_size: int
+    ) -> AsyncIterator[list[dict]]:
+        return await self._repository.stream_rows(user_id, filters, batch_size)
+
+    async def get_by_id(self, user_id: UUID, audio_id: UUID) -> UserAudio:
+        return await self._single_flight.do(
+            (self._scope, "get_by_id", user_id, audio_id),
+            lambda: self._repository.get_by_id(user_id, audio_id),
+        )
+
+    async def find_existing_ids(self, audio_ids: list[UUID]) -> set[UUID]:
+        return await self._repository.find_existing_ids(audio_ids)
+
+    async def get_stats(self, user_id: UUID) -> UserAudioStats:
+        return await self._single_flight.do(
+            (self._scope, "get_stats", user_id),
+            lambda: self._repository.get_stats(user_id),
+        )
+
+    async def get_summary(self, user_id: UUID) -> UserAudioSummary:
+        return await self._single_flight.do(
+            (self._scope, "get_summary", user_id),
+            lambda: self._repository.get_summary(user_id),
+        )
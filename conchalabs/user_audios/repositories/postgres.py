@@ -1,13 +1,39 @@
+import math
+from collections.abc import AsyncIterator
 from datetime import datetime
 from uuid import UUID
 
+from sqlalchemy import Boolean, column, func, literal_column, true, tuple_, update
+from sqlalchemy.dialects.postgresql import array, insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncMappingResult
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Subquery
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from conchalabs.commons.pagination import Page, decode_cursor, encode_cursor
+from conchalabs.commons.types import to_float32
 from conchalabs.user_audios.errors import UserAudioConflictError, UserAudioNotFoundError
-from conchalabs.user_audios.models import UserAudio
+from conchalabs.user_audios.models import (
+    SelectedTickCount,
+    TickStats,
+    TickSummary,
+    UserAudio,
+    UserAudioAggregate,
+    UserAudioStats,
+    UserAudioSummary,
+)
 from conchalabs.user_audios.repositories.base import UserAudioRepository
+from conchalabs.users.errors import UserNotFoundError
+from conchalabs.users.models import User
+
+FOREIGN_KEY_VIOLATION = "23503"
+TICK_PERCENTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def _is_foreign_key_violation(error: IntegrityError) -> bool:
+    return getattr(error.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION
 
 
 class PostgresUserAudioRepository(UserAudioRepository):
@@ -28,6 +54,131 @@ class PostgresUserAudioRepository(UserAudioRepository):
 
         return user_audio
 
+    async def create(self, user_audio: UserAudio) -> UserAudio:
+        user_audio.updated_at = datetime.utcnow()
+        columns = UserAudio.__table__.columns  # type: ignore
+
+        query = (
+            insert(UserAudio)
+            .values(
+                {column.name: getattr(user_audio, column.name) for column in columns}
+            )
+            .returning(*columns)
+        )
+
+        try:
+            result = await self._session.execute(
+                select(UserAudio).from_statement(query)
+            )
+            created_audio = result.scalars().one()
+            await self._session.commit()
+        except IntegrityError as error:
+            if _is_foreign_key_violation(error):
+                raise UserNotFoundError() from error
+            raise UserAudioConflictError() from error
+
+        return created_audio
+
+    async def upsert(self, user_audio: UserAudio) -> tuple[UserAudio, bool]:
+        user_audio.updated_at = datetime.utcnow()
+        columns = UserAudio.__table__.columns  # type: ignore
+
+        query = insert(UserAudio).values(
+            {column.name: getattr(user_audio, column.name) for column in columns}
+        )
+        # The WHERE leaves the audio of another user untouched and makes the statement return
+        # no rows. xmax is only set on the row versions written by an update.
+        query = query.on_conflict_do_update(
+            index_elements=[UserAudio.step_count, UserAudio.session_id],
+            set_={
+                "ticks": query.excluded.ticks,
+                "selected_tick": query.excluded.selected_tick,
+                "updated_at": query.excluded.updated_at,
+            },
+            where=UserAudio.user_id == query.excluded.user_id,
+        ).returning(*columns, literal_column("xmax = 0").label("inserted"))
+
+        try:
+            result = await self._session.execute(
+                select(UserAudio, column("inserted", Boolean))  # type: ignore
+                .from_statement(query)
+                .execution_options(populate_existing=True)
+            )
+            row = result.first()
+        except IntegrityError as error:
+            if _is_foreign_key_violation(error):
+                raise UserNotFoundError() from error
+            raise UserAudioConflictError() from error
+
+        if row is None:
+            await self._session.rollback()
+            # The audio of another user also hides a missing user from the foreign key
+            user_query = select(User.id).where(User.id == user_audio.user_id)
+
+            if (await self._session.execute(user_query)).first() is None:
+                raise UserNotFoundError()
+
+            raise UserAudioConflictError()
+
+        await self._session.commit()
+
+        return row[0], row[1]
+
+    async def update(self, user_id: UUID, audio_id: UUID, values: dict) -> UserAudio:
+        query = (
+            update(UserAudio)
+            .where((UserAudio.id == audio_id) & (UserAudio.user_id == user_id))
+            .values(**values, updated_at=datetime.utcnow())
+            .returning(*UserAudio.__table__.columns)  # type: ignore
+        )
+
+        try:
+            result = await self._session.execute(
+                select(UserAudio)
+                .from_statement(query)
+                .execution_options(populate_existing=True)
+            )
+        except IntegrityError as error:
+            raise UserAudioConflictError() from error
+
+        user_audio = result.scalars().first()
+
+        if user_audio is None:
+            raise UserAudioNotFoundError()
+
+        await self._session.commit()
+
+        return user_audio
+
+    async def save_many(self, user_audios: list[UserAudio]) -> list[UserAudio]:
+        now = datetime.utcnow()
+        columns = UserAudio.__table__.columns  # type: ignore
+
+        rows = []
+        for user_audio in user_audios:
+            user_audio.updated_at = now
+            rows.append(
+                {column.name: getattr(user_audio, column.name) for column in columns}
+            )
+
+        query = (
+            insert(UserAudio).values(rows).on_conflict_do_nothing().returning(*columns)
+        )
+
+        try:
+            result = await self._session.execute(
+                select(UserAudio).from_statement(query)
+            )
+        except IntegrityError as error:
+            if _is_foreign_key_violation(error):
+                raise UserNotFoundError() from error
+            raise
+
+        inserted_audios = result.scalars().all()
+        await self._session.commit()
+
+        return inserted_audios
+
     async def find(self, filters: dict) -> list[UserAudio]:
         query = select(UserAudio)
 
@@ -37,6 +188,99 @@ class PostgresUserAudioRepository(UserAudioRepository):
         user_audios = await self._session.execute(query)
         return user_audios.scalars().all()
 
+    async def find_page(
+        self, user_id: UUID, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[UserAudio]:
+        # The user is left joined with its audios so a single statement tells apart
+        # a user without audios (one row with no audio) from a missing user (no rows).
+        audios = self._page_subquery(user_id, filters, limit, cursor)
+        audio = aliased(UserAudio, audios)
+        query = (
+            select(User.id, audio)
+            .select_from(User)
+            .outerjoin(audios, true())
+            .where(User.id == user_id)
+            .order_by(audios.c.created_at, audios.c.id)
+        )
+
+        result = await self._session.execute(query)
+        rows = result.all()
+
+        if not rows:
+            raise UserNotFoundError()
+
+        user_audios = [user_audio for _, user_audio in rows if user_audio is not None]
+
+        if len(user_audios) <= limit:
+            return Page(items=user_audios)
+
+        last_audio = user_audios[limit - 1]
+        return Page(
+            items=user_audios[:limit],
+            next_cursor=encode_cursor(last_audio.created_at, last_audio.id),
+        )
+
+    async def find_page_rows(
+        self, user_id: UUID, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[dict]:
+        audios = self._page_subquery(user_id, filters, limit, cursor)
+        query = (
+            select(User.id.label("found_user_id"), *audios.c)  # type: ignore
+            .select_from(User)
+            .outerjoin(audios, true())
+            .where(User.id == user_id)
+            .order_by(audios.c.created_at, audios.c.id)
+        )
+
+        result = await self._session.execute(query)
+        rows = result.mappings().all()
+
+        if not rows:
+            raise UserNotFoundError()
+
+        user_audios = [
+            {column.name: row[column] for column in audios.c}
+            for row in rows
+            if row["id"] is not None
+        ]
+
+        if len(user_audios) <= limit:
+            return Page.construct(items=user_audios)
+
+        last_audio = user_audios[limit - 1]
+        return Page.construct(
+            items=user_audios[:limit],
+            next_cursor=encode_cursor(last_audio["created_at"], last_audio["id"]),
+        )
+
+    async def stream_rows(
+        self, user_id: UUID, filters: dict, batch_size: int
+    ) -> AsyncIterator[list[dict]]:
+        columns = list(UserAudio.__table__.columns)  # type: ignore
+        audios_query = select(*columns).where(UserAudio.user_id == user_id)
+
+        for field, val in filters.items():
+            audios_query = audios_query.where(getattr(UserAudio, field) == val)
+
+        # Streamed straight from the (user_id, created_at, id) index, with no sort to wait for, so the
+        # user is only looked up when it has no audios.
+        query = audios_query.order_by(
+            UserAudio.created_at, UserAudio.id
+        ).execution_options(yield_per=batch_size)
+
+        result = await self._session.stream(query)
+        rows = result.mappings()
+        first_rows = await rows.fetchmany(batch_size)
+
+        if not first_rows:
+            await rows.close()
+            user_query = select(User.id).where(User.id == user_id)
+
+            if (await self._session.execute(user_query)).first() is None:
+                raise UserNotFoundError()
+
+        return self._stream_batches(rows, first_rows, columns, batch_size)
+
     async def get_by_id(self, user_id: UUID, audio_id: UUID) -> UserAudio:
         query = select(UserAudio).where(
             (UserAudio.id == audio_id) & (UserAudio.user_id == user_id)
@@ -49,3 +293,165 @@ class PostgresUserAudioRepository(UserAudioRepository):
             raise UserAudioNotFoundError()
 
         return audio
+
+    async def find_existing_ids(self, audio_ids: list[UUID]) -> set[UUID]:
+        query = select(UserAudio.id).where(UserAudio.id.in_(audio_ids))  # type: ignore
+
+        result = await self._session.execute(query)
+        return set(result.scalars())
+
+    async def get_stats(self, user_id: UUID) -> UserAudioStats:
+        unnested_ticks = (
+            func.unnest(UserAudio.ticks)
+            .table_valued("tick", with_ordinality="position")
+            .render_derived()
+        )
+        tick = unnested_ticks.c.tick
+        ticks_query = (
+            select(  # type: ignore
+                unnested_ticks.c.position - 1,
+                func.avg(tick),
+                func.stddev_pop(tick),
+                func.min(tick),
+                func.max(tick),
+                func.percentile_cont(array(TICK_PERCENTILES)).within_group(tick),
+            )
+            .select_from(UserAudio)
+            .join(unnested_ticks, true())
+            .where(UserAudio.user_id == user_id)
+            .group_by(unnested_ticks.c.position)
+            .order_by(unnested_ticks.c.position)
+        )
+        selected_ticks_query = (
+            select(UserAudio.selected_tick, func.count())  # type: ignore
+            .where(UserAudio.user_id == user_id)
+            .group_by(UserAudio.selected_tick)
+            .order_by(UserAudio.selected_tick)
+        )
+
+        selected_ticks = [
+            SelectedTickCount(selected_tick=selected_tick, count=count)
+            for selected_tick, count in await self._session.execute(
+                selected_ticks_query
+            )
+        ]
+
+        if not selected_ticks:
+            user_query = select(User.id).where(User.id == user_id)
+
+            if (await self._session.execute(user_query)).first() is None:
+                raise UserNotFoundError()
+
+            return UserAudioStats(audio_count=0, ticks=[], selected_ticks=[])
+
+        # min and max are stored float32 ticks, so they are rounded back to float32 precision: a -96.33
+        # min is returned as is instead of as -96.33000183105469. The other statistics are computed in
+        # double precision and returned as they are.
+        ticks = [
+            TickStats(
+                position=position,
+                mean=mean,
+                std=std,
+                min=to_float32(min_),
+                max=to_float32(max_),
+                p5=percentiles[0],
+                p25=percentiles[1],
+                p50=percentiles[2],
+                p75=percentiles[3],
+                p95=percentiles[4],
+            )
+            for position, mean, std, min_, max_, percentiles in (
+                await self._session.execute(ticks_query)
+            )
+        ]
+
+        return UserAudioStats(
+            audio_count=sum(selected_tick.count for selected_tick in selected_ticks),
+            ticks=ticks,
+            selected_ticks=selected_ticks,
+        )
+
+    async def get_summary(self, user_id: UUID) -> UserAudioSummary:
+        query = (
+            select(User.id, UserAudioAggregate)
+            .select_from(User)
+            .outerjoin(UserAudioAggregate, UserAudioAggregate.user_id == User.id)
+            .where(User.id == user_id)
+        )
+
+        row = (await self._session.execute(query)).first()
+
+        if row is None:
+            raise UserNotFoundError()
+
+        aggregate = row[1]
+
+        if aggregate is None or not aggregate.audio_count:
+            return UserAudioSummary(
+                audio_count=0, session_count=0, last_created_at=None, ticks=[]
+            )
+
+        ticks = []
+        for position, (tick_sum, tick_square_sum) in enumerate(
+            zip(aggregate.tick_sums, aggregate.tick_square_sums)
+        ):
+            mean = tick_sum / aggregate.audio_count
+            variance = tick_square_sum / aggregate.audio_count - mean**2
+            ticks.append(
+                TickSummary(
+                    position=position,
+                    mean=mean,
+                    # The running sums can make a zero variance slightly negative
+                    std=math.sqrt(max(variance, 0.0)),
+                )
+            )
+
+        # session_id is unique across all audios, so each audio is a distinct session. A test fails if
+        # ix_useraudio_session_id stops being unique, as this would then count steps as sessions
+        return UserAudioSummary(
+            audio_count=aggregate.audio_count,
+            session_count=aggregate.audio_count,
+            last_created_at=aggregate.last_created_at,
+            ticks=ticks,
+        )
+
+    @staticmethod
+    def _page_subquery(
+        user_id: UUID, filters: dict, limit: int, cursor: str | None
+    ) -> Subquery:
+        query = (
+            select(UserAudio)
+            .where(UserAudio.user_id == user_id)
+            .order_by(UserAudio.created_at, UserAudio.id)
+            .limit(limit + 1)
+        )
+
+        for field, val in filters.items():
+            query = query.where(getattr(UserAudio, field) == val)
+
+        if cursor is not None:
+            created_at, audio_id = decode_cursor(cursor)
+            keyset = tuple_(UserAudio.created_at, UserAudio.id)  # type: ignore
+            query = query.where(keyset > tuple_(created_at, audio_id))  # type: ignore
+
+        return query.subquery()
+
+    @staticmethod
+    async def _stream_batches(
+        rows: AsyncMappingResult,
+        first_rows: list,
+        columns: list,
+        batch_size: int,
+    ) -> AsyncIterator[list[dict]]:
+        # Column names are quoted_name instances, a str subclass that orjson rejects as keys.
+        names = [(str(column.name), column) for column in columns]
+        batch_rows = first_rows
+
+        try:
+            while batch_rows:
+                yield [
+                    {name: row[column] for name, column in names} for row in batch_rows
+                ]
+                batch_rows = await rows.fetchmany(batch_size)
+        finally:
+            await rows.close()
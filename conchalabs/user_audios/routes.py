@@ -1,21 +1,50 @@
+import asyncio
 from http import HTTPStatus
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
+from conchalabs.commons.errors import InvalidCursorError
+from conchalabs.commons.pagination import Page, page_response
+from conchalabs.commons.streaming import encode_ndjson
 from conchalabs.dependencies.database import (
+    get_tick_index_updater,
     get_user_audio_repository,
-    get_user_repository,
+    get_user_audio_write_queue,
+)
+from conchalabs.dependencies.timeouts import (
+    export_timeout,
+    listing_timeout,
+    lookup_timeout,
+)
+from conchalabs.middlewares.instrumentation import InstrumentedRoute
+from conchalabs.settings import settings
+from conchalabs.user_audios.errors import (
+    UserAudioConflictError,
+    UserAudioNotFoundError,
+    UserAudioQueueFullError,
+)
+from conchalabs.user_audios.ingestion import UserAudioWriteQueue
+from conchalabs.user_audios.models import (
+    SimilarAudio,
+    UserAudio,
+    UserAudioBatchCreate,
+    UserAudioBatchResult,
+    UserAudioConflict,
+    UserAudioCreate,
+    UserAudioStats,
+    UserAudioSummary,
+    UserAudioUpdate,
 )
-from conchalabs.user_audios.errors import UserAudioConflictError, UserAudioNotFoundError
-from conchalabs.user_audios.models import UserAudio, UserAudioCreate, UserAudioUpdate
 from conchalabs.user_audios.repositories.base import UserAudioRepository
-from conchalabs.users.repositories.base import UserRepository
-from conchalabs.users.routes import get_user_by_id
+from conchalabs.user_audios.similarity import TickIndexUpdater
+from conchalabs.users.errors import UserNotFoundError
 
 router = APIRouter(
     prefix="/api/v1/users/{user_id}/audios",
     tags=["User Audios"],
+    route_class=InstrumentedRoute,
 )
 
 
@@ -23,17 +52,54 @@ router = APIRouter(
     "",
     status_code=HTTPStatus.CREATED,
     response_model=UserAudio,
+    dependencies=[Depends(lookup_timeout)],
 )
 async def create_user_audio(
     user_id: UUID,
     audio_data: UserAudioCreate,
-    user_repository: UserRepository = Depends(get_user_repository),
     user_audio_repository: UserAudioRepository = Depends(get_user_audio_repository),
+    write_queue: UserAudioWriteQueue | None = Depends(get_user_audio_write_queue),
 ):
-    user = await get_user_by_id(user_id, user_repository)
+    audio = UserAudio(
+        user_id=user_id,
+        ticks=audio_data.ticks,
+        session_id=audio_data.session_id,
+        selected_tick=audio_data.selected_tick,
+        step_count=audio_data.step_count,
+    )
+
+    try:
+        if write_queue is not None:
+            return await write_queue.submit(audio)
 
+        return await user_audio_repository.create(audio)
+    except UserAudioQueueFullError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail="Too many audios waiting to be saved",
+            headers={"Retry-After": str(settings.audio_write_queue_retry_after)},
+        ) from error
+    except UserNotFoundError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="User not found",
+        ) from error
+    except UserAudioConflictError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail="Audio conflicts for user",
+        ) from error
+
+
+@router.put("", response_model=UserAudio, dependencies=[Depends(lookup_timeout)])
+async def upsert_user_audio(
+    user_id: UUID,
+    audio_data: UserAudioCreate,
+    response: Response,
+    user_audio_repository: UserAudioRepository = Depends(get_user_audio_repository),
+):
     audio = UserAudio(
-        user_id=user.id,
+        user_id=user_id,
         ticks=audio_data.ticks,
         session_id=audio_data.session_id,
         selected_tick=audio_data.selected_tick,
@@ -41,34 +107,164 @@ async def create_user_audio(
     )
 
     try:
-        return await user_audio_repository.save(audio)
+        audio, inserted = await user_audio_repository.upsert(audio)
+    except UserNotFoundError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="User not found",
+        ) from error
     except UserAudioConflictError as error:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail="Audio conflicts for user",
         ) from error
 
+    response.status_code = HTTPStatus.CREATED if inserted else HTTPStatus.OK
+    return audio
+
+
+@router.post(
+    ":batch",
+    response_model=UserAudioBatchResult,
+    dependencies=[Depends(lookup_timeout)],
+)
+async def create_user_audios_batch(
+    user_id: UUID,
+    batch_data: UserAudioBatchCreate,
+    user_audio_repository: UserAudioRepository = Depends(get_user_audio_repository),
+):
+    audios = [
+        UserAudio(
+            user_id=user_id,
+            ticks=audio_data.ticks,
+            session_id=audio_data.session_id,
+            selected_tick=audio_data.selected_tick,
+            step_count=audio_data.step_count,
+        )
+        for audio_data in batch_data.audios
+    ]
+
+    try:
+        created = await user_audio_repository.save_many(audios)
+    except UserNotFoundError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="User not found",
+        ) from error
+
+    created_ids = {audio.id for audio in created}
+
+    return UserAudioBatchResult(
+        created=created,
+        conflicts=[
+            UserAudioConflict(step_count=audio.step_count, session_id=audio.session_id)
+            for audio in audios
+            if audio.id not in created_ids
+        ],
+    )
+
 
 @router.get(
     "",
-    response_model=list[UserAudio],
+    response_model=Page[UserAudio],
+    dependencies=[Depends(listing_timeout)],
 )
 async def list_user_audios(
     user_id: UUID,
     session_id: int | None = None,
-    user_repository: UserRepository = Depends(get_user_repository),
+    limit: int = Query(
+        default=settings.default_page_size, ge=1, le=settings.max_page_size
+    ),
+    cursor: str | None = None,
     user_audio_repository: UserAudioRepository = Depends(get_user_audio_repository),
 ):
-    user = await get_user_by_id(user_id, user_repository)
+    filters = {}
+    if session_id is not None:
+        filters["session_id"] = session_id
+
+    try:
+        if settings.fast_json_responses:
+            page = await user_audio_repository.find_page_rows(
+                user_id, filters, limit, cursor
+            )
+            return page_response(page)
 
-    filters = {"user_id": user.id}
+        return await user_audio_repository.find_page(user_id, filters, limit, cursor)
+    except UserNotFoundError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="User not found",
+        ) from error
+    except InvalidCursorError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from error
+
+
+@router.get(
+    ":export",
+    response_class=StreamingResponse,
+    responses={HTTPStatus.OK.value: {"content": {"application/x-ndjson": {}}}},
+    dependencies=[Depends(export_timeout)],
+)
+async def export_user_audios(
+    user_id: UUID,
+    session_id: int | None = None,
+    user_audio_repository: UserAudioRepository = Depends(get_user_audio_repository),
+):
+    filters = {}
     if session_id is not None:
         filters["session_id"] = session_id
 
-    return await user_audio_repository.find(filters)
+    try:
+        batches = await user_audio_repository.stream_rows(
+            user_id, filters, settings.export_batch_size
+        )
+    except UserNotFoundError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="User not found",
+        ) from error
+
+    return StreamingResponse(encode_ndjson(batches), media_type="application/x-ndjson")
+
+
+@router.get(
+    ":stats", response_model=UserAudioStats, dependencies=[Depends(listing_timeout)]
+)
+async def get_user_audio_stats(
+    user_id: UUID,
+    user_audio_repository: UserAudioRepository = Depends(get_user_audio_repository),
+):
+    try:
+        return await user_audio_repository.get_stats(user_id)
+    except UserNotFoundError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="User not found",
+        ) from error
+
+
+@router.get(
+    ":summary", response_model=UserAudioSummary, dependencies=[Depends(lookup_timeout)]
+)
+async def get_user_audio_summary(
+    user_id: UUID,
+    user_audio_repository: UserAudioRepository = Depends(get_user_audio_repository),
+):
+    try:
+        return await user_audio_repository.get_summary(user_id)
+    except UserNotFoundError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="User not found",
+        ) from error
 
 
-@router.get("/{audio_id}", response_model=UserAudio)
+@router.get(
+    "/{audio_id}", response_model=UserAudio, dependencies=[Depends(lookup_timeout)]
+)
 async def get_user_audio_by_id(
     user_id: UUID,
     audio_id: UUID,
@@ -83,20 +279,81 @@ async def get_user_audio_by_id(
         ) from error
 
 
-@router.patch("/{audio_id}", response_model=UserAudio)
-async def update_user_audio_by_id(
+@router.get(
+    "/{audio_id}/similar",
+    response_model=list[SimilarAudio],
+    dependencies=[Depends(lookup_timeout)],
+)
+async def find_similar_user_audios(
     user_id: UUID,
     audio_id: UUID,
-    audio_data: UserAudioUpdate,
+    k: int = Query(default=10, ge=1, le=100),
     user_audio_repository: UserAudioRepository = Depends(get_user_audio_repository),
+    tick_index_updater: TickIndexUpdater | None = Depends(get_tick_index_updater),
 ):
-    user_audio = await get_user_audio_by_id(user_id, audio_id, user_audio_repository)
+    index = tick_index_updater.index if tick_index_updater is not None else None
+
+    if index is None:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail="Similarity search is not available",
+        )
+
+    try:
+        audio = await user_audio_repository.get_by_id(user_id, audio_id)
+    except UserAudioNotFoundError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="Audio not found",
+        ) from error
+
+    # Deleted audios stay on the index until it is rebuilt, so a few extra neighbours are searched
+    # to make up for the ones that no longer exist. Those are removed from the index as they are found.
+    # The index is used from a thread, as a search can hold the event loop for tens of milliseconds.
+    neighbours = [
+        (neighbour_id, distance)
+        for neighbour_id, distance in await asyncio.to_thread(
+            index.search, audio.ticks, 2 * k + 1
+        )
+        if neighbour_id != audio_id
+    ]
+    existing_ids = await user_audio_repository.find_existing_ids(
+        [neighbour_id for neighbour_id, _ in neighbours]
+    )
+    await asyncio.to_thread(
+        index.remove,
+        [
+            neighbour_id
+            for neighbour_id, _ in neighbours
+            if neighbour_id not in existing_ids
+        ],
+    )
 
-    for field, val in audio_data.dict(exclude_unset=True).items():
-        setattr(user_audio, field, val)
+    return [
+        SimilarAudio(audio_id=neighbour_id, distance=distance)
+        for neighbour_id, distance in neighbours
+        if neighbour_id in existing_ids
+    ][:k]
 
+
+@router.patch(
+    "/{audio_id}", response_model=UserAudio, dependencies=[Depends(lookup_timeout)]
+)
+async def update_user_audio_by_id(
+    user_id: UUID,
+    audio_id: UUID,
+    audio_data: UserAudioUpdate,
+    user_audio_repository: UserAudioRepository = Depends(get_user_audio_repository),
+):
     try:
-        return await user_audio_repository.save(user_audio)
+        return await user_audio_repository.update(
+            user_id, audio_id, audio_data.dict(exclude_unset=True)
+        )
+    except UserAudioNotFoundError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="Audio not found",
+        ) from error
     except UserAudioConflictError as error:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
@@ -0,0 +1,126 @@
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import REAL, column, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from conchalabs.commons.vector_index import IVFVectorIndex, VectorIndex
+from conchalabs.user_audios.models import UserAudio
+
+logger = logging.getLogger(__name__)
+
+TICKS_DIMENSIONS = 15
+
+# Audios are stamped with updated_at before their transaction commits, so each refresh reads again
+# the audios updated in this window before the last one it saw. Adding them again is harmless.
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+# The raw real[], as the index is float32 anyway and needs no short decimals from Float32Array
+_ticks = column("ticks", ARRAY(REAL))
+
+
+class TickIndexUpdater:
+    """Builds a vector index of the ticks of every audio and keeps it up to date in the background.
+
+    Every interval seconds, the audios updated since the last refresh are added to the index, so the
+    writes of every process show up within an interval. Deleted audios can't be seen that way, so every
+    rebuild_interval seconds a new index is built from scratch and replaces the current one, which also
+    trains the IVF clusters again. `index` is None until the first build finishes."""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        kind: str,
+        interval: float,
+        rebuild_interval: float,
+        ivf_lists: int,
+        ivf_probes: int,
+        batch_size: int = 10_000,
+    ):
+        self._engine = engine
+        self._kind = kind
+        self._interval = interval
+        self._rebuild_interval = rebuild_interval
+        self._ivf_lists = ivf_lists
+        self._ivf_probes = ivf_probes
+        self._batch_size = batch_size
+        self._refreshed_from: datetime | None = None
+        self._built_at = float("-inf")
+        self._task: asyncio.Task | None = None
+        self.index: VectorIndex[UUID] | None = None
+
+    async def build(self) -> None:
+        if self._kind == "ivf":
+            index: VectorIndex[UUID] = IVFVectorIndex(
+                TICKS_DIMENSIONS, self._ivf_lists, self._ivf_probes
+            )
+        else:
+            index = VectorIndex(TICKS_DIMENSIONS)
+
+        started_at = datetime.utcnow()
+        await self._load(index)
+
+        if isinstance(index, IVFVectorIndex):
+            await asyncio.to_thread(index.train)
+
+        self.index = index
+        self._refreshed_from = started_at - REFRESH_OVERLAP
+        self._built_at = time.monotonic()
+
+    async def refresh(self):
+        if self.index is None or self._refreshed_from is None:
+            return
+
+        started_at = datetime.utcnow()
+        await self._load(self.index, UserAudio.updated_at >= self._refreshed_from)
+        self._refreshed_from = started_at - REFRESH_OVERLAP
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                if time.monotonic() - self._built_at >= self._rebuild_interval:
+                    await self.build()
+                else:
+                    await self.refresh()
+            except Exception:
+                # CancelledError is not an Exception, so stop() still ends the loop
+                logger.exception("Failed to update the tick index")
+
+            await asyncio.sleep(self._interval)
+
+    async def _load(self, index: VectorIndex[UUID], *criteria):
+        query = (
+            select(UserAudio.id, _ticks)
+            .select_from(UserAudio)
+            .where(_ticks.is_not(None), *criteria)
+            .execution_options(yield_per=self._batch_size)
+        )
+
+        async with self._engine.connect() as connection:
+            result = await connection.stream(query)
+
+            async for rows in result.partitions(self._batch_size):  # type: ignore
+                # In a thread, as it waits for the searches of the index in flight
+                await asyncio.to_thread(
+                    index.add, [row.id for row in rows], [row.ticks for row in rows]
+                )
@@ -1,4 +1,6 @@
-from sqlmodel import Field, SQLModel
+from uuid import UUID
+
+from sqlmodel import Field, Index, SQLModel
 
 from conchalabs.commons.mixins import TimestampedModelMixin, UUIDModelMixin
 
@@ -11,7 +13,7 @@ class UserBase(SQLModel):
 
 
 class User(UserBase, UUIDModelMixin, TimestampedModelMixin, table=True):
-    pass
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)
 
 
 class UserCreate(UserBase):
@@ -23,3 +25,12 @@ class UserUpdate(SQLModel):
     email: str | None
     address: str | None
     image: str | None
+
+
+class UserBatchGet(SQLModel):
+    ids: list[UUID] = Field(min_items=1, max_items=1000)
+
+
+class UserBatchGetResult(SQLModel):
+    users: list[User]
+    missing_ids: list[UUID]
@@ -1,6 +1,7 @@
 import abc
 from uuid import UUID
 
+from conchalabs.commons.pagination import Page
 from conchalabs.users.models import User
 
 
@@ -9,14 +10,42 @@ class UserRepository(abc.ABC):
     async def save(self, user: User) -> User:
         """Saves the user on the database. If the user already exists, it will be updated."""
 
+    @abc.abstractmethod
+    async def create(self, user: User) -> User:
+        """Inserts the new user on the database, returning it as stored with a single statement."""
+
+    @abc.abstractmethod
+    async def update(self, user_id: UUID, values: dict) -> User:
+        """Updates the specified fields of the user, returning it as stored with a single statement.
+        Raises UserNotFoundError if the user does not exist on the database."""
+
     @abc.abstractmethod
     async def find(self, filters: dict) -> list[User]:
         """Finds users on the database that matches the specified filters."""
 
+    @abc.abstractmethod
+    async def find_page(
+        self, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[User]:
+        """Finds up to `limit` users that matches the specified filters, ordered by (created_at, id).
+        The page starts right after the position pointed by `cursor`, or at the beginning if it is not provided.
+        Raises InvalidCursorError if the cursor is malformed."""
+
+    @abc.abstractmethod
+    async def find_page_rows(
+        self, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[dict]:
+        """Same as find_page, but returns the users as plain column mappings instead of ORM objects."""
+
     @abc.abstractmethod
     async def get_by_id(self, user_id: UUID) -> User:
         """Gets a specific user by id. Raises UserNotFoundError if the user does not exist on the database."""
 
+    @abc.abstractmethod
+    async def get_many(self, user_ids: list[UUID]) -> list[User]:
+        """Gets the users with the specified ids with a single statement, in no particular order.
+        The ids of users that do not exist on the database are skipped."""
+
     @abc.abstractmethod
     async def delete(self, user: User):
         """Deletes the user on the database."""
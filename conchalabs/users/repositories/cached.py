@@ -0,0 +1,93 @@
+import time
+from uuid import UUID
+
+from conchalabs.commons.cache import CacheBackend
+from conchalabs.commons.pagination import Page
+from conchalabs.users.models import User
+from conchalabs.users.repositories.base import UserRepository
+
+
+class CachedUserRepository(UserRepository):
+    """Serves get_by_id and get_many from the cache, falling back to the wrapped repository on misses.
+    Writes go to the wrapped repository and invalidate the cached user afterwards. Users read before
+    an invalidation aren't cached, as they may predate the write. max_staleness is how old the users
+    the wrapped repository reads may be, e.g. when its session is on a lagging replica."""
+
+    def __init__(
+        self,
+        repository: UserRepository,
+        cache: CacheBackend,
+        max_staleness: float = 0.0,
+    ):
+        self._repository = repository
+        self._cache = cache
+        self._max_staleness = max_staleness
+
+    async def save(self, user: User) -> User:
+        saved_user = await self._repository.save(user)
+        await self._cache.delete(str(saved_user.id))
+
+        return saved_user
+
+    async def create(self, user: User) -> User:
+        return await self._repository.create(user)
+
+    async def update(self, user_id: UUID, values: dict) -> User:
+        try:
+            return await self._repository.update(user_id, values)
+        finally:
+            await self._cache.delete(str(user_id))
+
+    async def find(self, filters: dict) -> list[User]:
+        return await self._repository.find(filters)
+
+    async def find_page(
+        self, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[User]:
+        return await self._repository.find_page(filters, limit, cursor)
+
+    async def find_page_rows(
+        self, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[dict]:
+        return await self._repository.find_page_rows(filters, limit, cursor)
+
+    async def get_by_id(self, user_id: UUID) -> User:
+        cached_user = await self._cache.get(str(user_id))
+
+        if cached_user is not None:
+            return User(**cached_user)
+
+        read_at = time.time() - self._max_staleness
+        user = await self._repository.get_by_id(user_id)
+        await self._cache.set(str(user_id), user.dict(), read_at)
+
+        return user
+
+    async def get_many(self, user_ids: list[UUID]) -> list[User]:
+        users = []
+        missing_ids = []
+
+        for user_id in user_ids:
+            cached_user = await self._cache.get(str(user_id))
+
+            if cached_user is None:
+                missing_ids.append(user_id)
+            else:
+                users.append(User(**cached_user))
+
+        if not missing_ids:
+            return users
+
+        read_at = time.time() - self._max_staleness
+
+        for user in await self._repository.get_many(missing_ids):
+            await self._cache.set(str(user.id), user.dict(), read_at)
+            users.append(user)
+
+        return users
+
+    async def delete(self, user: User):
+        try:
+            await self._repository.delete(user)
+        finally:
+            await self._cache.delete(str(user.id))
@@ -0,0 +1,69 @@
+from collections.abc import Hashable
+from uuid import UUID
+
+from conchalabs.commons.pagination import Page
+from conchalabs.commons.singleflight import SingleFlight
+from conchalabs.users.models import User
+from conchalabs.users.repositories.base import UserRepository
+
+
+class CoalescingUserRepository(UserRepository):
+    """Shares one call to the wrapped repository between concurrent identical reads.
+    Writes go straight to the wrapped repository. Only reads with the same scope are coalesced, e.g.
+    those whose sessions go to the same database."""
+
+    def __init__(
+        self,
+        repository: UserRepository,
+        single_flight: SingleFlight,
+        scope: Hashable = (),
+    ):
+        self._repository = repository
+        self._single_flight = single_flight
+        self._scope = scope
+
+    async def save(self, user: User) -> User:
+        return await self._repository.save(user)
+
+    async def create(self, user: User) -> User:
+        return await self._repository.create(user)
+
+    async def update(self, user_id: UUID, values: dict) -> User:
+        return await self._repository.update(user_id, values)
+
+    async def find(self, filters: dict) -> list[User]:
+        return await self._single_flight.do(
+            (self._scope, "find", frozenset(filters.items())),
+            lambda: self._repository.find(filters),
+        )
+
+    async def find_page(
+        self, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[User]:
+        return await self._single_flight.do(
+            (self._scope, "find_page", frozenset(filters.items()), limit, cursor),
+            lambda: self._repository.find_page(filters, limit, cursor),
+        )
+
+    async def find_page_rows(
+        self, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[dict]:
+        return await self._single_flight.do(
+            (self._scope, "find_page_rows", frozenset(filters.items()), limit, cursor),
+            lambda: self._repository.find_page_rows(filters, limit, cursor),
+        )
+
+    async def get_by_id(self, user_id: UUID) -> User:
+        return await self._single_flight.do(
+            (self._scope, "get_by_id", user_id),
+            lambda: self._repository.get_by_id(user_id),
+        )
+
+    async def get_many(self, user_ids: list[UUID]) -> list[User]:
+        return await self._single_flight.do(
+            (self._scope, "get_many", frozenset(user_ids)),
+            lambda: self._repository.get_many(user_ids),
+        )
+
+    async def delete(self, user: User):
+        await self._repository.delete(user)
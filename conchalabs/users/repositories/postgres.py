@@ -1,9 +1,12 @@
 from datetime import datetime
 from uuid import UUID
 
+from sqlalchemy import any_, bindparam, delete, insert, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from conchalabs.commons.pagination import Page, decode_cursor, encode_cursor
 from conchalabs.users.errors import UserNotFoundError
 from conchalabs.users.models import User
 from conchalabs.users.repositories.base import UserRepository
@@ -22,6 +25,42 @@ class PostgresUserRepository(UserRepository):
 
         return user
 
+    async def create(self, user: User) -> User:
+        user.updated_at = datetime.utcnow()
+        columns = User.__table__.columns  # type: ignore
+
+        query = (
+            insert(User)
+            .values({column.name: getattr(user, column.name) for column in columns})
+            .returning(*columns)
+        )
+
+        result = await self._session.execute(select(User).from_statement(query))
+        created_user = result.scalars().one()
+        await self._session.commit()
+
+        return created_user
+
+    async def update(self, user_id: UUID, values: dict) -> User:
+        query = (
+            update(User)
+            .where(User.id == user_id)
+            .values(**values, updated_at=datetime.utcnow())
+            .returning(*User.__table__.columns)  # type: ignore
+        )
+
+        result = await self._session.execute(
+            select(User).from_statement(query).execution_options(populate_existing=True)
+        )
+        user = result.scalars().first()
+
+        if user is None:
+            raise UserNotFoundError()
+
+        await self._session.commit()
+
+        return user
+
     async def find(self, filters: dict) -> list[User]:
         query = select(User)
 
@@ -31,6 +70,42 @@ class PostgresUserRepository(UserRepository):
         users = await self._session.execute(query)
         return users.scalars().all()
 
+    async def find_page(
+        self, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[User]:
+        query = self._page_query(filters, limit, cursor)
+
+        result = await self._session.execute(query)
+        users = result.scalars().all()
+
+        if len(users) <= limit:
+            return Page(items=users)
+
+        last_user = users[limit - 1]
+        return Page(
+            items=users[:limit],
+            next_cursor=encode_cursor(last_user.created_at, last_user.id),
+        )
+
+    async def find_page_rows(
+        self, filters: dict, limit: int, cursor: str | None = None
+    ) -> Page[dict]:
+        query = self._page_query(filters, limit, cursor).with_only_columns(
+            *User.__table__.columns  # type: ignore
+        )
+
+        result = await self._session.execute(query)
+        users = [dict(row) for row in result.mappings()]
+
+        if len(users) <= limit:
+            return Page.construct(items=users)
+
+        last_user = users[limit - 1]
+        return Page.construct(
+            items=users[:limit],
+            next_cursor=encode_cursor(last_user["created_at"], last_user["id"]),
+        )
+
     async def get_by_id(self, user_id: UUID) -> User:
         query = select(User).where(User.id == user_id)
 
@@ -42,6 +117,29 @@ class PostgresUserRepository(UserRepository):
 
         return user
 
+    async def get_many(self, user_ids: list[UUID]) -> list[User]:
+        # A single array parameter, so every batch size shares the same prepared statement
+        id_type = User.__table__.c.id.type  # type: ignore
+        ids = bindparam("user_ids", user_ids, type_=ARRAY(id_type))
+        query = select(User).where(User.id == any_(ids))
+
+        result = await self._session.execute(query)
+        return result.scalars().all()
+
     async def delete(self, user: User):
-        await self._session.delete(user)
+        await self._session.execute(delete(User).where(User.id == user.id))
         await self._session.commit()
+
+    @staticmethod
+    def _page_query(filters: dict, limit: int, cursor: str | None):
+        query = select(User).order_by(User.created_at, User.id).limit(limit + 1)
+
+        for field, val in filters.items():
+            query = query.where(getattr(User, field) == val)
+
+        if cursor is not None:
+            created_at, user_id = decode_cursor(cursor)
+            keyset = tuple_(User.created_at, User.id)  # type: ignore
+            query = query.where(keyset > tuple_(created_at, user_id))  # type: ignore
+
+        return query
@@ -1,20 +1,37 @@
 from http import HTTPStatus
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-
-from conchalabs.dependencies.database import get_user_repository
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from conchalabs.commons.errors import InvalidCursorError
+from conchalabs.commons.pagination import Page, page_response
+from conchalabs.dependencies.database import get_user_repository, read_only_route
+from conchalabs.dependencies.timeouts import listing_timeout, lookup_timeout
+from conchalabs.middlewares.instrumentation import InstrumentedRoute
+from conchalabs.settings import settings
 from conchalabs.users.errors import UserNotFoundError
-from conchalabs.users.models import User, UserCreate, UserUpdate
+from conchalabs.users.models import (
+    User,
+    UserBatchGet,
+    UserBatchGetResult,
+    UserCreate,
+    UserUpdate,
+)
 from conchalabs.users.repositories.base import UserRepository
 
 router = APIRouter(
     prefix="/api/v1/users",
     tags=["Users"],
+    route_class=InstrumentedRoute,
 )
 
 
-@router.post("", status_code=HTTPStatus.CREATED, response_model=User)
+@router.post(
+    "",
+    status_code=HTTPStatus.CREATED,
+    response_model=User,
+    dependencies=[Depends(lookup_timeout)],
+)
 async def create_user(
     user_data: UserCreate,
     repository: UserRepository = Depends(get_user_repository),
@@ -26,14 +43,36 @@ async def create_user(
         image=user_data.image,
     )
 
-    return await repository.save(user)
+    return await repository.create(user)
+
+
+@router.post(
+    ":batchGet",
+    response_model=UserBatchGetResult,
+    dependencies=[Depends(listing_timeout), Depends(read_only_route)],
+)
+async def batch_get_users(
+    batch_data: UserBatchGet,
+    repository: UserRepository = Depends(get_user_repository),
+):
+    user_ids = list(dict.fromkeys(batch_data.ids))
+    users_by_id = {user.id: user for user in await repository.get_many(user_ids)}
+
+    return UserBatchGetResult(
+        users=[users_by_id[user_id] for user_id in user_ids if user_id in users_by_id],
+        missing_ids=[user_id for user_id in user_ids if user_id not in users_by_id],
+    )
 
 
-@router.get("", response_model=list[User])
+@router.get("", response_model=Page[User], dependencies=[Depends(listing_timeout)])
 async def list_users(
     name: str | None = None,
     email: str | None = None,
     address: str | None = None,
+    limit: int = Query(
+        default=settings.default_page_size, ge=1, le=settings.max_page_size
+    ),
+    cursor: str | None = None,
     repository: UserRepository = Depends(get_user_repository),
 ):
     filters = {}
@@ -45,10 +84,20 @@ async def list_users(
     if address is not None:
         filters["address"] = address
 
-    return await repository.find(filters)
+    try:
+        if settings.fast_json_responses:
+            page = await repository.find_page_rows(filters, limit, cursor)
+            return page_response(page)
+
+        return await repository.find_page(filters, limit, cursor)
+    except InvalidCursorError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from error
 
 
-@router.get("/{user_id}", response_model=User)
+@router.get("/{user_id}", response_model=User, dependencies=[Depends(lookup_timeout)])
 async def get_user_by_id(
     user_id: UUID,
     repository: UserRepository = Depends(get_user_repository),
@@ -62,21 +111,26 @@ async def get_user_by_id(
         ) from error
 
 
-@router.patch("/{user_id}", response_model=User)
+@router.patch("/{user_id}", response_model=User, dependencies=[Depends(lookup_timeout)])
 async def update_user_by_id(
     user_id: UUID,
     user_data: UserUpdate,
     repository: UserRepository = Depends(get_user_repository),
 ):
-    user = await get_user_by_id(user_id, repository)
-
-    for field, val in user_data.dict(exclude_unset=True).items():
-        setattr(user, field, val)
-
-    return await repository.save(user)
+    try:
+        return await repository.update(user_id, user_data.dict(exclude_unset=True))
+    except UserNotFoundError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="User not found",
+        ) from error
 
 
-@router.delete("/{user_id}", status_code=HTTPStatus.NO_CONTENT)
+@router.delete(
+    "/{user_id}",
+    status_code=HTTPStatus.NO_CONTENT,
+    dependencies=[Depends(lookup_timeout)],
+)
 async def delete_user_by_id(
     user_id: UUID,
     repository: UserRepository = Depends(get_user_repository),
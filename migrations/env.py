@@ -21,6 +21,7 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 from sqlmodel import SQLModel
 
+from conchalabs.tick_percentiles import models
 from conchalabs.user_audios import models
 from conchalabs.users import models
 
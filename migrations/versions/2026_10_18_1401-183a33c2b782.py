@@ -0,0 +1,123 @@
+"""store audio ticks as real array
+
+Revision ID: 183a33c2b782
+Revises: 9a10bbd0627d
+Create Date: 2026-10-18 14:01:16.169290
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "183a33c2b782"
+down_revision = "9a10bbd0627d"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10_000
+
+TO_REAL_ARRAY = (
+    "CASE WHEN {ticks} IS NULL THEN NULL "
+    "ELSE ARRAY(SELECT json_array_elements_text({ticks})::real) END"
+)
+TO_JSON = "to_json({ticks})"
+
+SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION useraudio_sync_{target_column}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.{target_column} := {expression};
+    RETURN NEW;
+END
+$$
+"""
+
+SYNC_TRIGGER = """
+CREATE TRIGGER useraudio_sync_{target_column}
+BEFORE INSERT OR UPDATE OF ticks ON useraudio
+FOR EACH ROW EXECUTE FUNCTION useraudio_sync_{target_column}()
+"""
+
+
+def _convert_ticks_in_batches(target_column: str, expression: str) -> None:
+    """Fills target_column from the ticks column, committing every BATCH_SIZE rows so a large table
+    is not rewritten in a single long transaction. Running it again over converted rows is harmless.
+
+    A trigger created before the first batch keeps target_column in sync for rows the app inserts or
+    updates while the batches run, so rows behind the batch cursor are not left stale."""
+    connection = op.get_bind()
+    last_id = "00000000-0000-0000-0000-000000000000"
+
+    find_batch_end = sa.text(
+        """
+        SELECT CAST(id AS text) FROM useraudio
+        WHERE id > CAST(:last_id AS uuid)
+        ORDER BY id
+        OFFSET :batch_size - 1
+        LIMIT 1
+        """
+    )
+    convert_batch = sa.text(
+        f"""
+        UPDATE useraudio SET {target_column} = {expression.format(ticks="ticks")}
+        WHERE id > CAST(:last_id AS uuid) AND id <= CAST(:batch_end AS uuid)
+        """
+    )
+    convert_remaining = sa.text(
+        f"""
+        UPDATE useraudio SET {target_column} = {expression.format(ticks="ticks")}
+        WHERE id > CAST(:last_id AS uuid)
+        """
+    )
+
+    op.execute(
+        SYNC_FUNCTION.format(
+            target_column=target_column,
+            expression=expression.format(ticks="NEW.ticks"),
+        )
+    )
+    op.execute(f"DROP TRIGGER IF EXISTS useraudio_sync_{target_column} ON useraudio")
+    op.execute(SYNC_TRIGGER.format(target_column=target_column))
+
+    # Entering the block commits the column and the trigger, so the app's writes see both from here on.
+    with op.get_context().autocommit_block():
+        while True:
+            batch_end = connection.execute(
+                find_batch_end, {"last_id": last_id, "batch_size": BATCH_SIZE}
+            ).scalar()
+
+            if batch_end is None:
+                connection.execute(convert_remaining, {"last_id": last_id})
+                break
+
+            connection.execute(
+                convert_batch, {"last_id": last_id, "batch_end": batch_end}
+            )
+            last_id = batch_end
+
+
+def _swap_ticks_column(target_column: str, expression: str) -> None:
+    """Replaces ticks with target_column. The lock blocks writes until the migration commits, so the
+    catch-up below sees every row, and none can change between it and the column swap."""
+    op.execute("LOCK TABLE useraudio IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        f"UPDATE useraudio SET {target_column} = {expression.format(ticks='ticks')} "
+        f"WHERE {target_column} IS NULL AND ticks IS NOT NULL"
+    )
+    op.execute(f"DROP TRIGGER useraudio_sync_{target_column} ON useraudio")
+    op.execute(f"DROP FUNCTION useraudio_sync_{target_column}()")
+    op.drop_column("useraudio", "ticks")
+    op.alter_column("useraudio", target_column, new_column_name="ticks")
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE useraudio ADD COLUMN IF NOT EXISTS ticks_real real[]")
+    _convert_ticks_in_batches("ticks_real", TO_REAL_ARRAY)
+    _swap_ticks_column("ticks_real", TO_REAL_ARRAY)
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE useraudio ADD COLUMN IF NOT EXISTS ticks_json json")
+    _convert_ticks_in_batches("ticks_json", TO_JSON)
+    _swap_ticks_column("ticks_json", TO_JSON)
@@ -0,0 +1,148 @@
+"""add user audio aggregates
+
+Revision ID: 6a77c5e41b6d
+Revises: f0a808618089
+Create Date: 2026-10-18 14:38:07.666996
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "6a77c5e41b6d"
+down_revision = "f0a808618089"
+branch_labels = None
+depends_on = None
+
+ADD_TICKS_FUNCTION = """
+CREATE FUNCTION useraudio_add_ticks(
+    sums double precision[], ticks real[], weight double precision, squared boolean
+) RETURNS double precision[] LANGUAGE sql IMMUTABLE AS $$
+    SELECT coalesce(
+        array_agg(
+            coalesce(s, 0)
+            + weight * CASE WHEN squared THEN coalesce(t, 0)::float8 ^ 2 ELSE coalesce(t, 0) END
+            ORDER BY position
+        ),
+        '{}'
+    )
+    FROM unnest(sums, ticks) WITH ORDINALITY AS u(s, t, position)
+$$
+"""
+
+# The max(created_at) lookup on removal is only needed when the latest audio of the user is removed,
+# and it stops once the user has no audios left, so deleting a user with many audios stays linear.
+MAINTAIN_AGGREGATE_FUNCTION = """
+CREATE FUNCTION useraudio_maintain_aggregate() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL THEN
+        UPDATE useraudioaggregate SET
+            audio_count = audio_count - 1,
+            last_created_at = CASE
+                WHEN last_created_at IS NULL OR last_created_at > OLD.created_at
+                    THEN last_created_at
+                ELSE (SELECT max(created_at) FROM useraudio WHERE user_id = OLD.user_id)
+            END,
+            tick_sums = useraudio_add_ticks(tick_sums, OLD.ticks, -1, false),
+            tick_square_sums = useraudio_add_ticks(tick_square_sums, OLD.ticks, -1, true)
+        WHERE user_id = OLD.user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL THEN
+        INSERT INTO useraudioaggregate AS aggregate
+            (user_id, audio_count, last_created_at, tick_sums, tick_square_sums)
+        VALUES (
+            NEW.user_id,
+            1,
+            NEW.created_at,
+            useraudio_add_ticks('{}', NEW.ticks, 1, false),
+            useraudio_add_ticks('{}', NEW.ticks, 1, true)
+        )
+        ON CONFLICT (user_id) DO UPDATE SET
+            audio_count = aggregate.audio_count + 1,
+            last_created_at = greatest(aggregate.last_created_at, NEW.created_at),
+            tick_sums = useraudio_add_ticks(aggregate.tick_sums, NEW.ticks, 1, false),
+            tick_square_sums = useraudio_add_ticks(aggregate.tick_square_sums, NEW.ticks, 1, true);
+    END IF;
+
+    RETURN NULL;
+END
+$$
+"""
+
+MAINTAIN_AGGREGATE_TRIGGER = """
+CREATE TRIGGER useraudio_maintain_aggregate
+AFTER INSERT OR DELETE OR UPDATE OF user_id, ticks, created_at ON useraudio
+FOR EACH ROW EXECUTE FUNCTION useraudio_maintain_aggregate()
+"""
+
+# Writes wait for the lock until the migration commits, so they are either in the backfill or counted by
+# the trigger, never both nor neither.
+BACKFILL_AGGREGATES = """
+INSERT INTO useraudioaggregate (user_id, audio_count, last_created_at, tick_sums, tick_square_sums)
+SELECT audios.user_id,
+       audios.audio_count,
+       audios.last_created_at,
+       coalesce(ticks.tick_sums, '{}'),
+       coalesce(ticks.tick_square_sums, '{}')
+FROM (
+    SELECT user_id, count(*) AS audio_count, max(created_at) AS last_created_at
+    FROM useraudio
+    WHERE user_id IS NOT NULL
+    GROUP BY user_id
+) AS audios
+LEFT JOIN (
+    SELECT user_id,
+           array_agg(tick_sum ORDER BY position) AS tick_sums,
+           array_agg(tick_square_sum ORDER BY position) AS tick_square_sums
+    FROM (
+        SELECT audio.user_id, tick.position,
+               sum(coalesce(tick.value, 0)::float8) AS tick_sum,
+               sum(coalesce(tick.value, 0)::float8 ^ 2) AS tick_square_sum
+        FROM useraudio AS audio
+        CROSS JOIN unnest(audio.ticks) WITH ORDINALITY AS tick(value, position)
+        WHERE audio.user_id IS NOT NULL
+        GROUP BY audio.user_id, tick.position
+    ) AS positions
+    GROUP BY user_id
+) AS ticks ON ticks.user_id = audios.user_id
+"""
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table(
+        "useraudioaggregate",
+        sa.Column("user_id", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column(
+            "tick_sums", postgresql.ARRAY(postgresql.DOUBLE_PRECISION()), nullable=False
+        ),
+        sa.Column(
+            "tick_square_sums",
+            postgresql.ARRAY(postgresql.DOUBLE_PRECISION()),
+            nullable=False,
+        ),
+        sa.Column("audio_count", sa.Integer(), nullable=False),
+        sa.Column("last_created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="cascade"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # ### end Alembic commands ###
+    op.execute("LOCK TABLE useraudio IN SHARE MODE")
+    op.execute(ADD_TICKS_FUNCTION)
+    op.execute(MAINTAIN_AGGREGATE_FUNCTION)
+    op.execute(MAINTAIN_AGGREGATE_TRIGGER)
+    op.execute(BACKFILL_AGGREGATES)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER useraudio_maintain_aggregate ON useraudio")
+    op.execute("DROP FUNCTION useraudio_maintain_aggregate()")
+    op.execute(
+        "DROP FUNCTION useraudio_add_ticks(double precision[], real[], double precision, boolean)"
+    )
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table("useraudioaggregate")
+    # ### end Alembic commands ###
@@ -2,16 +2,20 @@ import asyncio
 import contextlib
 
 import pytest
+from fastapi import Request
 from httpx import AsyncClient
 from sqlmodel import delete
 
 from conchalabs.app import create_app
+from conchalabs.dependencies.cache import get_user_cache
+from conchalabs.dependencies.coalescing import get_user_audio_reads, get_user_reads
 from conchalabs.dependencies.database import (
     get_db_session,
     get_user_audio_repository,
     get_user_repository,
 )
 from conchalabs.settings import settings
+from conchalabs.tick_percentiles.models import AggregationWatermark, TickPercentiles
 from conchalabs.user_audios.models import UserAudio
 from conchalabs.users.models import User
 
@@ -23,8 +27,14 @@ def event_loop():
     loop.close()
 
 
+STATEMENT_BUDGET = 5
+
+
 @pytest.fixture()
-def test_app():
+def test_app(monkeypatch):
+    monkeypatch.setattr(settings, "db_statement_budget", STATEMENT_BUDGET)
+    monkeypatch.setattr(settings, "db_statement_budget_mode", "raise")
+
     return create_app()
 
 
@@ -41,14 +51,35 @@ async def db_session():
         yield session
 
 
+# The repositories of the tests are used to set up and check writes, like those of a POST request
+WRITE_REQUEST = Request({"type": "http", "method": "POST", "headers": []})
+
+
 @pytest.fixture()
 def user_repository(db_session):
-    return get_user_repository(db_session)
+    return get_user_repository(
+        WRITE_REQUEST, db_session, get_user_cache(), get_user_reads()
+    )
 
 
 @pytest.fixture()
 def user_audio_repository(db_session):
-    return get_user_audio_repository(db_session)
+    return get_user_audio_repository(WRITE_REQUEST, db_session, get_user_audio_reads())
+
+
+@pytest.fixture()
+def user_payload():
+    return {
+        "name": "Lucas Bernardes",
+        "email": "lucascbernardes@live.com",
+        "address": "Brazil",
+        "image": "https://example.com/img.png",
+    }
+
+
+@pytest.fixture()
+async def user(user_repository, user_payload):
+    return await user_repository.save(User(**user_payload))
 
 
 @pytest.fixture(autouse=True)
@@ -58,4 +89,6 @@ async def isolate_tests(db_session):
     finally:
         await db_session.exec(delete(UserAudio))
         await db_session.exec(delete(User))
+        await db_session.exec(delete(TickPercentiles))
+        await db_session.exec(delete(AggregationWatermark))
         await db_session.commit()
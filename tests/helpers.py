@@ -0,0 +1,11 @@
+METRICS_API_URL = "/internal/metrics"
+
+
+def get_sample(metrics: str, sample: str) -> float:
+    for line in metrics.splitlines():
+        name, _, value = line.rpartition(" ")
+
+        if name == sample:
+            return float(value)
+
+    return 0
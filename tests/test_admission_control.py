@@ -0,0 +1,193 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+
+from conchalabs.app import create_app
+from conchalabs.middlewares.admission_control import AdmissionController
+from conchalabs.settings import settings
+from conchalabs.users.models import User
+from conchalabs.users.repositories.postgres import PostgresUserRepository
+from tests.helpers import METRICS_API_URL, get_sample
+
+USERS_API_URL = "/api/v1/users"
+
+
+def create_controller(limit=1, max_waiting_reads=1, max_waiting_writes=1, timeout=1.0):
+    return AdmissionController(
+        limit, {"read": max_waiting_reads, "write": max_waiting_writes}, timeout
+    )
+
+
+async def test_admission_controller_admits_up_to_the_limit():
+    controller = create_controller(limit=2, max_waiting_reads=0)
+
+    assert await controller.acquire("read")
+    assert await controller.acquire("read")
+    assert not await controller.acquire("read")
+    assert controller.in_flight == 2
+
+    controller.release()
+
+    assert await controller.acquire("read")
+
+
+async def test_admission_controller_queues_until_a_slot_is_released():
+    controller = create_controller()
+    await controller.acquire("read")
+
+    waiting = asyncio.create_task(controller.acquire("read"))
+    await asyncio.sleep(0)
+
+    assert controller.waiting("read") == 1
+    assert not await controller.acquire("read")
+
+    controller.release()
+
+    assert await waiting
+    assert controller.in_flight == 1
+    assert controller.waiting("read") == 0
+
+
+async def test_admission_controller_admits_writes_first():
+    controller = create_controller()
+    await controller.acquire("read")
+    admitted = []
+
+    async def acquire(priority):
+        await controller.acquire(priority)
+        admitted.append(priority)
+
+    read = asyncio.create_task(acquire("read"))
+    await asyncio.sleep(0)
+    write = asyncio.create_task(acquire("write"))
+    await asyncio.sleep(0)
+
+    controller.release()
+    await write
+    controller.release()
+    await read
+
+    assert admitted == ["write", "read"]
+
+
+async def test_admission_controller_times_out_waiting():
+    controller = create_controller(timeout=0.01)
+    await controller.acquire("read")
+
+    assert not await controller.acquire("read")
+    assert controller.waiting("read") == 0
+
+    controller.release()
+
+    assert controller.in_flight == 0
+
+
+async def test_admission_controller_forgets_cancelled_waiters():
+    controller = create_controller()
+    await controller.acquire("write")
+
+    waiting = asyncio.create_task(controller.acquire("write"))
+    await asyncio.sleep(0)
+    waiting.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    controller.release()
+
+    assert controller.in_flight == 0
+    assert await controller.acquire("write")
+
+
+@pytest.fixture()
+def admission_app(monkeypatch, test_app):
+    # After test_app, so that its statement budget applies too
+    monkeypatch.setattr(settings, "admission_control_enabled", True)
+    monkeypatch.setattr(settings, "admission_max_concurrency", 1)
+    monkeypatch.setattr(settings, "admission_max_waiting_reads", 0)
+    monkeypatch.setattr(settings, "admission_retry_after", 2)
+
+    return create_app()
+
+
+async def test_requests_over_the_limit_are_rejected(
+    admission_app, monkeypatch, user: User
+):
+    released = asyncio.Event()
+    get_by_id = PostgresUserRepository.get_by_id
+
+    async def gated_get_by_id(self, user_id):
+        await released.wait()
+
+        return await get_by_id(self, user_id)
+
+    monkeypatch.setattr(PostgresUserRepository, "get_by_id", gated_get_by_id)
+
+    async with AsyncClient(app=admission_app, base_url=settings.api_base_url) as client:
+        admitted = asyncio.create_task(client.get(f"{USERS_API_URL}/{user.id}"))
+        await asyncio.sleep(0.05)
+
+        rejected = await client.get(f"{USERS_API_URL}/{user.id}")
+        health = await client.get("/health")
+
+        released.set()
+        response = await admitted
+        metrics = (await client.get(METRICS_API_URL)).text
+
+    assert rejected.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert rejected.headers["Retry-After"] == "2"
+    assert health.status_code == HTTPStatus.OK
+    assert response.status_code == HTTPStatus.OK
+    assert (
+        get_sample(
+            metrics,
+            'http_requests_total{method="GET",route="/api/v1/users/{user_id}",status="503"}',
+        )
+        >= 1
+    )
+    assert (
+        get_sample(
+            metrics, 'admission_requests_total{priority="read",outcome="rejected"}'
+        )
+        >= 1
+    )
+
+
+async def test_read_only_routes_are_admitted_as_reads(
+    admission_app, monkeypatch, user: User
+):
+    released = asyncio.Event()
+    get_by_id = PostgresUserRepository.get_by_id
+
+    async def gated_get_by_id(self, user_id):
+        await released.wait()
+
+        return await get_by_id(self, user_id)
+
+    monkeypatch.setattr(PostgresUserRepository, "get_by_id", gated_get_by_id)
+
+    async with AsyncClient(app=admission_app, base_url=settings.api_base_url) as client:
+        admitted = asyncio.create_task(client.get(f"{USERS_API_URL}/{user.id}"))
+        await asyncio.sleep(0.05)
+
+        before = get_sample(
+            (await client.get(METRICS_API_URL)).text,
+            'admission_requests_total{priority="read",outcome="rejected"}',
+        )
+        rejected = await client.post(
+            f"{USERS_API_URL}:batchGet", json={"ids": [str(user.id)]}
+        )
+
+        released.set()
+        await admitted
+        metrics = (await client.get(METRICS_API_URL)).text
+
+    assert rejected.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert (
+        get_sample(
+            metrics, 'admission_requests_total{priority="read",outcome="rejected"}'
+        )
+        == before + 1
+    )
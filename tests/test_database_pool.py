@@ -0,0 +1,36 @@
+from http import HTTPStatus
+
+from conchalabs.commons.metrics import Histogram
+
+POOL_STATS_API_URL = "/internal/pool"
+
+
+def test_histogram_counts_cumulative_buckets():
+    histogram = Histogram(buckets=(0.1, 1.0))
+
+    histogram.observe(0.05)
+    histogram.observe(0.1)
+    histogram.observe(0.5)
+    histogram.observe(2.0)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot.buckets == {"0.1": 2, "1.0": 3, "+Inf": 4}
+    assert snapshot.count == 4
+    assert snapshot.sum == 2.65
+
+
+async def test_pool_stats(client):
+    await client.get("/health")
+
+    response = await client.get(POOL_STATS_API_URL)
+
+    assert response.status_code == HTTPStatus.OK
+
+    body = response.json()
+
+    assert body["size"] == 5
+    assert body["max_overflow"] == 10
+    assert body["checked_in"] + body["checked_out"] >= 1
+    assert body["wait_seconds"]["count"] >= 1
+    assert body["wait_seconds"]["buckets"]["+Inf"] == body["wait_seconds"]["count"]
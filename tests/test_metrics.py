@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+from conchalabs.commons.metrics import MetricsRegistry
+from tests.helpers import METRICS_API_URL, get_sample
+
+USERS_API_URL = "/api/v1/users"
+
+
+def test_registry_exposes_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs run.", ("name",))
+    histogram = registry.histogram("job_seconds", "Job duration.", buckets=(1.0,))
+
+    counter.labels('say "hi"').inc()
+    histogram.labels().observe(0.5)
+
+    assert registry.expose() == (
+        "# HELP jobs_total Jobs run.\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{name="say \\"hi\\""} 1\n'
+        "# HELP job_seconds Job duration.\n"
+        "# TYPE job_seconds histogram\n"
+        'job_seconds_bucket{le="1.0"} 1\n'
+        'job_seconds_bucket{le="+Inf"} 1\n'
+        "job_seconds_sum 0.5\n"
+        "job_seconds_count 1\n"
+    )
+
+
+async def test_metrics_record_requests(client):
+    labels = '{method="GET",route="/api/v1/users"}'
+
+    response = await client.get(METRICS_API_URL)
+    previous_count = get_sample(
+        response.text, f"http_request_db_statements_count{labels}"
+    )
+    previous_statements = get_sample(
+        response.text, f"http_request_db_statements_sum{labels}"
+    )
+
+    await client.get(USERS_API_URL)
+
+    response = await client.get(METRICS_API_URL)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"].startswith("text/plain")
+
+    metrics = response.text
+
+    assert (
+        get_sample(metrics, f"http_request_db_statements_count{labels}")
+        == previous_count + 1
+    )
+    assert (
+        get_sample(metrics, f"http_request_db_statements_sum{labels}")
+        == previous_statements + 1
+    )
+    assert get_sample(metrics, f"http_request_db_seconds_sum{labels}") > 0
+    assert get_sample(metrics, f"http_request_serialization_seconds_sum{labels}") > 0
+    assert (
+        get_sample(
+            metrics,
+            'http_requests_total{method="GET",route="/api/v1/users",status="200"}',
+        )
+        >= 1
+    )
+
+
+async def test_metrics_label_unmatched_routes(client):
+    await client.get("/does-not-exist")
+
+    response = await client.get(METRICS_API_URL)
+
+    assert (
+        get_sample(
+            response.text,
+            'http_requests_total{method="GET",route="unmatched",status="404"}',
+        )
+        >= 1
+    )
@@ -0,0 +1,89 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from conchalabs.app import create_app
+from conchalabs.commons.errors import StatementBudgetExceededError
+from conchalabs.settings import settings
+
+USERS_API_URL = "/api/v1/users"
+
+
+@pytest.fixture()
+def inspection_settings(monkeypatch):
+    def _inspection_settings(**values):
+        for name, value in values.items():
+            monkeypatch.setattr(settings, name, value)
+
+    return _inspection_settings
+
+
+@pytest.fixture()
+async def make_client(inspection_settings):
+    clients = []
+
+    async def _make_client(**values):
+        inspection_settings(**values)
+        client = AsyncClient(app=create_app(), base_url=settings.api_base_url)
+        clients.append(client)
+        return client
+
+    yield _make_client
+
+    for client in clients:
+        await client.aclose()
+
+
+async def test_statement_budget_raises(make_client):
+    client = await make_client(db_statement_budget=0, db_statement_budget_mode="raise")
+
+    with pytest.raises(StatementBudgetExceededError, match="GET /api/v1/users"):
+        await client.get(USERS_API_URL)
+
+
+async def test_statement_budget_replaces_the_response(inspection_settings):
+    inspection_settings(db_statement_budget=0, db_statement_budget_mode="raise")
+    transport = ASGITransport(app=create_app(), raise_app_exceptions=False)
+
+    async with AsyncClient(
+        transport=transport, base_url=settings.api_base_url
+    ) as client:
+        response = await client.get(USERS_API_URL)
+
+    assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert response.json() == {
+        "detail": "GET /api/v1/users executed 1 SQL statements, over the budget of 0"
+    }
+
+
+async def test_statement_budget_warns(make_client, caplog):
+    client = await make_client(db_statement_budget=0, db_statement_budget_mode="warn")
+
+    with caplog.at_level(logging.WARNING):
+        response = await client.get(USERS_API_URL)
+
+    assert response.status_code == HTTPStatus.OK
+    assert "executed 1 SQL statements, over the budget of 0" in caplog.text
+
+
+async def test_statement_budget_not_exceeded(make_client, caplog):
+    client = await make_client(db_statement_budget=1, db_statement_budget_mode="raise")
+
+    with caplog.at_level(logging.WARNING):
+        response = await client.get(USERS_API_URL)
+
+    assert response.status_code == HTTPStatus.OK
+    assert "over the budget" not in caplog.text
+
+
+async def test_slow_query_is_explained(make_client, caplog):
+    client = await make_client(db_statement_budget=None, db_slow_query_threshold=0)
+
+    with caplog.at_level(logging.WARNING):
+        response = await client.get(USERS_API_URL)
+
+    assert response.status_code == HTTPStatus.OK
+    assert "Slow query on GET /api/v1/users" in caplog.text
+    assert "Execution Time" in caplog.text
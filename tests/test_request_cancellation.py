@@ -0,0 +1,166 @@
+import asyncio
+import time
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import text
+
+from conchalabs.dependencies.database import engine
+from conchalabs.middlewares.disconnect import CLIENT_CLOSED_REQUEST
+from conchalabs.settings import settings
+from conchalabs.users.models import User
+from conchalabs.users.repositories.postgres import PostgresUserRepository
+
+USERS_API_URL = "/api/v1/users"
+
+
+@pytest.fixture()
+def statement_timeouts(monkeypatch):
+    """Records the statement_timeout in effect when the users are read."""
+    timeouts = []
+    get_by_id = PostgresUserRepository.get_by_id
+    find_page = PostgresUserRepository.find_page
+
+    async def show_statement_timeout(repository):
+        result = await repository._session.execute(text("SHOW statement_timeout"))
+        timeouts.append(result.scalar())
+
+    async def recording_get_by_id(self, user_id):
+        await show_statement_timeout(self)
+        return await get_by_id(self, user_id)
+
+    async def recording_find_page(self, filters, limit, cursor=None):
+        await show_statement_timeout(self)
+        return await find_page(self, filters, limit, cursor)
+
+    monkeypatch.setattr(PostgresUserRepository, "get_by_id", recording_get_by_id)
+    monkeypatch.setattr(PostgresUserRepository, "find_page", recording_find_page)
+
+    return timeouts
+
+
+def sleep_in_get_by_id(monkeypatch, seconds: float):
+    async def sleeping_get_by_id(self, user_id):
+        await self._session.execute(text(f"SELECT pg_sleep({seconds})"))
+
+    monkeypatch.setattr(PostgresUserRepository, "get_by_id", sleeping_get_by_id)
+
+
+async def test_statement_timeout_by_route_class(
+    client, monkeypatch, statement_timeouts, user: User
+):
+    monkeypatch.setattr(settings, "db_statement_timeout_lookup", 0.5)
+    monkeypatch.setattr(settings, "db_statement_timeout_listing", 2.0)
+
+    await client.get(f"{USERS_API_URL}/{user.id}")
+    await client.get(USERS_API_URL)
+
+    assert statement_timeouts == ["500ms", "2s"]
+
+
+async def test_statement_timeout_not_set(client, statement_timeouts, user: User):
+    await client.get(f"{USERS_API_URL}/{user.id}")
+
+    assert statement_timeouts == ["0"]
+
+
+async def test_statement_over_the_timeout(client, monkeypatch, user: User):
+    monkeypatch.setattr(settings, "db_statement_timeout_lookup", 0.05)
+    sleep_in_get_by_id(monkeypatch, 5)
+
+    start = time.perf_counter()
+    response = await client.get(f"{USERS_API_URL}/{user.id}")
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json() == {"detail": "The query took too long"}
+    assert time.perf_counter() - start < 2
+
+
+async def running_sleeps() -> list:
+    # On a connection of its own, as pg_stat_activity doesn't change within a transaction
+    async with engine.connect() as connection:
+        result = await connection.execute(
+            text(
+                "SELECT pid FROM pg_stat_activity "
+                "WHERE state = 'active' AND query = 'SELECT pg_sleep(5)'"
+            )
+        )
+        return result.all()
+
+
+def make_scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("localhost", 80),
+    }
+
+
+async def test_client_disconnect_cancels_the_query(test_app, monkeypatch, user: User):
+    sleep_in_get_by_id(monkeypatch, 5)
+    disconnect = asyncio.Event()
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    checked_out = engine.pool.checkedout()  # type: ignore
+    start = time.perf_counter()
+    request = asyncio.create_task(
+        test_app(make_scope(f"{USERS_API_URL}/{user.id}"), receive, send)
+    )
+
+    while not await running_sleeps():
+        await asyncio.sleep(0.01)
+
+    disconnect.set()
+    await request
+
+    assert time.perf_counter() - start < 2
+    assert sent[0]["status"] == CLIENT_CLOSED_REQUEST
+
+    # pg_cancel_backend runs in the background
+    for _ in range(50):
+        if not await running_sleeps():
+            break
+
+        await asyncio.sleep(0.02)
+
+    assert await running_sleeps() == []
+    assert engine.pool.checkedout() == checked_out  # type: ignore
+
+
+async def test_client_disconnect_while_sending_the_body(test_app, user: User):
+    messages = [
+        {"type": "http.request", "body": b"{", "more_body": True},
+        {"type": "http.disconnect"},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = make_scope(f"{USERS_API_URL}/{user.id}")
+    await test_app({**scope, "method": "PATCH"}, receive, send)
+
+    assert sent[0]["status"] == CLIENT_CLOSED_REQUEST
@@ -0,0 +1,222 @@
+import asyncio
+from http import HTTPStatus
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from conchalabs.commons.singleflight import SingleFlight
+from conchalabs.dependencies import database
+from conchalabs.dependencies.coalescing import get_user_reads
+from conchalabs.settings import settings
+from conchalabs.users.models import User
+from conchalabs.users.repositories.postgres import PostgresUserRepository
+from tests.helpers import METRICS_API_URL, get_sample
+
+USERS_API_URL = "/api/v1/users"
+
+
+class GatedCall:
+    """Counts its calls and holds them until released, so that concurrent callers overlap."""
+
+    def __init__(self, result=None, error: Exception | None = None):
+        self.calls = 0
+        self.released = asyncio.Event()
+        self._result = result
+        self._error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await self.released.wait()
+
+        if self._error is not None:
+            raise self._error
+
+        return self._result
+
+
+async def test_single_flight_shares_one_call():
+    single_flight = SingleFlight("test_shares")
+    call = GatedCall(result=42)
+
+    calls = [asyncio.create_task(single_flight.do("key", call)) for _ in range(5)]
+    await asyncio.sleep(0)
+    call.released.set()
+
+    assert await asyncio.gather(*calls) == [42] * 5
+    assert call.calls == 1
+
+
+async def test_single_flight_runs_different_keys_apart():
+    single_flight = SingleFlight("test_keys")
+    call = GatedCall(result=42)
+
+    calls = [asyncio.create_task(single_flight.do(key, call)) for key in ("a", "b")]
+    await asyncio.sleep(0)
+    call.released.set()
+
+    await asyncio.gather(*calls)
+
+    assert call.calls == 2
+
+
+async def test_single_flight_shares_errors():
+    single_flight = SingleFlight("test_errors")
+    call = GatedCall(error=ValueError("boom"))
+
+    calls = [asyncio.create_task(single_flight.do("key", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    call.released.set()
+
+    results = await asyncio.gather(*calls, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert call.calls == 1
+
+
+async def test_single_flight_does_not_keep_results():
+    single_flight = SingleFlight("test_no_cache")
+    call = GatedCall(result=42)
+    call.released.set()
+
+    await single_flight.do("key", call)
+    await single_flight.do("key", call)
+
+    assert call.calls == 2
+
+
+async def test_single_flight_reruns_cancelled_leader():
+    single_flight = SingleFlight("test_cancel")
+    call = GatedCall(result=42)
+
+    leader = asyncio.create_task(single_flight.do("key", call))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(single_flight.do("key", call))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    call.released.set()
+
+    assert await follower == 42
+    assert leader.cancelled()
+    assert call.calls == 2
+
+
+async def test_get_user_coalesces_concurrent_requests(
+    test_app, client, monkeypatch, user: User
+):
+    single_flight = SingleFlight("test_user_reads")
+    test_app.dependency_overrides[get_user_reads] = lambda: single_flight
+    released = asyncio.Event()
+    calls = 0
+    get_by_id = PostgresUserRepository.get_by_id
+
+    async def gated_get_by_id(self, user_id):
+        nonlocal calls
+        calls += 1
+        await released.wait()
+
+        return await get_by_id(self, user_id)
+
+    monkeypatch.setattr(PostgresUserRepository, "get_by_id", gated_get_by_id)
+
+    requests = [
+        asyncio.create_task(client.get(f"{USERS_API_URL}/{user.id}")) for _ in range(4)
+    ]
+
+    while calls == 0:
+        await asyncio.sleep(0.01)
+
+    await asyncio.sleep(0.05)
+    released.set()
+    responses = await asyncio.gather(*requests)
+
+    assert [response.status_code for response in responses] == [HTTPStatus.OK] * 4
+    assert all(response.json()["id"] == str(user.id) for response in responses)
+    assert calls == 1
+
+    metrics = (await client.get(METRICS_API_URL)).text
+    labels = '{group="test_user_reads",role="%s"}'
+
+    assert get_sample(metrics, "singleflight_calls_total" + labels % "leader") == 1
+    assert get_sample(metrics, "singleflight_calls_total" + labels % "follower") == 3
+
+
+async def test_reads_from_different_databases_are_not_coalesced(
+    monkeypatch, db_session, user: User
+):
+    # The primary stands in for the replica, what matters is that the sessions use other engines
+    replica_engine = create_async_engine(settings.database_url)
+    monkeypatch.setattr(database, "replica_engine", replica_engine)
+    single_flight = SingleFlight("test_routed_reads")
+    released = asyncio.Event()
+    calls = 0
+    get_by_id = PostgresUserRepository.get_by_id
+
+    async def gated_get_by_id(self, user_id):
+        nonlocal calls
+        calls += 1
+        await released.wait()
+
+        return await get_by_id(self, user_id)
+
+    monkeypatch.setattr(PostgresUserRepository, "get_by_id", gated_get_by_id)
+    request = Request({"type": "http", "method": "GET", "headers": []})
+
+    async with AsyncSession(replica_engine) as replica_session:
+        reads = [
+            asyncio.create_task(
+                database.get_user_repository(
+                    request, session, None, single_flight
+                ).get_by_id(user.id)
+            )
+            for session in (db_session, replica_session)
+        ]
+        await asyncio.sleep(0.05)
+        released.set()
+        users = await asyncio.gather(*reads)
+
+    await replica_engine.dispose()
+
+    assert [read_user.id for read_user in users] == [user.id, user.id]
+    assert calls == 2
+
+
+async def test_batch_get_users_is_coalesced(test_app, client, user: User):
+    single_flight = SingleFlight("test_user_batch_reads")
+    test_app.dependency_overrides[get_user_reads] = lambda: single_flight
+
+    response = await client.post(
+        f"{USERS_API_URL}:batchGet", json={"ids": [str(user.id)]}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+    metrics = (await client.get(METRICS_API_URL)).text
+
+    assert (
+        get_sample(
+            metrics,
+            'singleflight_calls_total{group="test_user_batch_reads",role="leader"}',
+        )
+        == 1
+    )
+
+
+async def test_delete_user_is_not_coalesced(test_app, client, user: User):
+    single_flight = SingleFlight("test_user_writes")
+    test_app.dependency_overrides[get_user_reads] = lambda: single_flight
+
+    response = await client.delete(f"{USERS_API_URL}/{user.id}")
+
+    assert response.status_code == HTTPStatus.NO_CONTENT
+
+    metrics = (await client.get(METRICS_API_URL)).text
+
+    assert (
+        get_sample(
+            metrics, 'singleflight_calls_total{group="test_user_writes",role="leader"}'
+        )
+        == 0
+    )
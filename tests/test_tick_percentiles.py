@@ -0,0 +1,177 @@
+from http import HTTPStatus
+
+import pytest
+
+from conchalabs.tick_percentiles.aggregate import aggregate_tick_percentiles
+from conchalabs.tick_percentiles.errors import ConcurrentAggregationError
+from conchalabs.tick_percentiles.models import AggregationWatermark
+from conchalabs.tick_percentiles.sketch import BIN_COUNT, TickHistogram
+from conchalabs.user_audios.models import UserAudio
+from conchalabs.users.models import User
+
+
+async def save_audios(user_audio_repository, user: User, session_ids, step_count=1):
+    for session_id in session_ids:
+        await user_audio_repository.save(
+            UserAudio(
+                user_id=user.id,
+                ticks=[-100.0 + session_id + tick_index for tick_index in range(15)],
+                selected_tick=0,
+                session_id=session_id,
+                step_count=step_count,
+            )
+        )
+
+
+def test_histogram_quantiles():
+    histogram = TickHistogram()
+
+    for value in range(1, 101):
+        histogram.add(-100.0 + value * 0.9)
+
+    assert histogram.total == 100
+    # Each quantile falls inside the bin of the value with its rank
+    assert -55.0 <= histogram.quantile(0.5) <= -54.9
+    assert -95.5 <= histogram.quantile(0.05) <= -95.4
+    assert -14.5 <= histogram.quantile(0.95) <= -14.4
+
+
+def test_histogram_clamps_values_to_the_tick_range():
+    histogram = TickHistogram()
+
+    histogram.add(-10.0)
+    histogram.add(-120.0)
+
+    assert histogram.counts[0] == 1
+    assert histogram.counts[BIN_COUNT - 1] == 1
+
+
+def test_histogram_merges_by_adding_counts():
+    left, right, merged = TickHistogram(), TickHistogram(), TickHistogram()
+
+    for value in (-90.0, -80.0, -70.0):
+        left.add(value)
+        merged.add(value)
+    for value in (-60.0, -50.0):
+        right.add(value)
+        merged.add(value)
+
+    combined = TickHistogram([a + b for a, b in zip(left.counts, right.counts)])
+
+    assert combined.counts == merged.counts
+    assert combined.quantile(0.5) == merged.quantile(0.5)
+
+
+def test_empty_histogram_has_no_quantiles():
+    with pytest.raises(ValueError):
+        TickHistogram().quantile(0.5)
+
+
+async def test_aggregate_tick_percentiles(client, user, user_audio_repository):
+    await save_audios(user_audio_repository, user, range(1, 11))
+
+    assert await aggregate_tick_percentiles(lag=0) == 10
+
+    response = await client.get("/api/v1/tick-percentiles")
+
+    assert response.status_code == HTTPStatus.OK
+    percentiles = response.json()
+    assert len(percentiles) == 15
+    assert [item["tick_index"] for item in percentiles] == list(range(15))
+    assert all(item["step_count"] == 1 for item in percentiles)
+    assert all(item["count"] == 10 for item in percentiles)
+    assert "histogram" not in percentiles[0]
+    assert percentiles[0]["p50"] == pytest.approx(-95.0, abs=0.1)
+    assert percentiles[14]["p50"] == pytest.approx(-81.0, abs=0.1)
+
+
+async def test_aggregate_tick_percentiles_incrementally(
+    client, user, user_audio_repository
+):
+    await save_audios(user_audio_repository, user, range(1, 6))
+    assert await aggregate_tick_percentiles(lag=0) == 5
+
+    await save_audios(user_audio_repository, user, range(6, 11))
+    assert await aggregate_tick_percentiles(lag=0) == 5
+    assert await aggregate_tick_percentiles(lag=0) == 0
+
+    response = await client.get("/api/v1/tick-percentiles")
+
+    percentiles = response.json()
+    assert all(item["count"] == 10 for item in percentiles)
+    assert percentiles[0]["p50"] == pytest.approx(-95.0, abs=0.1)
+
+
+async def test_aggregate_tick_percentiles_skips_recent_audios(
+    user, user_audio_repository
+):
+    await save_audios(user_audio_repository, user, range(1, 6))
+
+    assert await aggregate_tick_percentiles(lag=3600) == 0
+    assert await aggregate_tick_percentiles(lag=0) == 5
+
+
+async def test_full_aggregation_rebuilds_the_percentiles(
+    client, user, user_audio_repository
+):
+    await save_audios(user_audio_repository, user, range(1, 6))
+    await save_audios(user_audio_repository, user, range(6, 11), step_count=2)
+    await aggregate_tick_percentiles(lag=0)
+
+    audios = await user_audio_repository.find({"step_count": 2})
+    for audio in audios:
+        await user_audio_repository.update(user.id, audio.id, {"step_count": 1})
+
+    assert await aggregate_tick_percentiles(full=True, lag=0) == 10
+
+    response = await client.get("/api/v1/tick-percentiles")
+
+    percentiles = response.json()
+    assert len(percentiles) == 15
+    assert all(item["step_count"] == 1 for item in percentiles)
+    assert all(item["count"] == 10 for item in percentiles)
+
+
+async def test_aggregation_fails_if_another_run_stored_its_results(
+    monkeypatch, user, user_audio_repository, db_session
+):
+    await save_audios(user_audio_repository, user, range(1, 6))
+
+    async def lock_moved_watermark(session):
+        return (user.created_at, str(user.id))
+
+    monkeypatch.setattr(
+        "conchalabs.tick_percentiles.aggregate._lock_watermark", lock_moved_watermark
+    )
+
+    with pytest.raises(ConcurrentAggregationError):
+        await aggregate_tick_percentiles(lag=0)
+
+    assert await db_session.get(AggregationWatermark, "tick_percentiles") is None
+
+
+async def test_list_tick_percentiles_by_step_count(client, user, user_audio_repository):
+    await save_audios(user_audio_repository, user, range(1, 6))
+    await save_audios(user_audio_repository, user, range(6, 11), step_count=2)
+    await aggregate_tick_percentiles(lag=0)
+
+    response = await client.get("/api/v1/tick-percentiles", params={"step_count": 2})
+
+    assert response.status_code == HTTPStatus.OK
+    percentiles = response.json()
+    assert len(percentiles) == 15
+    assert all(item["step_count"] == 2 for item in percentiles)
+    assert all(item["count"] == 5 for item in percentiles)
+
+
+async def test_list_tick_percentiles_before_aggregation(client):
+    response = await client.get("/api/v1/tick-percentiles")
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == []
+
+
+async def test_list_tick_percentiles_with_invalid_step_count(client):
+    response = await client.get("/api/v1/tick-percentiles", params={"step_count": 10})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
@@ -0,0 +1,15 @@
+from conchalabs.commons.types import to_float32, to_float32_list
+
+
+def test_to_float32_returns_the_shortest_decimal():
+    assert to_float32(-96.33000183105469) == -96.33
+    # Needs all 9 significant digits to round-trip
+    assert to_float32(0.12020188570022583) == 0.120201886
+
+
+def test_to_float32_list():
+    ticks = [-96.33000183105469, -89.04000091552734, 0.12020188570022583, -10.0]
+
+    assert to_float32_list(ticks) == [to_float32(tick) for tick in ticks]
+    assert to_float32_list([-96.33, -89.04]) == [-96.33, -89.04]
+    assert to_float32_list([]) == []
@@ -0,0 +1,96 @@
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from conchalabs.user_audios.models import UserAudio
+from conchalabs.users.models import User
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from conchalabs.user_audios.export import SCHEMA, export_user_audios  # noqa: E402
+
+
+@pytest.fixture()
+def ticks():
+    return [-96.33, -93.47, -89.04, -84.61, -80.18] * 3
+
+
+@pytest.fixture()
+async def user_audios(user: User, user_audio_repository, ticks):
+    return [
+        await user_audio_repository.save(
+            UserAudio(
+                user_id=user.id,
+                ticks=ticks,
+                selected_tick=5,
+                session_id=session_id,
+                step_count=1,
+            )
+        )
+        for session_id in range(5)
+    ]
+
+
+async def test_export_arrow(user: User, user_audios: list[UserAudio], ticks):
+    sink = io.BytesIO()
+
+    row_count = await export_user_audios(sink, user_id=user.id, batch_size=2)
+
+    reader = pa.ipc.open_stream(sink.getvalue())
+    batches = list(reader)
+    table = pa.Table.from_batches(batches)
+
+    assert row_count == 5
+    assert len(batches) == 3
+    assert table.schema == SCHEMA
+    assert sorted(table.column("id").to_pylist()) == sorted(
+        str(audio.id) for audio in user_audios
+    )
+    assert (
+        table.column("ticks").to_pylist()[0]
+        == pa.array(ticks, pa.float32()).to_pylist()
+    )
+
+
+async def test_export_parquet(user: User, user_audios: list[UserAudio]):
+    sink = io.BytesIO()
+
+    row_count = await export_user_audios(sink, file_format="parquet", user_id=user.id)
+
+    table = pq.read_table(io.BytesIO(sink.getvalue()))
+
+    assert row_count == 5
+    assert table.num_rows == 5
+    assert table.schema.field("ticks").type == pa.list_(pa.float32(), 15)
+
+
+async def test_export_filters(user: User, user_audios: list[UserAudio]):
+    sink = io.BytesIO()
+
+    await export_user_audios(
+        sink,
+        user_id=user.id,
+        session_id=user_audios[2].session_id,
+        created_from=user_audios[2].created_at,
+        created_to=user_audios[2].created_at + timedelta(seconds=1),
+    )
+
+    table = pa.ipc.open_stream(sink.getvalue()).read_all()
+
+    assert table.column("id").to_pylist() == [str(user_audios[2].id)]
+
+
+async def test_export_empty(user: User):
+    sink = io.BytesIO()
+
+    row_count = await export_user_audios(
+        sink, user_id=user.id, created_from=datetime.utcnow()
+    )
+
+    table = pa.ipc.open_stream(sink.getvalue()).read_all()
+
+    assert row_count == 0
+    assert table.num_rows == 0
+    assert table.schema == SCHEMA
@@ -1,24 +1,25 @@
+import asyncio
+import json
+import statistics
 from http import HTTPStatus
 
 import pytest
+from sqlalchemy import text
 
-from conchalabs.user_audios.models import UserAudio
+from conchalabs.dependencies.database import engine
+from conchalabs.settings import settings
+from conchalabs.user_audios.aggregates import rebuild_aggregates, rebuild_all_aggregates
+from conchalabs.user_audios.models import UserAudio, UserAudioAggregate
 from conchalabs.users.models import User
 
 USER_AUDIOS_API_URL = "/api/v1/users/{user_id}/audios"
+USER_AUDIOS_BATCH_API_URL = "/api/v1/users/{user_id}/audios:batch"
+USER_AUDIOS_EXPORT_API_URL = "/api/v1/users/{user_id}/audios:export"
+USER_AUDIOS_STATS_API_URL = "/api/v1/users/{user_id}/audios:stats"
+USER_AUDIOS_SUMMARY_API_URL = "/api/v1/users/{user_id}/audios:summary"
 AUDIO_API_URL = "/api/v1/users/{user_id}/audios/{audio_id}"
 
 
-@pytest.fixture()
-def user_payload():
-    return {
-        "name": "Lucas Bernardes",
-        "email": "lucascbernardes@live.com",
-        "address": "Brazil",
-        "image": "https://example.com/img.png",
-    }
-
-
 @pytest.fixture()
 def user_audio_payload():
     return {
@@ -26,7 +27,7 @@ def user_audio_payload():
             -96.33,
             -96.33,
             -93.47,
-            -89.03999999999999,
+            -89.04,
             -84.61,
             -80.18,
             -75.75,
@@ -45,11 +46,6 @@ def user_audio_payload():
     }
 
 
-@pytest.fixture()
-async def user(user_repository, user_payload):
-    return await user_repository.save(User(**user_payload))
-
-
 @pytest.fixture()
 async def user_audio(user: User, user_audio_repository, user_audio_payload):
     return await user_audio_repository.save(
@@ -198,6 +194,231 @@ async def test_create_user_audio_conflict_session_id(
     assert len(user_audios_db) == 1
 
 
+async def test_create_user_audios_batch(
+    client, user: User, user_audio_repository, user_audio_payload
+):
+    batch_payload = {
+        "audios": [
+            {**user_audio_payload, "session_id": session_id, "step_count": step_count}
+            for step_count, session_id in enumerate(range(100, 110))
+        ]
+    }
+
+    response = await client.post(
+        USER_AUDIOS_BATCH_API_URL.format(user_id=str(user.id)), json=batch_payload
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+    body = response.json()
+
+    assert len(body["created"]) == 10
+    assert body["conflicts"] == []
+    assert {audio["session_id"] for audio in body["created"]} == set(range(100, 110))
+
+    user_audios_db = await user_audio_repository.find({"user_id": user.id})
+
+    assert len(user_audios_db) == 10
+
+
+async def test_create_user_audios_batch_conflicts(
+    client, user_audio: UserAudio, user_audio_repository, user_audio_payload
+):
+    batch_payload = {
+        "audios": [
+            user_audio_payload,
+            {**user_audio_payload, "session_id": 1},
+            {**user_audio_payload, "session_id": 1},
+        ]
+    }
+
+    response = await client.post(
+        USER_AUDIOS_BATCH_API_URL.format(user_id=str(user_audio.user_id)),
+        json=batch_payload,
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+    body = response.json()
+
+    assert len(body["created"]) == 1
+    assert body["created"][0]["session_id"] == 1
+    assert body["conflicts"] == [
+        {
+            "step_count": user_audio_payload["step_count"],
+            "session_id": user_audio_payload["session_id"],
+        },
+        {"step_count": user_audio_payload["step_count"], "session_id": 1},
+    ]
+
+    user_audios_db = await user_audio_repository.find({"user_id": user_audio.user_id})
+
+    assert len(user_audios_db) == 2
+
+
+async def test_create_user_audios_batch_user_not_found(client, user_audio_payload):
+    response = await client.post(
+        USER_AUDIOS_BATCH_API_URL.format(
+            user_id="85423d1e-e7ba-4070-84e8-da33ddcda6dc"
+        ),
+        json={"audios": [user_audio_payload]},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+    body = response.json()
+
+    assert body["detail"] == "User not found"
+
+
+async def test_create_user_audios_batch_invalid_payload(
+    client, user: User, user_audio_repository, user_audio_payload
+):
+    batch_payload = {
+        "audios": [user_audio_payload, {**user_audio_payload, "step_count": 10}]
+    }
+
+    response = await client.post(
+        USER_AUDIOS_BATCH_API_URL.format(user_id=str(user.id)), json=batch_payload
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    body = response.json()
+
+    assert body["detail"][0]["loc"] == ["body", "audios", 1, "step_count"]
+
+    user_audios_db = await user_audio_repository.find({"user_id": user.id})
+
+    assert len(user_audios_db) == 0
+
+
+async def test_create_user_audios_batch_empty(client, user: User):
+    response = await client.post(
+        USER_AUDIOS_BATCH_API_URL.format(user_id=str(user.id)), json={"audios": []}
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+async def test_upsert_user_audio_inserts(
+    client, user: User, user_audio_repository, user_audio_payload
+):
+    response = await client.put(
+        USER_AUDIOS_API_URL.format(user_id=str(user.id)), json=user_audio_payload
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+
+    body = response.json()
+
+    assert body["ticks"] == user_audio_payload["ticks"]
+    assert body["session_id"] == user_audio_payload["session_id"]
+
+    audio_db = await user_audio_repository.get_by_id(user.id, body["id"])
+
+    assert audio_db.ticks == user_audio_payload["ticks"]
+
+
+async def test_upsert_user_audio_updates(
+    client, user_audio: UserAudio, user_audio_repository, user_audio_payload, db_session
+):
+    payload = {**user_audio_payload, "ticks": [-20.5] * 15, "selected_tick": 7}
+
+    response = await client.put(
+        USER_AUDIOS_API_URL.format(user_id=str(user_audio.user_id)), json=payload
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+    body = response.json()
+
+    assert body["id"] == str(user_audio.id)
+    assert body["created_at"] == user_audio.created_at.isoformat()
+    assert body["updated_at"] > user_audio.updated_at.isoformat()
+    assert body["ticks"] == [-20.5] * 15
+    assert body["selected_tick"] == 7
+
+    user_audios_db = await user_audio_repository.find({"user_id": user_audio.user_id})
+    await db_session.refresh(user_audio)
+
+    assert user_audios_db == [user_audio]
+    assert user_audio.ticks == [-20.5] * 15
+
+
+async def test_upsert_user_audio_is_idempotent(
+    client, user: User, user_audio_repository, user_audio_payload
+):
+    url = USER_AUDIOS_API_URL.format(user_id=str(user.id))
+
+    first_response = await client.put(url, json=user_audio_payload)
+    second_response = await client.put(url, json=user_audio_payload)
+
+    assert first_response.status_code == HTTPStatus.CREATED
+    assert second_response.status_code == HTTPStatus.OK
+    assert second_response.json()["id"] == first_response.json()["id"]
+    assert len(await user_audio_repository.find({"user_id": user.id})) == 1
+
+
+async def test_upsert_user_audio_of_another_user(
+    client,
+    user_audio: UserAudio,
+    user_repository,
+    user_audio_repository,
+    user_audio_payload,
+    db_session,
+):
+    other_user = await user_repository.save(
+        User(name="Other", email="other@example.com", address="Brazil", image="")
+    )
+
+    response = await client.put(
+        USER_AUDIOS_API_URL.format(user_id=str(other_user.id)),
+        json={**user_audio_payload, "ticks": [-20.5] * 15},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json()["detail"] == "Audio conflicts for user"
+
+    await db_session.refresh(user_audio)
+
+    assert user_audio.ticks == user_audio_payload["ticks"]
+    assert await user_audio_repository.find({"user_id": other_user.id}) == []
+
+
+async def test_upsert_user_audio_conflict_session_id(
+    client, user_audio: UserAudio, user_audio_payload
+):
+    response = await client.put(
+        USER_AUDIOS_API_URL.format(user_id=str(user_audio.user_id)),
+        json={**user_audio_payload, "step_count": 2},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+async def test_upsert_user_audio_user_not_found(client, user_audio_payload):
+    response = await client.put(
+        USER_AUDIOS_API_URL.format(user_id="85423d1e-e7ba-4070-84e8-da33ddcda6dc"),
+        json=user_audio_payload,
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json()["detail"] == "User not found"
+
+
+async def test_upsert_user_audio_of_another_user_user_not_found(
+    client, user_audio: UserAudio, user_audio_payload
+):
+    response = await client.put(
+        USER_AUDIOS_API_URL.format(user_id="85423d1e-e7ba-4070-84e8-da33ddcda6dc"),
+        json=user_audio_payload,
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json()["detail"] == "User not found"
+
+
 async def test_list_user_audios(client, user_audio: UserAudio):
     response = await client.get(
         USER_AUDIOS_API_URL.format(user_id=str(user_audio.user_id))
@@ -207,8 +428,30 @@ async def test_list_user_audios(client, user_audio: UserAudio):
 
     body = response.json()
 
-    assert len(body) == 1
-    assert body[0]["id"] == str(user_audio.id)
+    assert len(body["items"]) == 1
+    assert body["items"][0]["id"] == str(user_audio.id)
+
+
+async def test_list_user_audios_without_audios(client, user: User):
+    response = await client.get(USER_AUDIOS_API_URL.format(user_id=str(user.id)))
+
+    assert response.status_code == HTTPStatus.OK
+
+    body = response.json()
+
+    assert body == {"items": [], "next_cursor": None}
+
+
+async def test_list_user_audios_user_not_found(client, user_audio: UserAudio):
+    response = await client.get(
+        USER_AUDIOS_API_URL.format(user_id="85423d1e-e7ba-4070-84e8-da33ddcda6dc")
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+    body = response.json()
+
+    assert body["detail"] == "User not found"
 
 
 async def test_list_user_audios_with_query_found(client, user_audio: UserAudio):
@@ -222,8 +465,8 @@ async def test_list_user_audios_with_query_found(client, user_audio: UserAudio):
 
     body = response.json()
 
-    assert len(body) == 1
-    assert body[0]["id"] == str(user_audio.id)
+    assert len(body["items"]) == 1
+    assert body["items"][0]["id"] == str(user_audio.id)
 
 
 async def test_list_user_audios_with_query_not_found(client, user_audio: UserAudio):
@@ -237,7 +480,61 @@ async def test_list_user_audios_with_query_not_found(client, user_audio: UserAud
 
     body = response.json()
 
-    assert len(body) == 0
+    assert len(body["items"]) == 0
+
+
+async def test_list_user_audios_paginated(
+    client, user: User, user_audio_repository, user_audio_payload
+):
+    audios = [
+        await user_audio_repository.save(
+            UserAudio(
+                user_id=user.id,
+                **{**user_audio_payload, "session_id": session_id},
+            )
+        )
+        for session_id in range(5)
+    ]
+
+    first_response = await client.get(
+        USER_AUDIOS_API_URL.format(user_id=str(user.id)), params={"limit": 3}
+    )
+
+    assert first_response.status_code == HTTPStatus.OK
+
+    first_page = first_response.json()
+
+    assert [item["id"] for item in first_page["items"]] == [
+        str(audio.id) for audio in audios[:3]
+    ]
+    assert first_page["next_cursor"] is not None
+
+    second_response = await client.get(
+        USER_AUDIOS_API_URL.format(user_id=str(user.id)),
+        params={"limit": 3, "cursor": first_page["next_cursor"]},
+    )
+
+    assert second_response.status_code == HTTPStatus.OK
+
+    second_page = second_response.json()
+
+    assert [item["id"] for item in second_page["items"]] == [
+        str(audio.id) for audio in audios[3:]
+    ]
+    assert second_page["next_cursor"] is None
+
+
+async def test_list_user_audios_invalid_cursor(client, user_audio: UserAudio):
+    response = await client.get(
+        USER_AUDIOS_API_URL.format(user_id=str(user_audio.user_id)),
+        params={"cursor": "not-a-cursor"},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    body = response.json()
+
+    assert body["detail"] == "Invalid cursor"
 
 
 async def test_get_user_audio_by_id(client, user_audio: UserAudio):
@@ -454,3 +751,399 @@ async def test_update_user_audio_by_id_conflicts(
     body = response.json()
 
     assert body["detail"] == "Audio conflicts for user"
+
+
+async def test_list_user_audios_fast_json(
+    client, monkeypatch, user: User, user_audio_repository, user_audio_payload
+):
+    for session_id in range(5):
+        await user_audio_repository.save(
+            UserAudio(
+                user_id=user.id, **{**user_audio_payload, "session_id": session_id}
+            )
+        )
+
+    url = USER_AUDIOS_API_URL.format(user_id=str(user.id))
+    first_page = (await client.get(url, params={"limit": 3})).json()
+    second_page = (
+        await client.get(url, params={"limit": 3, "cursor": first_page["next_cursor"]})
+    ).json()
+
+    monkeypatch.setattr(settings, "fast_json_responses", True)
+
+    fast_first_response = await client.get(url, params={"limit": 3})
+    fast_second_response = await client.get(
+        url, params={"limit": 3, "cursor": first_page["next_cursor"]}
+    )
+
+    assert fast_first_response.status_code == HTTPStatus.OK
+    assert fast_first_response.json() == first_page
+    assert fast_second_response.status_code == HTTPStatus.OK
+    assert fast_second_response.json() == second_page
+
+
+async def test_list_user_audios_fast_json_without_audios(
+    client, monkeypatch, user: User
+):
+    monkeypatch.setattr(settings, "fast_json_responses", True)
+
+    response = await client.get(USER_AUDIOS_API_URL.format(user_id=str(user.id)))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"items": [], "next_cursor": None}
+
+
+async def test_list_user_audios_fast_json_user_not_found(client, monkeypatch):
+    monkeypatch.setattr(settings, "fast_json_responses", True)
+
+    response = await client.get(
+        USER_AUDIOS_API_URL.format(user_id="00000000-0000-0000-0000-000000000000")
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {"detail": "User not found"}
+
+
+@pytest.fixture()
+async def user_audios(user: User, user_audio_repository, user_audio_payload):
+    return [
+        await user_audio_repository.save(
+            UserAudio(
+                user_id=user.id, **{**user_audio_payload, "session_id": session_id}
+            )
+        )
+        for session_id in range(5)
+    ]
+
+
+async def test_export_user_audios(
+    client, monkeypatch, user: User, user_audios: list[UserAudio]
+):
+    monkeypatch.setattr(settings, "export_batch_size", 2)
+
+    response = await client.get(USER_AUDIOS_EXPORT_API_URL.format(user_id=str(user.id)))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    list_response = await client.get(USER_AUDIOS_API_URL.format(user_id=str(user.id)))
+
+    assert [
+        json.loads(line) for line in response.text.splitlines()
+    ] == list_response.json()["items"]
+
+
+async def test_export_user_audios_with_query(
+    client, user: User, user_audios: list[UserAudio]
+):
+    response = await client.get(
+        USER_AUDIOS_EXPORT_API_URL.format(user_id=str(user.id)),
+        params={"session_id": user_audios[2].session_id},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [
+        str(user_audios[2].id)
+    ]
+
+
+async def test_export_user_audios_without_audios(client, user: User):
+    response = await client.get(USER_AUDIOS_EXPORT_API_URL.format(user_id=str(user.id)))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.text == ""
+
+
+async def test_export_user_audios_user_not_found(client):
+    response = await client.get(
+        USER_AUDIOS_EXPORT_API_URL.format(
+            user_id="00000000-0000-0000-0000-000000000000"
+        )
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {"detail": "User not found"}
+
+
+async def test_export_user_audios_client_disconnect(
+    test_app, monkeypatch, user: User, user_audios: list[UserAudio]
+):
+    monkeypatch.setattr(settings, "export_batch_size", 1)
+    checked_out_connections = engine.pool.checkedout()
+    first_chunk_sent = asyncio.Event()
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    chunks = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+
+        await first_chunk_sent.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append(message["body"])
+            first_chunk_sent.set()
+            # Give the disconnect a chance to cancel the stream before the next chunk.
+            await asyncio.sleep(0.1)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": USER_AUDIOS_EXPORT_API_URL.format(user_id=str(user.id)),
+        "raw_path": b"",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+
+    await test_app(scope, receive, send)
+
+    assert 0 < len(chunks) < len(user_audios)
+    assert engine.pool.checkedout() == checked_out_connections
+
+
+async def test_user_audio_stats(
+    client, user: User, user_audio_repository, user_audio_payload
+):
+    audios = [
+        await user_audio_repository.save(
+            UserAudio(
+                user_id=user.id,
+                **{
+                    **user_audio_payload,
+                    "ticks": [
+                        tick + session_id for tick in user_audio_payload["ticks"]
+                    ],
+                    "selected_tick": session_id % 2,
+                    "session_id": session_id,
+                },
+            )
+        )
+        for session_id in range(5)
+    ]
+
+    response = await client.get(USER_AUDIOS_STATS_API_URL.format(user_id=str(user.id)))
+
+    assert response.status_code == HTTPStatus.OK
+
+    body = response.json()
+
+    assert body["audio_count"] == 5
+    assert body["selected_ticks"] == [
+        {"selected_tick": 0, "count": 3},
+        {"selected_tick": 1, "count": 2},
+    ]
+    assert len(body["ticks"]) == 15
+
+    for position, tick_stats in enumerate(body["ticks"]):
+        values = [audio.ticks[position] for audio in audios]
+        quantiles = statistics.quantiles(values, n=20, method="inclusive")
+
+        assert tick_stats == {
+            "position": position,
+            "mean": pytest.approx(statistics.mean(values)),
+            "std": pytest.approx(statistics.pstdev(values)),
+            "min": min(values),
+            "max": max(values),
+            "p5": pytest.approx(quantiles[0]),
+            "p25": pytest.approx(quantiles[4]),
+            "p50": pytest.approx(quantiles[9]),
+            "p75": pytest.approx(quantiles[14]),
+            "p95": pytest.approx(quantiles[18]),
+        }
+
+
+async def test_user_audio_stats_without_audios(client, user: User):
+    response = await client.get(USER_AUDIOS_STATS_API_URL.format(user_id=str(user.id)))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"audio_count": 0, "ticks": [], "selected_ticks": []}
+
+
+async def test_user_audio_stats_user_not_found(client):
+    response = await client.get(
+        USER_AUDIOS_STATS_API_URL.format(user_id="00000000-0000-0000-0000-000000000000")
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {"detail": "User not found"}
+
+
+def assert_summary_matches(body: dict, audios: list[UserAudio]):
+    assert body["audio_count"] == len(audios)
+    assert body["session_count"] == len(audios)
+    assert body["last_created_at"] == max(
+        audio.created_at for audio in audios
+    ).isoformat(timespec="microseconds")
+    assert len(body["ticks"]) == 15
+
+    for position, tick_summary in enumerate(body["ticks"]):
+        values = [audio.ticks[position] for audio in audios]
+
+        assert tick_summary == {
+            "position": position,
+            "mean": pytest.approx(statistics.mean(values), abs=1e-4),
+            "std": pytest.approx(statistics.pstdev(values), abs=1e-3),
+        }
+
+
+@pytest.fixture()
+async def summary_audios(user: User, user_audio_repository, user_audio_payload):
+    return [
+        await user_audio_repository.save(
+            UserAudio(
+                user_id=user.id,
+                **{
+                    **user_audio_payload,
+                    "ticks": [
+                        tick + session_id * 2 for tick in user_audio_payload["ticks"]
+                    ],
+                    "session_id": session_id,
+                },
+            )
+        )
+        for session_id in range(5)
+    ]
+
+
+async def test_user_audio_summary(client, user: User, summary_audios):
+    response = await client.get(
+        USER_AUDIOS_SUMMARY_API_URL.format(user_id=str(user.id))
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert_summary_matches(response.json(), summary_audios)
+
+
+async def test_user_audio_summary_matches_stats(client, user: User, summary_audios):
+    summary = await client.get(USER_AUDIOS_SUMMARY_API_URL.format(user_id=str(user.id)))
+    stats = await client.get(USER_AUDIOS_STATS_API_URL.format(user_id=str(user.id)))
+
+    # Both are computed in double precision, so they only differ by its rounding errors
+    for tick_summary, tick_stats in zip(summary.json()["ticks"], stats.json()["ticks"]):
+        assert tick_summary["mean"] == pytest.approx(tick_stats["mean"], rel=1e-12)
+        assert tick_summary["std"] == pytest.approx(tick_stats["std"], rel=1e-9)
+
+
+async def test_user_audio_summary_session_count_relies_on_unique_sessions(db_session):
+    # The summary reports audio_count as session_count, which only holds while session_id is unique
+    # across all audios. Dropping this index needs a maintained distinct session count instead.
+    result = await db_session.execute(
+        text(
+            "SELECT pg_index.indisunique FROM pg_index "
+            "JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+            "WHERE pg_class.relname = 'ix_useraudio_session_id'"
+        )
+    )
+
+    assert result.scalar() is True
+    assert UserAudio.__table__.c.session_id.unique  # type: ignore
+
+
+async def test_user_audio_summary_follows_updates(
+    client, user: User, summary_audios, user_audio_repository, user_audio_payload
+):
+    audio = summary_audios[0]
+    updated_audio = await user_audio_repository.update(
+        user.id, audio.id, {"ticks": [-20.0] * 15}
+    )
+    batch_audios = await user_audio_repository.save_many(
+        [
+            UserAudio(
+                user_id=user.id, **{**user_audio_payload, "session_id": session_id}
+            )
+            for session_id in (100, 101)
+        ]
+    )
+
+    response = await client.get(
+        USER_AUDIOS_SUMMARY_API_URL.format(user_id=str(user.id))
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert_summary_matches(
+        response.json(), [updated_audio, *summary_audios[1:], *batch_audios]
+    )
+
+
+async def test_user_audio_summary_follows_moved_audios(
+    client, user: User, summary_audios, user_repository, user_audio_repository
+):
+    other_user = await user_repository.save(
+        User(name="Other", email="other@example.com", address="Brazil", image="")
+    )
+    await user_audio_repository.update(
+        user.id, summary_audios[-1].id, {"user_id": other_user.id}
+    )
+
+    response = await client.get(
+        USER_AUDIOS_SUMMARY_API_URL.format(user_id=str(user.id))
+    )
+    other_response = await client.get(
+        USER_AUDIOS_SUMMARY_API_URL.format(user_id=str(other_user.id))
+    )
+
+    assert_summary_matches(response.json(), summary_audios[:-1])
+    assert_summary_matches(other_response.json(), summary_audios[-1:])
+
+
+async def test_user_audio_summary_without_audios(client, user: User):
+    response = await client.get(
+        USER_AUDIOS_SUMMARY_API_URL.format(user_id=str(user.id))
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        "audio_count": 0,
+        "session_count": 0,
+        "last_created_at": None,
+        "ticks": [],
+    }
+
+
+async def test_user_audio_summary_user_not_found(client):
+    response = await client.get(
+        USER_AUDIOS_SUMMARY_API_URL.format(
+            user_id="00000000-0000-0000-0000-000000000000"
+        )
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {"detail": "User not found"}
+
+
+async def test_rebuild_user_audio_aggregates(
+    client, user: User, summary_audios, db_session
+):
+    aggregate = await db_session.get(UserAudioAggregate, user.id)
+    aggregate.audio_count = 1
+    aggregate.tick_sums = [0.0] * 15
+    await db_session.commit()
+
+    await rebuild_aggregates([user.id])
+
+    response = await client.get(
+        USER_AUDIOS_SUMMARY_API_URL.format(user_id=str(user.id))
+    )
+    assert_summary_matches(response.json(), summary_audios)
+
+
+async def test_rebuild_all_user_audio_aggregates(
+    client, user: User, summary_audios, db_session
+):
+    await db_session.delete(await db_session.get(UserAudioAggregate, user.id))
+    await db_session.commit()
+
+    assert await rebuild_all_aggregates(batch_size=1) == 1
+
+    response = await client.get(
+        USER_AUDIOS_SUMMARY_API_URL.format(user_id=str(user.id))
+    )
+    assert_summary_matches(response.json(), summary_audios)
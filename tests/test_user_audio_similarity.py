@@ -0,0 +1,259 @@
+import asyncio
+import math
+import threading
+from http import HTTPStatus
+
+import numpy as np
+import pytest
+from sqlmodel import delete
+
+from conchalabs.commons.vector_index import IVFVectorIndex, VectorIndex
+from conchalabs.dependencies.database import engine, get_tick_index_updater
+from conchalabs.user_audios.models import UserAudio
+from conchalabs.user_audios.similarity import TickIndexUpdater
+from conchalabs.users.models import User
+
+SIMILAR_AUDIOS_API_URL = "/api/v1/users/{user_id}/audios/{audio_id}/similar"
+
+
+@pytest.fixture()
+async def user_audios(user: User, user_audio_repository):
+    return [
+        await user_audio_repository.save(
+            UserAudio(
+                user_id=user.id,
+                ticks=[-90.0 + session_id] * 15,
+                selected_tick=0,
+                session_id=session_id,
+                step_count=1,
+            )
+        )
+        for session_id in range(10)
+    ]
+
+
+@pytest.fixture(params=["exact", "ivf"])
+def tick_index_updater(request, test_app):
+    updater = TickIndexUpdater(
+        engine,
+        kind=request.param,
+        interval=60,
+        rebuild_interval=3600,
+        ivf_lists=2,
+        ivf_probes=2,
+    )
+    test_app.dependency_overrides[get_tick_index_updater] = lambda: updater
+
+    return updater
+
+
+@pytest.fixture()
+def vectors():
+    return np.random.default_rng(0).normal(-50, 10, (2000, 4)).astype(np.float32)
+
+
+def brute_force(vectors, query, k):
+    distances = np.sqrt(((vectors - query) ** 2).sum(axis=1))
+    return np.argsort(distances, kind="stable")[:k].tolist()
+
+
+def test_vector_index_search_is_exact(vectors):
+    index = VectorIndex(4, capacity=16)
+    index.add(list(range(len(vectors))), vectors)
+
+    for query in vectors[:20] + 0.5:
+        neighbours = index.search(query, 5)
+
+        assert [key for key, _ in neighbours] == brute_force(vectors, query, 5)
+        assert neighbours[0][1] == pytest.approx(1.0, abs=1e-4)
+
+
+def test_vector_index_replaces_and_removes_vectors(vectors):
+    index = VectorIndex(4)
+    index.add(["a", "b", "c"], vectors[:3])
+
+    index.add(["a"], vectors[2:3] + 1)
+    index.remove(["c", "missing"])
+    index.add(["d"], vectors[:1])
+
+    assert len(index) == 3
+    assert "c" not in index
+    assert index.search(vectors[0], 1) == [("d", 0.0)]
+    assert index.search(vectors[2], 1) == [("a", pytest.approx(2.0))]
+    assert {key for key, _ in index.search(vectors[2], 10)} == {"a", "b", "d"}
+
+
+def test_empty_vector_index_finds_nothing():
+    assert VectorIndex(4).search([0, 0, 0, 0], 3) == []
+
+
+def test_ivf_vector_index_recall(vectors):
+    index = IVFVectorIndex(4, lists=16, probes=4)
+    index.add(list(range(len(vectors))), vectors)
+    index.train()
+
+    queries = vectors[:50] + 0.5
+    found = sum(
+        len(
+            {key for key, _ in index.search(query, 10)}
+            & set(brute_force(vectors, query, 10))
+        )
+        for query in queries
+    )
+
+    assert index.trained
+    assert found / (10 * len(queries)) >= 0.8
+
+
+def test_ivf_vector_index_follows_writes_after_training(vectors):
+    index = IVFVectorIndex(4, lists=4, probes=4)
+    index.add(list(range(100)), vectors[:100])
+    index.train()
+
+    index.add([0, "new"], [vectors[200], vectors[201]])
+    index.remove([1])
+
+    assert index.search(vectors[200], 1) == [(0, 0.0)]
+    assert index.search(vectors[201], 1) == [("new", 0.0)]
+    assert 1 not in [key for key, _ in index.search(vectors[1], 100)]
+
+
+async def test_find_similar_user_audios(
+    client, user: User, user_audios, tick_index_updater
+):
+    await tick_index_updater.build()
+
+    response = await client.get(
+        SIMILAR_AUDIOS_API_URL.format(user_id=user.id, audio_id=user_audios[4].id),
+        params={"k": 3},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    body = response.json()
+    assert {item["audio_id"] for item in body[:2]} == {
+        str(user_audios[3].id),
+        str(user_audios[5].id),
+    }
+    assert [item["distance"] for item in body] == pytest.approx(
+        [math.sqrt(15), math.sqrt(15), 2 * math.sqrt(15)]
+    )
+
+
+async def test_find_similar_user_audios_searches_off_the_event_loop(
+    monkeypatch, client, user: User, user_audios, tick_index_updater
+):
+    await tick_index_updater.build()
+    index = tick_index_updater.index
+    search = index.search
+    search_threads = []
+
+    def recording_search(vector, k):
+        search_threads.append(threading.get_ident())
+        return search(vector, k)
+
+    monkeypatch.setattr(index, "search", recording_search)
+
+    response = await client.get(
+        SIMILAR_AUDIOS_API_URL.format(user_id=user.id, audio_id=user_audios[4].id)
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(search_threads) == 1
+    assert search_threads[0] != threading.get_ident()
+
+
+async def test_find_similar_user_audios_follows_writes(
+    client,
+    user: User,
+    user_audios,
+    user_audio_repository,
+    db_session,
+    tick_index_updater,
+):
+    await tick_index_updater.build()
+
+    new_audio = await user_audio_repository.save(
+        UserAudio(
+            user_id=user.id,
+            ticks=[-85.5] * 15,
+            selected_tick=0,
+            session_id=100,
+            step_count=1,
+        )
+    )
+    await tick_index_updater.refresh()
+    await db_session.exec(delete(UserAudio).where(UserAudio.id == user_audios[4].id))
+    await db_session.commit()
+
+    response = await client.get(
+        SIMILAR_AUDIOS_API_URL.format(user_id=user.id, audio_id=user_audios[5].id),
+        params={"k": 2},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [item["audio_id"] for item in response.json()] == [
+        str(new_audio.id),
+        str(user_audios[6].id),
+    ]
+    assert user_audios[4].id not in tick_index_updater.index
+
+
+async def test_find_similar_user_audios_audio_not_found(
+    client, user: User, tick_index_updater
+):
+    await tick_index_updater.build()
+
+    response = await client.get(
+        SIMILAR_AUDIOS_API_URL.format(
+            user_id=user.id, audio_id="00000000-0000-0000-0000-000000000000"
+        )
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {"detail": "Audio not found"}
+
+
+async def test_find_similar_user_audios_before_the_index_is_built(
+    client, user: User, user_audios, tick_index_updater
+):
+    response = await client.get(
+        SIMILAR_AUDIOS_API_URL.format(user_id=user.id, audio_id=user_audios[0].id)
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+
+async def test_find_similar_user_audios_when_disabled(client, user: User, user_audios):
+    response = await client.get(
+        SIMILAR_AUDIOS_API_URL.format(user_id=user.id, audio_id=user_audios[0].id)
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json() == {"detail": "Similarity search is not available"}
+
+
+async def test_tick_index_updater_keeps_running_after_an_error(monkeypatch, caplog):
+    updater = TickIndexUpdater(
+        engine,
+        kind="exact",
+        interval=0.01,
+        rebuild_interval=3600,
+        ivf_lists=2,
+        ivf_probes=2,
+    )
+    calls = []
+
+    async def build():
+        calls.append(len(calls))
+
+        if len(calls) == 1:
+            raise ValueError("could not broadcast input array")
+
+    monkeypatch.setattr(updater, "build", build)
+
+    updater.start()
+    await asyncio.sleep(0.1)
+    await updater.stop()
+
+    assert len(calls) > 1
+    assert "Failed to update the tick index" in caplog.text
@@ -0,0 +1,159 @@
+import asyncio
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+
+from conchalabs.dependencies.database import engine, get_user_audio_write_queue
+from conchalabs.settings import settings
+from conchalabs.user_audios.errors import (
+    UserAudioConflictError,
+    UserAudioQueueFullError,
+)
+from conchalabs.user_audios.ingestion import UserAudioWriteQueue
+from conchalabs.user_audios.models import UserAudio
+from conchalabs.users.errors import UserNotFoundError
+from conchalabs.users.models import User
+
+USER_AUDIOS_API_URL = "/api/v1/users/{user_id}/audios"
+
+
+@pytest.fixture()
+async def write_queue():
+    queue = UserAudioWriteQueue(engine, batch_size=5, flush_interval=0.05, max_size=20)
+    queue.start()
+
+    yield queue
+
+    await queue.stop()
+
+
+def make_audio(user_id, session_id: int) -> UserAudio:
+    return UserAudio(
+        user_id=user_id,
+        ticks=[-50.0] * 15,
+        selected_tick=0,
+        session_id=session_id,
+        step_count=1,
+    )
+
+
+async def test_write_queue_inserts_in_batches(
+    user: User, write_queue, user_audio_repository, monkeypatch
+):
+    batch_sizes = []
+    flush = write_queue._flush
+
+    async def record_flush(batch):
+        batch_sizes.append(len(batch))
+        await flush(batch)
+
+    monkeypatch.setattr(write_queue, "_flush", record_flush)
+
+    audios = await asyncio.gather(
+        *(
+            write_queue.submit(make_audio(user.id, session_id))
+            for session_id in range(12)
+        )
+    )
+
+    assert [audio.session_id for audio in audios] == list(range(12))
+    assert sorted(batch_sizes) == [2, 5, 5]
+    assert len(await user_audio_repository.find({"user_id": user.id})) == 12
+
+
+async def test_write_queue_resolves_conflicts_per_audio(user: User, write_queue):
+    results = await asyncio.gather(
+        write_queue.submit(make_audio(user.id, 1)),
+        write_queue.submit(make_audio(user.id, 1)),
+        write_queue.submit(make_audio(user.id, 2)),
+        return_exceptions=True,
+    )
+
+    assert results[0].session_id == 1
+    assert isinstance(results[1], UserAudioConflictError)
+    assert results[2].session_id == 2
+
+
+async def test_write_queue_resolves_missing_users_per_audio(user: User, write_queue):
+    results = await asyncio.gather(
+        write_queue.submit(make_audio(user.id, 1)),
+        write_queue.submit(make_audio(uuid4(), 2)),
+        write_queue.submit(make_audio(user.id, 3)),
+        return_exceptions=True,
+    )
+
+    assert results[0].session_id == 1
+    assert isinstance(results[1], UserNotFoundError)
+    assert results[2].session_id == 3
+
+
+async def test_write_queue_rejects_audios_when_full(user: User):
+    queue = UserAudioWriteQueue(engine, batch_size=5, flush_interval=0.05, max_size=2)
+    waiting = [
+        asyncio.create_task(queue.submit(make_audio(user.id, session_id)))
+        for session_id in range(2)
+    ]
+    await asyncio.sleep(0)
+
+    with pytest.raises(UserAudioQueueFullError):
+        await queue.submit(make_audio(user.id, 3))
+
+    queue.start()
+    await queue.stop()
+
+    assert [task.result().session_id for task in waiting] == [0, 1]
+
+
+async def test_create_user_audio_through_write_queue(
+    client, test_app, user: User, write_queue, user_audio_repository
+):
+    test_app.dependency_overrides[get_user_audio_write_queue] = lambda: write_queue
+    payload = {
+        "ticks": [-50.0] * 15,
+        "selected_tick": 0,
+        "session_id": 1,
+        "step_count": 1,
+    }
+    url = USER_AUDIOS_API_URL.format(user_id=str(user.id))
+
+    responses = await asyncio.gather(
+        client.post(url, json=payload),
+        client.post(url, json=payload),
+        client.post(url, json={**payload, "session_id": 2}),
+    )
+
+    assert sorted(response.status_code for response in responses) == [
+        HTTPStatus.CREATED,
+        HTTPStatus.CREATED,
+        HTTPStatus.CONFLICT,
+    ]
+    assert len(await user_audio_repository.find({"user_id": user.id})) == 2
+
+
+async def test_create_user_audio_when_write_queue_is_full(
+    client, test_app, monkeypatch, user: User
+):
+    monkeypatch.setattr(settings, "audio_write_queue_retry_after", 3)
+    queue = UserAudioWriteQueue(engine, batch_size=5, flush_interval=0.05, max_size=1)
+    test_app.dependency_overrides[get_user_audio_write_queue] = lambda: queue
+    waiting = asyncio.create_task(queue.submit(make_audio(user.id, 1)))
+    await asyncio.sleep(0)
+
+    response = await client.post(
+        USER_AUDIOS_API_URL.format(user_id=str(user.id)),
+        json={
+            "ticks": [-50.0] * 15,
+            "selected_tick": 0,
+            "session_id": 2,
+            "step_count": 1,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "3"
+    assert response.json() == {"detail": "Too many audios waiting to be saved"}
+
+    queue.start()
+    await queue.stop()
+    assert waiting.result().session_id == 1
@@ -0,0 +1,173 @@
+import asyncio
+import time
+from http import HTTPStatus
+
+import pytest
+
+from conchalabs.commons.cache import LRUCache
+from conchalabs.dependencies.cache import get_user_cache
+from conchalabs.users.errors import UserNotFoundError
+from conchalabs.users.models import User
+from conchalabs.users.repositories.cached import CachedUserRepository
+
+CACHE_STATS_API_URL = "/internal/cache"
+
+
+@pytest.fixture()
+def cache():
+    return LRUCache(max_size=2, ttl=60)
+
+
+@pytest.fixture()
+def cached_user_repository(user_repository, cache):
+    return CachedUserRepository(user_repository, cache)
+
+
+async def test_lru_cache_hits_and_misses(cache):
+    assert await cache.get("a") is None
+
+    await cache.set("a", 1)
+
+    assert await cache.get("a") == 1
+
+    stats = cache.stats()
+
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.size == 1
+
+
+async def test_lru_cache_evicts_least_recently_used(cache):
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 3)
+
+    assert await cache.get("a") == 1
+    assert await cache.get("b") is None
+    assert await cache.get("c") == 3
+    assert cache.stats().evictions == 1
+
+
+async def test_lru_cache_expires_entries():
+    cache = LRUCache(max_size=2, ttl=0)
+
+    await cache.set("a", 1)
+
+    assert await cache.get("a") is None
+    assert cache.stats().size == 0
+
+
+async def test_lru_cache_skips_values_read_before_deletion(cache):
+    read_at = time.time()
+    await cache.delete("a")
+    await cache.set("a", 1, read_at)
+
+    assert await cache.get("a") is None
+
+    await cache.set("a", 2, time.time())
+
+    assert await cache.get("a") == 2
+
+
+async def test_cached_user_repository_get_by_id(
+    cached_user_repository, cache, user: User
+):
+    first_user = await cached_user_repository.get_by_id(user.id)
+    second_user = await cached_user_repository.get_by_id(user.id)
+
+    assert first_user.id == second_user.id == user.id
+    assert second_user.name == user.name
+    assert cache.stats().hits == 1
+    assert cache.stats().misses == 1
+
+
+async def test_cached_user_repository_get_many(
+    cached_user_repository, user_repository, cache, user: User, user_payload
+):
+    other_user = await user_repository.save(User(**user_payload))
+    await cached_user_repository.get_by_id(user.id)
+
+    users = await cached_user_repository.get_many([user.id, other_user.id])
+
+    assert {cached_user.id for cached_user in users} == {user.id, other_user.id}
+    assert cache.stats().hits == 1
+    assert await cache.get(str(other_user.id)) is not None
+
+    users = await cached_user_repository.get_many([user.id, other_user.id])
+
+    assert {cached_user.id for cached_user in users} == {user.id, other_user.id}
+    assert cache.stats().hits == 4
+
+
+async def test_cached_user_repository_update_invalidates(
+    cached_user_repository, user: User
+):
+    await cached_user_repository.get_by_id(user.id)
+    await cached_user_repository.update(user.id, {"name": "John Doe"})
+
+    cached_user = await cached_user_repository.get_by_id(user.id)
+
+    assert cached_user.name == "John Doe"
+
+
+async def test_cached_user_repository_skips_users_read_before_update(
+    monkeypatch, cached_user_repository, user_repository, cache, user: User
+):
+    read = asyncio.Event()
+    updated = asyncio.Event()
+    get_by_id = user_repository.get_by_id
+
+    async def get_by_id_until_updated(user_id):
+        stale_user = await get_by_id(user_id)
+        read.set()
+        await updated.wait()
+        return stale_user
+
+    monkeypatch.setattr(user_repository, "get_by_id", get_by_id_until_updated)
+
+    miss = asyncio.create_task(cached_user_repository.get_by_id(user.id))
+    await read.wait()
+    await cached_user_repository.update(user.id, {"name": "John Doe"})
+    updated.set()
+
+    assert (await miss).name == user.name
+    assert await cache.get(str(user.id)) is None
+
+    cached_user = await cached_user_repository.get_by_id(user.id)
+
+    assert cached_user.name == "John Doe"
+
+
+async def test_cached_user_repository_delete_invalidates(
+    cached_user_repository, user: User
+):
+    cached_user = await cached_user_repository.get_by_id(user.id)
+    await cached_user_repository.delete(cached_user)
+
+    with pytest.raises(UserNotFoundError):
+        await cached_user_repository.get_by_id(user.id)
+
+
+async def test_cache_stats(test_app, client, cache):
+    test_app.dependency_overrides[get_user_cache] = lambda: cache
+    await cache.set("a", 1)
+
+    response = await client.get(CACHE_STATS_API_URL)
+
+    assert response.status_code == HTTPStatus.OK
+
+    body = response.json()
+
+    assert body == {
+        "users": {"size": 1, "max_size": 2, "hits": 0, "misses": 0, "evictions": 0}
+    }
+
+
+async def test_cache_stats_disabled(test_app, client):
+    test_app.dependency_overrides[get_user_cache] = lambda: None
+
+    response = await client.get(CACHE_STATS_API_URL)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {}
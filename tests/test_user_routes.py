@@ -1,28 +1,16 @@
 from http import HTTPStatus
+from uuid import uuid4
 
 import pytest
 
+from conchalabs.settings import settings
 from conchalabs.users.errors import UserNotFoundError
 from conchalabs.users.models import User
+from tests.helpers import METRICS_API_URL, get_sample
 
 USERS_API_URL = "/api/v1/users"
 
 
-@pytest.fixture()
-def user_payload():
-    return {
-        "name": "Lucas Bernardes",
-        "email": "lucascbernardes@live.com",
-        "address": "Brazil",
-        "image": "https://example.com/img.png",
-    }
-
-
-@pytest.fixture()
-async def user(user_repository, user_payload):
-    return await user_repository.save(User(**user_payload))
-
-
 async def test_create_user(client, user_repository, user_payload):
     response = await client.post(USERS_API_URL, json=user_payload)
 
@@ -71,8 +59,84 @@ async def test_list_users_api(client, user: User):
 
     body = response.json()
 
-    assert len(body) == 1
-    assert body[0]["id"] == str(user.id)
+    assert len(body["items"]) == 1
+    assert body["items"][0]["id"] == str(user.id)
+    assert body["next_cursor"] is None
+
+
+async def test_list_users_api_paginated(client, user_repository, user_payload):
+    users = [await user_repository.save(User(**user_payload)) for _ in range(5)]
+
+    first_response = await client.get(USERS_API_URL, params={"limit": 3})
+
+    assert first_response.status_code == HTTPStatus.OK
+
+    first_page = first_response.json()
+
+    assert [item["id"] for item in first_page["items"]] == [
+        str(user.id) for user in users[:3]
+    ]
+    assert first_page["next_cursor"] is not None
+
+    second_response = await client.get(
+        USERS_API_URL, params={"limit": 3, "cursor": first_page["next_cursor"]}
+    )
+
+    assert second_response.status_code == HTTPStatus.OK
+
+    second_page = second_response.json()
+
+    assert [item["id"] for item in second_page["items"]] == [
+        str(user.id) for user in users[3:]
+    ]
+    assert second_page["next_cursor"] is None
+
+
+async def test_list_users_api_fast_json(
+    client, monkeypatch, user_repository, user_payload
+):
+    for _ in range(5):
+        await user_repository.save(User(**user_payload))
+
+    first_page = (await client.get(USERS_API_URL, params={"limit": 3})).json()
+    second_page = (
+        await client.get(
+            USERS_API_URL, params={"limit": 3, "cursor": first_page["next_cursor"]}
+        )
+    ).json()
+
+    monkeypatch.setattr(settings, "fast_json_responses", True)
+
+    fast_first_response = await client.get(USERS_API_URL, params={"limit": 3})
+    fast_second_response = await client.get(
+        USERS_API_URL, params={"limit": 3, "cursor": first_page["next_cursor"]}
+    )
+
+    assert fast_first_response.status_code == HTTPStatus.OK
+    assert fast_first_response.json() == first_page
+    assert fast_second_response.status_code == HTTPStatus.OK
+    assert fast_second_response.json() == second_page
+
+
+async def test_list_users_api_invalid_cursor(client, user: User):
+    response = await client.get(USERS_API_URL, params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    body = response.json()
+
+    assert body["detail"] == "Invalid cursor"
+
+
+@pytest.mark.parametrize("limit", [0, 501])
+async def test_list_users_api_invalid_limit(limit, client, user: User):
+    response = await client.get(USERS_API_URL, params={"limit": limit})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    body = response.json()
+
+    assert body["detail"][0]["loc"] == ["query", "limit"]
 
 
 @pytest.mark.parametrize(
@@ -90,8 +154,9 @@ async def test_list_users_api_with_query_found(query, client, user: User):
 
     body = response.json()
 
-    assert len(body) == 1
-    assert body[0]["id"] == str(user.id)
+    assert len(body["items"]) == 1
+    assert body["items"][0]["id"] == str(user.id)
+    assert body["next_cursor"] is None
 
 
 @pytest.mark.parametrize(
@@ -104,7 +169,7 @@ async def test_list_users_api_with_query_not_found(query, client, user: User):
 
     body = response.json()
 
-    assert len(body) == 0
+    assert len(body["items"]) == 0
 
 
 async def test_get_user_by_id(client, user: User):
@@ -163,6 +228,19 @@ async def test_update_user_by_id(update_payload, client, user: User, db_session)
     assert all(getattr(user, field) == value for field, value in update_payload.items())
 
 
+async def test_update_user_by_id_refreshes_updated_at(client, user: User):
+    response = await client.patch(
+        f"{USERS_API_URL}/{str(user.id)}", json={"name": "John Doe"}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+    body = response.json()
+
+    assert body["created_at"] == user.created_at.isoformat()
+    assert body["updated_at"] > user.updated_at.isoformat()
+
+
 async def test_update_user_by_id_not_found(client, user: User, db_session):
     update_payload = {"name": "John Doe"}
 
@@ -197,3 +275,52 @@ async def test_delete_user_by_id_not_found(client, user: User, user_repository):
     body = response.json()
 
     assert body["detail"] == "User not found"
+
+
+async def test_batch_get_users(client, user_repository, user_payload):
+    users = [await user_repository.save(User(**user_payload)) for _ in range(3)]
+    missing_id = "85423d1e-e7ba-4070-84e8-da33ddcda6dc"
+    ids = [str(users[2].id), missing_id, str(users[0].id), str(users[2].id)]
+
+    response = await client.post(f"{USERS_API_URL}:batchGet", json={"ids": ids})
+
+    assert response.status_code == HTTPStatus.OK
+
+    body = response.json()
+
+    assert [user["id"] for user in body["users"]] == [
+        str(users[2].id),
+        str(users[0].id),
+    ]
+    assert body["users"][0]["name"] == user_payload["name"]
+    assert body["missing_ids"] == [missing_id]
+
+
+async def test_batch_get_users_uses_one_statement(
+    client, user_repository, user_payload
+):
+    users = [await user_repository.save(User(**user_payload)) for _ in range(10)]
+    sample = (
+        'http_request_db_statements_sum{method="POST",route="/api/v1/users:batchGet"}'
+    )
+    statements = get_sample((await client.get(METRICS_API_URL)).text, sample)
+
+    response = await client.post(
+        f"{USERS_API_URL}:batchGet", json={"ids": [str(user.id) for user in users]}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()["users"]) == 10
+
+    metrics = (await client.get(METRICS_API_URL)).text
+
+    assert get_sample(metrics, sample) - statements == 1
+
+
+@pytest.mark.parametrize(
+    "ids", [[], ["not-a-uuid"], [str(uuid4()) for _ in range(1001)]]
+)
+async def test_batch_get_users_invalid_ids(client, ids):
+    response = await client.post(f"{USERS_API_URL}:batchGet", json={"ids": ids})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY